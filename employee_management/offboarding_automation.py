@@ -10,21 +10,1214 @@ Automates portions of the employee off-boarding process including:
 """
 
 import argparse
+import csv
+import glob
+import heapq
+import html
 import json
+import math
+import operator
 import os
+import sqlite3
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import msal
+except ImportError:  # Only needed for Microsoft Graph
+    msal = None
+
+try:
+    import yaml
+except ImportError:  # Only needed for YAML batch lists and team rosters
+    yaml = None
+
+# HTTP defaults for every upstream client (overridable in config "http")
+DEFAULT_HTTP_SETTINGS = {
+    'connect_timeout': 5,
+    'read_timeout': 30,
+    'retries': 3,
+    'backoff': 0.5,
+    'pool_size': 10
+}
+
+# Statuses worth retrying: throttling and transient server-side failures
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Most requests Microsoft Graph accepts in one JSON $batch
+GRAPH_BATCH_LIMIT = 20
+
+# Refresh OAuth tokens this many seconds before they expire
+TOKEN_EXPIRY_MARGIN = 60
+
+# Local record of off-boarding runs and cached upstream data, kept beside the config file
+DEFAULT_JOB_STORE = 'offboarding_jobs.sqlite3'
+
+# Seconds fetched upstream data is reused by later runs
+DEFAULT_CACHE_TTL = 900
+
+# Seconds each report data source may take before its section is marked degraded
+DEFAULT_SOURCE_TIMEOUT = 30
+
+# Zoho Desk returns at most 100 tickets per request
+ZOHO_DESK_PAGE_SIZE = 100
+
+DEFAULT_TICKET_STATUSES = ['Open']
+
+DEFAULT_EMAIL_DOMAIN = 'midcloudcomputing.com'
+
+# Employees whose Zoho data is fetched at once in batch mode
+DEFAULT_BATCH_PARALLELISM = 4
+
+# Automated revocation steps run at once
+DEFAULT_REVOCATION_WORKERS = 8
+
+DEFAULT_AUTO_REPLY = ("{name} is no longer with MCC. Please contact your MCC account team "
+                      "or the help desk for assistance.")
+
+# Graph authentication method types and the endpoints that delete them
+# (the password method can't be deleted and is left alone)
+GRAPH_AUTH_METHOD_ENDPOINTS = {
+    'emailAuthenticationMethod': 'emailMethods',
+    'fido2AuthenticationMethod': 'fido2Methods',
+    'microsoftAuthenticatorAuthenticationMethod': 'microsoftAuthenticatorMethods',
+    'phoneAuthenticationMethod': 'phoneMethods',
+    'softwareOathAuthenticationMethod': 'softwareOathMethods',
+    'temporaryAccessPassAuthenticationMethod': 'temporaryAccessPassMethods',
+    'windowsHelloForBusinessAuthenticationMethod': 'windowsHelloForBusinessMethods'
+}
+
+SOURCE_LABELS = {
+    'tickets': 'Zoho Desk tickets',
+    'projects': 'Zoho Projects tasks',
+    'customers': 'Customer assignments',
+    'workload': 'Team workload'
+}
+
+# Client each cacheable source is fetched through; while it is unconfigured
+# the source returns sample data, which is never cached. Customer assignments
+# are always sample data
+SOURCE_UPSTREAMS = {
+    'tickets': 'zoho_desk',
+    'projects': 'zoho_projects',
+    'workload': 'zoho_desk'
+}
+
+# Team profiles (team/*.yaml) live next to this directory by default
+DEFAULT_TEAM_ROSTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'team')
+
+# Open tickets an engineer can carry unless their profile sets max_tickets
+DEFAULT_TEAM_CAPACITY = 25
+
+# Reassignment costs, per ticket. A missing skill outweighs a fair amount of
+# load imbalance; each ticket already open adds 1 to every further ticket.
+SKILL_MISMATCH_COST = 20
+NEW_CUSTOMER_COST = 5
+OVER_CAPACITY_COST = 1000
+
+# Ticket subject keywords that call for each skill
+SKILL_KEYWORDS = {
+    'network': ['network', 'connectivity', 'wifi', 'wireless', 'switch', 'router', 'vpn', 'meraki', 'dns', 'dhcp'],
+    'security': ['security', 'firewall', 'phishing', 'malware', 'mfa', 'vulnerability', 'breach', 'fortinet'],
+    'm365': ['email', 'exchange', 'outlook', 'office 365', 'o365', 'm365', 'teams', 'sharepoint', 'onedrive'],
+    'cloud': ['azure', 'aws', 'cloud', 'tenant', 'entra'],
+    'backup': ['backup', 'restore', 'acronis', 'recovery'],
+    'hardware': ['printer', 'laptop', 'desktop', 'monitor', 'hardware', 'scanner']
+}
+
+REPORT_FORMATS = {'markdown': 'md', 'html': 'html', 'json': 'json'}
+
+# Systems to revoke, in checklist order
+ACCESS_CHECKLIST = (
+    ('Identity & Authentication', (
+        'Microsoft Entra ID - Disable account',
+        'Microsoft Entra ID - Revoke sign-in sessions',
+        'Microsoft Entra ID - Revoke app registrations',
+        'Microsoft Entra ID - Remove from security groups',
+        'Microsoft Entra ID - Revoke MFA methods',
+        'Microsoft Entra ID - Remove from conditional access policies')),
+    ('Microsoft 365', (
+        'Exchange Online - Set auto-reply',
+        'Exchange Online - Configure forwarding (if approved)',
+        'Exchange Online - Convert to shared mailbox',
+        'SharePoint/OneDrive - Transfer file ownership',
+        'SharePoint/OneDrive - Grant manager access',
+        'Microsoft Teams - Transfer team ownership',
+        'Microsoft Teams - Archive chat history')),
+    ('Security Tools', (
+        'RocketCyber - Remove user account',
+        'ConnectSecure - Remove user access',
+        'ConnectSecure - Revoke API keys',
+        'Keeper Security - Transfer vault ownership',
+        'Keeper Security - Revoke account',
+        'KnowBe4 - Remove from campaigns')),
+    ('RMM & PSA', (
+        'Datto RMM - Revoke account',
+        'Datto RMM - Transfer device ownership',
+        'Zoho Desk - Reassign tickets',
+        'Zoho Desk - Disable account',
+        'Zoho Projects - Reassign tasks',
+        'Zoho Projects - Transfer ownership')),
+    ('Network & Infrastructure', (
+        'Cisco Meraki - Remove account',
+        'Ubiquiti UniFi - Remove credentials',
+        'Fortinet - Revoke VPN/admin access',
+        'Azure Portal - Remove from subscriptions',
+        'Azure Portal - Revoke RBAC roles',
+        'AWS Console - Remove IAM user (if applicable)')),
+    ('Backup & Documentation', (
+        'Acronis - Remove account',
+        'OneNote - Transfer notebooks')),
+    ('Client Access', (
+        'Customer VPNs - Audit and revoke',
+        'Customer Admin Portals - Transfer',
+        'Customer Cloud Tenants - Remove guest access'))
+)
+
+NEXT_STEPS_SHORT_TERM = (
+    'Complete all ticket reassignments',
+    'Complete all project task reassignments',
+    'Generate customer transition documents',
+    'Send customer introduction emails')
+
+NEXT_STEPS_MEDIUM_TERM = (
+    'Complete knowledge transfer for all customers',
+    'Monitor transition success',
+    'Address any transition issues',
+    'Close off-boarding ticket')
+
+
+# Report data model: documents are a stream of these blocks, rendered as
+# markdown, HTML or JSON by the renderers below
+
+class Heading(NamedTuple):
+    """
+    A section heading; `spaced` puts a blank line under it in markdown and
+    `set_off` one above it.
+    """
+    level: int
+    text: str
+    spaced: bool = False
+    set_off: bool = False
+
+
+class Text(NamedTuple):
+    """A paragraph; newlines are kept as line breaks."""
+    text: str
+    spaced: bool = True
+
+
+class Fields(NamedTuple):
+    """
+    Labelled values, e.g. '- **Tier:** Premium'. A value may itself be a
+    block, and a field may carry a third element of (label, value) details
+    listed beneath it. `spaced` puts a blank line after every field in
+    markdown.
+    """
+    fields: Iterable[Tuple]
+    ordered: bool = False
+    spaced: bool = False
+
+
+class Items(NamedTuple):
+    """
+    Bulleted items: plain text, or (text, [(label, value), ...]) with details
+    beneath. `strong` sets the item text in bold.
+    """
+    items: Iterable
+    strong: bool = False
+
+
+class Checklist(NamedTuple):
+    """Checkbox items: text, or (text, done)."""
+    items: Iterable
+
+
+class Note(NamedTuple):
+    text: str
+
+
+class Rule(NamedTuple):
+    pass
+
+
+class Static(NamedTuple):
+    """Wraps a block built only from constants, so each format renders it once per process."""
+    block: object
+
+
+def _is_block(value) -> bool:
+    return isinstance(value, tuple) and hasattr(value, '_fields')
+
+
+def _field_parts(field: Tuple) -> Tuple[str, object, Iterable]:
+    """Split a Fields entry into (label, value, details)."""
+    label, value, *details = field
+    return label, value, details[0] if details else ()
+
+
+@lru_cache(maxsize=None)
+def _render_static(renderer: type, block) -> str:
+    return ''.join(renderer.render(block))
+
+
+class DocumentRenderer:
+    """
+    Streams a document's blocks to a text file in one format.
+
+    Blocks are rendered and written one at a time, so a report with
+    thousands of tickets takes linear time and only one block's output is
+    held in memory.
+    """
+
+    def __init__(self, out):
+        self.out = out
+
+    def begin(self, title: str, metadata: List[Tuple[str, object]], spaced_title: bool = True):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+    def write(self, block):
+        if isinstance(block, Static):
+            self.out.write(_render_static(type(self), block.block))
+        else:
+            self.out.writelines(self.render(block))
+
+    @classmethod
+    def render(cls, block) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class MarkdownRenderer(DocumentRenderer):
+    def begin(self, title: str, metadata: List[Tuple[str, object]], spaced_title: bool = True):
+        self.out.write(f"\n# {title}\n" + ('\n' if spaced_title or not metadata else ''))
+        if metadata:
+            self.out.write(''.join(f"{label}: {value}\n" for label, value in metadata) + '\n')
+
+    @classmethod
+    def render(cls, block) -> Iterator[str]:
+        if isinstance(block, Heading):
+            yield (('\n' if block.set_off else '') + f"{'#' * block.level} {block.text}\n"
+                   + ('\n' if block.spaced else ''))
+        elif isinstance(block, Text):
+            yield f"{block.text}\n" + ('\n' if block.spaced else '')
+        elif isinstance(block, Fields):
+            for number, field in enumerate(block.fields, 1):
+                label, value, details = _field_parts(field)
+                bullet = f"{number}." if block.ordered else '-'
+                if _is_block(value):
+                    # Nested block, indented under its label and set off by a blank line
+                    nested = ''.join(cls.render(value)).rstrip('\n')
+                    indent = ' ' * (len(bullet) + 1)
+                    yield ('\n' if number > 1 else '') + f"{bullet} **{label}**\n" + ''.join(
+                        f"{indent}{line}\n" for line in nested.split('\n'))
+                else:
+                    yield (f"{bullet} **{label}:** {value}\n"
+                           + ''.join(f"  - {name}: {detail}\n" for name, detail in details)
+                           + ('\n' if block.spaced else ''))
+            if not block.spaced:
+                yield '\n'
+        elif isinstance(block, Items):
+            for index, item in enumerate(block.items):
+                text, details = item if isinstance(item, tuple) else (item, None)
+                if block.strong:
+                    text = f"**{text}**"
+                if details is None:
+                    yield f"- {text}\n"
+                else:
+                    # Items with details are set off by a blank line
+                    yield (('\n' if index else '') + f"- {text}\n"
+                           + ''.join(f"  - {label}: {value}\n" for label, value in details))
+            yield '\n'
+        elif isinstance(block, Checklist):
+            for item in block.items:
+                text, done = item if isinstance(item, tuple) else (item, False)
+                yield f"- [{'x' if done else ' '}] {text}\n"
+            yield '\n'
+        elif isinstance(block, Note):
+            yield f"> {block.text}\n\n"
+        elif isinstance(block, Rule):
+            yield "---\n"
+
+
+HTML_STYLE = """<style>
+body { font-family: -apple-system, 'Segoe UI', sans-serif; max-width: 60em; margin: 2em auto; line-height: 1.4; }
+.meta { color: #555; }
+blockquote { border-left: 4px solid #e0a800; margin-left: 0; padding-left: 1em; }
+ul.checklist { list-style: none; padding-left: 1em; }
+</style>"""
+
+
+class HtmlRenderer(DocumentRenderer):
+    def begin(self, title: str, metadata: List[Tuple[str, object]], spaced_title: bool = True):
+        self.out.write(f"<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+                       f"<title>{html.escape(title)}</title>\n{HTML_STYLE}\n</head>\n<body>\n"
+                       f"<h1>{html.escape(title)}</h1>\n")
+        if metadata:
+            self.out.write('<p class="meta">' + '<br>\n'.join(
+                f"{html.escape(label)}: {html.escape(str(value))}" for label, value in metadata) + '</p>\n')
+
+    def end(self):
+        self.out.write("</body>\n</html>\n")
+
+    @classmethod
+    def render(cls, block) -> Iterator[str]:
+        escape = html.escape
+        if isinstance(block, Heading):
+            yield f"<h{block.level}>{escape(block.text)}</h{block.level}>\n"
+        elif isinstance(block, Text):
+            yield f"<p>{escape(block.text).replace(chr(10), '<br>' + chr(10))}</p>\n"
+        elif isinstance(block, Fields):
+            tag = 'ol' if block.ordered else 'ul'
+            yield f"<{tag}>\n"
+            for field in block.fields:
+                label, value, details = _field_parts(field)
+                if _is_block(value):
+                    yield f"<li><strong>{escape(label)}</strong>\n{''.join(cls.render(value))}</li>\n"
+                else:
+                    yield f"<li><strong>{escape(label)}:</strong> {escape(str(value))}{cls._details(details)}</li>\n"
+            yield f"</{tag}>\n"
+        elif isinstance(block, Items):
+            yield "<ul>\n"
+            for item in block.items:
+                text, details = item if isinstance(item, tuple) else (item, ())
+                text = escape(str(text))
+                if block.strong:
+                    text = f"<strong>{text}</strong>"
+                yield f"<li>{text}{cls._details(details)}</li>\n"
+            yield "</ul>\n"
+        elif isinstance(block, Checklist):
+            yield '<ul class="checklist">\n'
+            for item in block.items:
+                text, done = item if isinstance(item, tuple) else (item, False)
+                yield (f"<li><input type=\"checkbox\" disabled{' checked' if done else ''}> "
+                       f"{escape(text)}</li>\n")
+            yield "</ul>\n"
+        elif isinstance(block, Note):
+            yield f"<blockquote>{escape(block.text)}</blockquote>\n"
+        elif isinstance(block, Rule):
+            yield "<hr>\n"
+
+    @staticmethod
+    def _details(details: Iterable) -> str:
+        details = ''.join(f"<li>{html.escape(label)}: {html.escape(str(value))}</li>" for label, value in details)
+        return f"<ul>{details}</ul>" if details else ''
+
+
+class JsonRenderer(DocumentRenderer):
+    """One JSON document: title, metadata and a list of typed blocks."""
+
+    def begin(self, title: str, metadata: List[Tuple[str, object]], spaced_title: bool = True):
+        self.out.write(f'{{"title": {json.dumps(title)}, "metadata": '
+                       f'{json.dumps({label: value for label, value in metadata}, default=str)}, "blocks": [\n')
+        self._first = True
+
+    def write(self, block):
+        if not self._first:
+            self.out.write(',\n')
+        self._first = False
+        super().write(block)
+
+    def end(self):
+        self.out.write('\n]}\n')
+
+    @classmethod
+    def render(cls, block) -> Iterator[str]:
+        kind = type(block).__name__.lower()
+        if isinstance(block, (Items, Checklist)):
+            # Stream long lists item by item
+            yield f'{{"type": "{kind}", "items": ['
+            for index, item in enumerate(block.items):
+                if isinstance(block, Checklist):
+                    text, done = item if isinstance(item, tuple) else (item, False)
+                    entry = {'text': text, 'done': done}
+                elif isinstance(item, tuple):
+                    entry = {'text': item[0], 'details': {label: value for label, value in item[1]}}
+                else:
+                    entry = {'text': item}
+                yield (', ' if index else '') + json.dumps(entry, default=str)
+            yield ']}'
+        elif isinstance(block, Fields):
+            fields = []
+            for field in block.fields:
+                label, value, details = _field_parts(field)
+                entry = {'label': label,
+                         'value': json.loads(''.join(cls.render(value))) if _is_block(value) else value}
+                if details:
+                    entry['details'] = {name: detail for name, detail in details}
+                fields.append(entry)
+            yield json.dumps({'type': kind, 'ordered': block.ordered, 'fields': fields}, default=str)
+        else:
+            # 'spaced' and 'set_off' only affect markdown layout
+            fields = {name: value for name, value in block._asdict().items()
+                      if name not in ('spaced', 'set_off')}
+            yield json.dumps(dict(fields, type=kind), default=str)
+
+
+# The fixed part of every customer transition document
+TRANSITION_BOILERPLATE = (
+    Heading(3, 'Critical Systems'),
+    Checklist(('Document primary systems and applications', 'Document network topology',
+               'Document backup/DR setup', 'Document monitoring configuration')),
+    Heading(3, 'Access Information'),
+    Checklist(('VPN credentials (stored in Keeper)', 'Admin portal URLs',
+               'Emergency contact list', 'Vendor relationships')),
+    Heading(2, 'Communication Preferences'),
+    Checklist(('Document preferred communication method', 'Document escalation preferences',
+               'Document meeting cadence', 'Document reporting preferences')),
+    Heading(2, 'Ongoing Initiatives'),
+    Checklist(('Document active projects', 'Document planned changes',
+               'Document known issues', 'Document upcoming renewals')),
+    Heading(2, 'Relationship Context'),
+    Heading(3, 'Customer Temperament'),
+    Text('_To be filled in by departing engineer_'),
+    Heading(3, 'Historical Issues & Resolutions'),
+    Text('_To be filled in by departing engineer_'),
+    Heading(3, 'Special Considerations'),
+    Text('_To be filled in by departing engineer_'),
+    Heading(2, 'Knowledge Transfer Checklist'),
+    Checklist(('Technical environment review completed', 'Access information verified',
+               'Communication preferences documented', 'Ongoing initiatives reviewed',
+               'First shadowed interaction scheduled', 'Customer introduction email sent')),
+    Heading(2, 'Transition Timeline'),
+    Fields((('Week 1', 'Knowledge transfer meeting'), ('Week 1', 'Customer introduction email'),
+            ('Week 2', 'First shadowed interaction'), ('Week 3', 'Independent management'),
+            ('Week 4', 'Transition review')), ordered=True),
+    Rule()
+)
+
+RENDERERS = {'markdown': MarkdownRenderer, 'html': HtmlRenderer, 'json': JsonRenderer}
+
+
+def write_document(basename: str, fmt: str, title: str,
+                   metadata: List[Tuple[str, object]], blocks: Iterable,
+                   spaced_title: bool = True) -> str:
+    """
+    Render a document to `basename` plus the format's extension.
+
+    Args:
+        basename: Output path without extension
+        fmt: 'markdown', 'html' or 'json'
+        title: Document title
+        metadata: (label, value) lines shown under the title
+        blocks: Blocks (Heading, Text, Fields, ...), typically a generator
+        spaced_title: Put a blank line between the title and the metadata
+                      (markdown only)
+
+    Returns:
+        The file written
+    """
+    filename = f"{basename}.{REPORT_FORMATS[fmt]}"
+    with open(filename, 'w', buffering=1 << 16) as f:
+        renderer = RENDERERS[fmt](f)
+        renderer.begin(title, metadata, spaced_title)
+        for block in blocks:
+            renderer.write(block)
+        renderer.end()
+    return filename
+
+
+class ApiClient:
+    """
+    Pooled HTTP client for one upstream API.
+
+    Every call goes through one keep-alive session (so bulk runs reuse TLS
+    connections), with connect/read timeouts and retries with exponential
+    backoff on connection errors and RETRY_STATUSES (honouring Retry-After).
+    Subclasses that use OAuth override _fetch_token(); the token is cached
+    until shortly before it expires and refreshed once on a 401.
+    """
+
+    auth_scheme = 'Bearer'
+
+    def __init__(self, base_url: str, http_settings: Optional[Dict] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        settings = dict(DEFAULT_HTTP_SETTINGS, **(http_settings or {}))
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (settings['connect_timeout'], settings['read_timeout'])
+        self.retries = settings['retries']
+        self.backoff = settings['backoff']
+
+        retry = Retry(total=settings['retries'], backoff_factor=settings['backoff'],
+                      status_forcelist=RETRY_STATUSES, respect_retry_after_header=True,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings['pool_size'], max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update(headers or {})
+
+        self._token = None
+        self._token_expires = 0.0
+        self._token_lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        raise NotImplementedError
+
+    def _fetch_token(self) -> Tuple[str, float]:
+        """Return a new access token and its lifetime in seconds."""
+        raise NotImplementedError
+
+    def token(self) -> str:
+        """Return the cached access token, fetching a new one if it is (nearly) expired."""
+        with self._token_lock:
+            if self._token is None or time.monotonic() >= self._token_expires:
+                token, lifetime = self._fetch_token()
+                self._token = token
+                self._token_expires = time.monotonic() + max(0.0, lifetime - TOKEN_EXPIRY_MARGIN)
+            return self._token
+
+    def invalidate_token(self):
+        with self._token_lock:
+            self._token = None
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Send a request to base_url + path.
+
+        Args:
+            method: HTTP method
+            path: Path under base_url, or an absolute URL
+            **kwargs: Passed through to requests (params, json, headers, ...)
+
+        Returns:
+            The response; HTTP errors are not raised
+        """
+        url = path if path.startswith(('http://', 'https://')) else f"{self.base_url}/{path.lstrip('/')}"
+        kwargs.setdefault('timeout', self.timeout)
+        extra_headers = kwargs.pop('headers', None) or {}
+
+        for attempt in range(2):
+            token = self.token()
+            headers = dict(extra_headers, Authorization=f"{self.auth_scheme} {token}")
+            response = self.session.request(method, url, headers=headers, **kwargs)
+            if response.status_code != 401 or attempt:
+                return response
+            # Revoked or expired early: drop the cached token and try once more
+            self.invalidate_token()
+        return response
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class ZohoClient(ApiClient):
+    """
+    Zoho Desk / Zoho Projects client.
+
+    Authenticates with a refresh token (client_id, client_secret,
+    refresh_token) when one is configured, refreshing the access token
+    through Zoho Accounts as it expires; otherwise uses the static api_token.
+    """
+
+    auth_scheme = 'Zoho-oauthtoken'
+
+    def __init__(self, settings: Dict, http_settings: Optional[Dict] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        super().__init__(settings.get('api_url', ''), http_settings, headers)
+        self.settings = settings
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.settings.get('refresh_token') or self.settings.get('api_token'))
+
+    def _fetch_token(self) -> Tuple[str, float]:
+        if not self.settings.get('refresh_token'):
+            return self.settings['api_token'], float('inf')
+
+        accounts_url = self.settings.get('accounts_url', 'https://accounts.zoho.com').rstrip('/')
+        response = self.session.post(f"{accounts_url}/oauth/v2/token", timeout=self.timeout, params={
+            'grant_type': 'refresh_token',
+            'refresh_token': self.settings['refresh_token'],
+            'client_id': self.settings['client_id'],
+            'client_secret': self.settings['client_secret']
+        })
+        response.raise_for_status()
+        data = response.json()
+        if 'access_token' not in data:
+            raise requests.exceptions.HTTPError(f"Zoho token refresh failed: {data.get('error', data)}",
+                                                response=response)
+        return data['access_token'], float(data.get('expires_in', 3600))
+
+
+class GraphRequest(NamedTuple):
+    """One operation of a Graph $batch."""
+    id: str
+    method: str
+    url: str                        # Relative to the API version, e.g. 'users/{id}'
+    body: Optional[Dict] = None
+    depends_on: Tuple[str, ...] = ()  # Ids that must succeed first
+
+
+class GraphResponse(NamedTuple):
+    status: int
+    body: Any
+    headers: Dict[str, str]
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def raise_for_status(self, what: str):
+        if not self.ok:
+            error = (self.body or {}).get('error', {}) if isinstance(self.body, dict) else {}
+            raise requests.exceptions.HTTPError(f"{what}: {self.status} {error.get('message', '')}".rstrip())
+
+
+class GraphClient(ApiClient):
+    """Microsoft Graph client using MSAL client-credentials tokens."""
+
+    def __init__(self, settings: Dict, http_settings: Optional[Dict] = None):
+        super().__init__(settings.get('api_url', 'https://graph.microsoft.com/v1.0'), http_settings)
+        self.settings = settings
+        self._app = None
+
+    @property
+    def configured(self) -> bool:
+        return all(self.settings.get(key) for key in ('tenant_id', 'client_id', 'client_secret'))
+
+    def _fetch_token(self) -> Tuple[str, float]:
+        if msal is None:
+            raise RuntimeError("msal is required for Microsoft Graph (pip install msal)")
+        if self._app is None:
+            # Share the pooled session with MSAL for its token endpoint calls too
+            self._app = msal.ConfidentialClientApplication(
+                self.settings['client_id'],
+                authority=f"https://login.microsoftonline.com/{self.settings['tenant_id']}",
+                client_credential=self.settings['client_secret'],
+                http_client=self.session,
+                timeout=self.timeout[1])
+        result = self._app.acquire_token_for_client(scopes=['https://graph.microsoft.com/.default'])
+        if 'access_token' not in result:
+            raise requests.exceptions.HTTPError(
+                f"Graph token request failed: {result.get('error_description', result.get('error'))}")
+        return result['access_token'], float(result.get('expires_in', 3600))
+
+    def iter_pages(self, path: str, **kwargs) -> Iterator[Dict]:
+        """Yield every item of a Graph collection, following @odata.nextLink."""
+        while path:
+            response = self.get(path, **kwargs)
+            response.raise_for_status()
+            data = response.json()
+            yield from data.get('value', [])
+            # nextLink already carries the query
+            path = data.get('@odata.nextLink')
+            kwargs.pop('params', None)
+
+    def batch(self, operations: Iterable[GraphRequest]) -> Dict[str, GraphResponse]:
+        """
+        Run operations through JSON $batch, GRAPH_BATCH_LIMIT per round-trip.
+
+        Operations go out in dependency order. A dependency in the same
+        batch is passed to Graph as dependsOn; one from an earlier batch has
+        already completed, and if it failed the dependent isn't sent and
+        gets 424 (Failed Dependency), as Graph itself answers. Operations
+        throttled individually (429/503/504, and their 424'd dependents) are
+        resent after Retry-After, each up to the configured retries.
+
+        Args:
+            operations: Operations with unique ids
+
+        Returns:
+            Dict mapping operation id to its GraphResponse
+
+        Raises:
+            ValueError: If ids repeat, or dependencies are unknown or cyclic
+            requests.exceptions.RequestException: If a $batch call itself fails
+        """
+        operations = list(operations)
+        by_id = {operation.id: operation for operation in operations}
+        if len(by_id) != len(operations):
+            raise ValueError("Graph batch operation ids must be unique")
+
+        # Each operation right after its dependencies, so they share a batch where possible
+        order, placed, visiting = [], set(), set()
+
+        def place(operation: GraphRequest):
+            if operation.id in placed:
+                return
+            if operation.id in visiting:
+                raise ValueError(f"Graph batch dependencies form a cycle at {operation.id}")
+            visiting.add(operation.id)
+            for dep in operation.depends_on:
+                if dep not in by_id:
+                    raise ValueError(f"Graph batch operation {operation.id} depends on unknown {dep}")
+                place(by_id[dep])
+            order.append(operation)
+            placed.add(operation.id)
+
+        for operation in operations:
+            place(operation)
+
+        results: Dict[str, GraphResponse] = {}
+        pending = order
+        attempts = dict.fromkeys(by_id, 0)
+        while pending:
+            chunk, chunk_ids, deferred = [], set(), []
+            for operation in pending:
+                failed = [dep for dep in operation.depends_on if dep in results and not results[dep].ok]
+                if failed:
+                    results[operation.id] = GraphResponse(424, {'error': {
+                        'code': 'failedDependency', 'message': f"depends on failed request {', '.join(failed)}"}}, {})
+                elif (len(chunk) < GRAPH_BATCH_LIMIT
+                      and all(dep in results or dep in chunk_ids for dep in operation.depends_on)):
+                    chunk.append(operation)
+                    chunk_ids.add(operation.id)
+                else:
+                    deferred.append(operation)
+            if not chunk:
+                break
+
+            payload = []
+            for operation in chunk:
+                entry = {'id': operation.id, 'method': operation.method, 'url': '/' + operation.url.lstrip('/')}
+                if operation.body is not None:
+                    entry['body'] = operation.body
+                    entry['headers'] = {'Content-Type': 'application/json'}
+                depends_on = [dep for dep in operation.depends_on if dep in chunk_ids]
+                if depends_on:
+                    entry['dependsOn'] = depends_on
+                payload.append(entry)
+
+            response = self.post('$batch', json={'requests': payload})
+            response.raise_for_status()
+            answers = {answer['id']: answer for answer in response.json().get('responses', [])}
+
+            throttled, wait_for = set(), 0.0
+            for operation in chunk:
+                answer = answers.get(operation.id, {'status': 500, 'body': None})
+                status = int(answer['status'])
+                if attempts[operation.id] < self.retries and (status in (429, 503, 504) or (
+                        status == 424 and any(dep in throttled for dep in operation.depends_on))):
+                    throttled.add(operation.id)
+                    attempts[operation.id] += 1
+                    headers = {key.lower(): value for key, value in (answer.get('headers') or {}).items()}
+                    try:
+                        wait_for = max(wait_for, float(headers.get('retry-after', 0)))
+                    except ValueError:
+                        pass
+                else:
+                    results[operation.id] = GraphResponse(status, answer.get('body'), answer.get('headers') or {})
+
+            if throttled:
+                time.sleep(wait_for or self.backoff * 2 ** max(attempts[op_id] for op_id in throttled))
+            # Keep dependency order across retries and deferrals
+            retry_ids = throttled | {operation.id for operation in deferred}
+            pending = [operation for operation in order if operation.id in retry_ids]
+
+        return results
+
+
+class JobStore:
+    """
+    SQLite record of off-boarding runs, their steps and cached upstream data.
+
+    Each run ('report' or 'revoke' for one employee) records its steps under
+    stable keys as they complete. Until a run finishes, the next run of the
+    same kind for that employee resumes it and skips the steps already done.
+    Fetched upstream data is cached separately and reused by any run for
+    `cache_ttl` seconds. The connection is opened on first use and shared
+    between threads under a lock.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            employee_id TEXT NOT NULL,
+            started REAL NOT NULL,
+            finished REAL
+        );
+        CREATE INDEX IF NOT EXISTS runs_by_employee ON runs (kind, employee_id, finished);
+        CREATE TABLE IF NOT EXISTS steps (
+            run_id INTEGER NOT NULL REFERENCES runs (id),
+            step_key TEXT NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            seconds REAL,
+            recorded REAL NOT NULL,
+            PRIMARY KEY (run_id, step_key)
+        );
+        CREATE TABLE IF NOT EXISTS cache (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            fetched REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path: str = DEFAULT_JOB_STORE, cache_ttl: float = DEFAULT_CACHE_TTL):
+        self.path = path
+        self.cache_ttl = cache_ttl
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._connection.executescript(self.SCHEMA)
+            self._connection.execute("DELETE FROM cache WHERE fetched < ?", (time.time() - self.cache_ttl,))
+        return self._connection
+
+    def unfinished_run(self, kind: str, employee_id: str) -> Optional[int]:
+        """Return the employee's latest unfinished run of this kind, without starting one."""
+        with self._lock:
+            return self._unfinished_run(self._db(), kind, employee_id)
+
+    @staticmethod
+    def _unfinished_run(db: sqlite3.Connection, kind: str, employee_id: str) -> Optional[int]:
+        row = db.execute("SELECT id FROM runs WHERE kind = ? AND employee_id = ? AND finished IS NULL "
+                         "ORDER BY id DESC LIMIT 1", (kind, employee_id)).fetchone()
+        return row[0] if row else None
+
+    def start_run(self, kind: str, employee_id: str, fresh: bool = False) -> Tuple[int, bool]:
+        """
+        Resume the employee's unfinished run of this kind, or start a new one.
+
+        Args:
+            fresh: Abandon any unfinished run and start over
+
+        Returns:
+            (run id, whether an unfinished run was resumed)
+        """
+        with self._lock:
+            db = self._db()
+            run_id = self._unfinished_run(db, kind, employee_id)
+            if run_id is not None and not fresh:
+                return run_id, True
+            if run_id is not None:
+                db.execute("UPDATE runs SET finished = ? WHERE kind = ? AND employee_id = ? AND finished IS NULL",
+                           (time.time(), kind, employee_id))
+            cursor = db.execute("INSERT INTO runs (kind, employee_id, started) VALUES (?, ?, ?)",
+                                (kind, employee_id, time.time()))
+            return cursor.lastrowid, False
+
+    def finish_run(self, run_id: int):
+        with self._lock:
+            self._db().execute("UPDATE runs SET finished = ? WHERE id = ?", (time.time(), run_id))
+
+    def record_step(self, run_id: int, step_key: str, status: str,
+                    result: object = None, seconds: Optional[float] = None):
+        """Record a step's outcome; recording the same key again replaces it."""
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO steps (run_id, step_key, status, result, seconds, recorded) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, step_key, status, json.dumps(result, default=str), seconds, time.time()))
+
+    def steps(self, run_id: int) -> Dict[str, Tuple[str, object, Optional[float]]]:
+        """Return {step key: (status, result, seconds)} for a run."""
+        with self._lock:
+            rows = self._db().execute("SELECT step_key, status, result, seconds FROM steps WHERE run_id = ?",
+                                      (run_id,)).fetchall()
+        return {key: (status, json.loads(result) if result else None, seconds)
+                for key, status, result, seconds in rows}
+
+    def cached(self, key: str) -> Optional[object]:
+        """Return cached data fetched within cache_ttl, else None."""
+        with self._lock:
+            row = self._db().execute("SELECT value FROM cache WHERE key = ? AND fetched >= ?",
+                                     (key, time.time() - self.cache_ttl)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def cache(self, key: str, value: object):
+        with self._lock:
+            self._db().execute("INSERT OR REPLACE INTO cache (key, value, fetched) VALUES (?, ?, ?)",
+                               (key, json.dumps(value, default=str), time.time()))
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+# Automated access revocation: checklist items mapped to actions that
+# perform them. Items without an action stay manual.
+
+class RevocationAction(NamedTuple):
+    run: Callable[['RevocationContext'], str]
+    upstream: str               # OffboardingAutomation client attribute, e.g. 'graph'
+    after: Tuple[str, ...] = ()  # Checklist items that must succeed first
+
+
+class RevocationContext(NamedTuple):
+    automation: Any
+    email: str
+    name: str
+    settings: Dict              # config "revocation"
+
+
+class StepResult(NamedTuple):
+    status: str                 # 'done', 'failed' or 'skipped'
+    detail: str
+    seconds: float
+
+
+REVOCATION_ACTIONS: Dict[str, RevocationAction] = {}
+
+
+def revocation_action(item: str, upstream: str, after: Iterable[str] = ()):
+    """
+    Register a function as the automated action for a checklist item.
+
+    The function receives a RevocationContext, raises on failure and
+    returns a short description of what it did.
+
+    Args:
+        item: ACCESS_CHECKLIST item the action performs
+        upstream: Client attribute on OffboardingAutomation it calls
+        after: Items that must have succeeded before it runs. If one of them
+               has no action of its own it is done by hand, so this action
+               is left manual as well
+    """
+    known = {entry for _, items in ACCESS_CHECKLIST for entry in items}
+    for name in (item, *after):
+        if name not in known:
+            raise ValueError(f"Not an access checklist item: {name}")
+
+    def register(run: Callable[[RevocationContext], str]):
+        REVOCATION_ACTIONS[item] = RevocationAction(run, upstream, tuple(after))
+        return run
+    return register
+
+
+def revocation_waves(actions: Dict[str, RevocationAction]) -> List[List[str]]:
+    """
+    Order actions into waves that can each run concurrently.
+
+    Dependencies on items outside `actions` are ignored.
+
+    Raises:
+        ValueError: If the dependencies form a cycle
+    """
+    remaining = {item: {dep for dep in action.after if dep in actions} for item, action in actions.items()}
+    waves = []
+    while remaining:
+        wave = [item for item, deps in remaining.items() if not deps]
+        if not wave:
+            raise ValueError(f"Revocation actions depend on each other in a cycle: {', '.join(remaining)}")
+        waves.append(wave)
+        for item in wave:
+            del remaining[item]
+        for deps in remaining.values():
+            deps.difference_update(wave)
+    return waves
+
+
+def run_revocation(actions: Dict[str, RevocationAction], context: RevocationContext,
+                   max_workers: int = DEFAULT_REVOCATION_WORKERS,
+                   on_result: Optional[Callable[[str, StepResult], None]] = None) -> Dict[str, StepResult]:
+    """
+    Run revocation actions concurrently, each as soon as its dependencies succeed.
+
+    An action whose dependency failed or was skipped is skipped, so a
+    failure never leaves later steps running against a half-revoked account.
+
+    Args:
+        actions: Checklist item -> action to run
+        context: Passed to every action
+        max_workers: Actions run at once
+        on_result: Called (item, result) from this thread as each action finishes
+
+    Returns:
+        Dict mapping each item to its StepResult
+    """
+    revocation_waves(actions)  # Reject cycles before touching anything
+    deps = {item: [dep for dep in action.after if dep in actions] for item, action in actions.items()}
+
+    def timed(item: str) -> StepResult:
+        started = time.perf_counter()
+        try:
+            detail = actions[item].run(context)
+            status = 'done'
+        except Exception as e:
+            detail, status = str(e) or type(e).__name__, 'failed'
+        return StepResult(status, detail, time.perf_counter() - started)
+
+    results: Dict[str, StepResult] = {}
+
+    def finish(item: str, result: StepResult):
+        results[item] = result
+        if on_result:
+            on_result(item, result)
+
+    pending = dict.fromkeys(actions)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+        while pending or running:
+            # Start everything whose dependencies are settled; skipping one can settle others
+            progress = True
+            while progress:
+                progress = False
+                for item in [item for item in pending if all(dep in results for dep in deps[item])]:
+                    del pending[item]
+                    blocked = [dep for dep in deps[item] if results[dep].status != 'done']
+                    if blocked:
+                        finish(item, StepResult('skipped', f"blocked by {', '.join(blocked)}", 0.0))
+                        progress = True
+                    else:
+                        running[executor.submit(timed, item)] = item
+
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+
+    return results
+
+
+def _graph_user(context: RevocationContext) -> str:
+    return f"users/{quote(context.email)}"
+
+
+@revocation_action('Microsoft Entra ID - Disable account', 'graph')
+def disable_entra_account(context: RevocationContext) -> str:
+    response = context.automation.graph.request('PATCH', _graph_user(context), json={'accountEnabled': False})
+    response.raise_for_status()
+    return "sign-in blocked"
+
+
+@revocation_action('Microsoft Entra ID - Revoke sign-in sessions', 'graph',
+                   after=['Microsoft Entra ID - Disable account'])
+def revoke_entra_sessions(context: RevocationContext) -> str:
+    response = context.automation.graph.post(f"{_graph_user(context)}/revokeSignInSessions")
+    response.raise_for_status()
+    return "refresh tokens and session cookies invalidated"
+
+
+@revocation_action('Microsoft Entra ID - Remove from security groups', 'graph',
+                   after=['Microsoft Entra ID - Disable account'])
+def remove_entra_groups(context: RevocationContext) -> str:
+    graph = context.automation.graph
+    user = _graph_user(context)
+
+    # Object id and first page of groups in one round-trip
+    lookup = graph.batch([
+        GraphRequest('user', 'GET', f"{user}?$select=id"),
+        GraphRequest('groups', 'GET', f"{user}/memberOf/microsoft.graph.group"
+                                      "?$select=id,displayName,groupTypes,onPremisesSyncEnabled")
+    ])
+    lookup['user'].raise_for_status("looking up user")
+    lookup['groups'].raise_for_status("listing groups")
+    user_id = lookup['user'].body['id']
+    groups = lookup['groups'].body.get('value', [])
+    if lookup['groups'].body.get('@odata.nextLink'):
+        groups += list(graph.iter_pages(lookup['groups'].body['@odata.nextLink']))
+
+    # Dynamic and on-premises groups can't be edited here
+    kept = [group for group in groups
+            if 'DynamicMembership' in group.get('groupTypes', []) or group.get('onPremisesSyncEnabled')]
+    removals = graph.batch(GraphRequest(group['id'], 'DELETE', f"groups/{group['id']}/members/{user_id}/$ref")
+                           for group in groups if group not in kept)
+
+    names = {group['id']: group.get('displayName', group['id']) for group in groups}
+    failed = [f"{names[group_id]} ({result.status})" for group_id, result in removals.items()
+              if not result.ok and result.status != 404]
+    if failed:
+        raise RuntimeError(f"removed from {len(removals) - len(failed)} group(s), failed: {', '.join(failed)}")
+
+    detail = f"removed from {len(removals)} group(s)"
+    if kept:
+        detail += f"; dynamic/synced groups left for review: {', '.join(names[group['id']] for group in kept)}"
+    return detail
+
+
+@revocation_action('Microsoft Entra ID - Revoke MFA methods', 'graph',
+                   after=['Microsoft Entra ID - Revoke sign-in sessions'])
+def revoke_entra_mfa(context: RevocationContext) -> str:
+    graph = context.automation.graph
+    user = _graph_user(context)
+    deletions = []
+    for method in graph.iter_pages(f"{user}/authentication/methods"):
+        endpoint = GRAPH_AUTH_METHOD_ENDPOINTS.get(method.get('@odata.type', '').rsplit('.', 1)[-1])
+        if endpoint is not None:
+            deletions.append(GraphRequest(method['id'], 'DELETE', f"{user}/authentication/{endpoint}/{method['id']}"))
+
+    results = graph.batch(deletions)
+    failed = [f"{method_id} ({result.status})" for method_id, result in results.items()
+              if not result.ok and result.status != 404]
+    if failed:
+        raise RuntimeError(f"could not remove method(s): {', '.join(failed)}")
+    return f"removed {len(results)} method(s)"
+
+
+@revocation_action('Exchange Online - Set auto-reply', 'graph')
+def set_exchange_auto_reply(context: RevocationContext) -> str:
+    message = context.settings.get('auto_reply', DEFAULT_AUTO_REPLY).format(name=context.name)
+    response = context.automation.graph.request('PATCH', f"{_graph_user(context)}/mailboxSettings", json={
+        'automaticRepliesSetting': {
+            'status': 'alwaysEnabled',
+            'internalReplyMessage': message,
+            'externalReplyMessage': message
+        }
+    })
+    response.raise_for_status()
+    return "auto-reply enabled"
+
+
+@revocation_action('Zoho Desk - Disable account', 'zoho_desk')
+def disable_zoho_desk_agent(context: RevocationContext) -> str:
+    zoho_desk = context.automation.zoho_desk
+    response = zoho_desk.get(f"agents/email/{quote(context.email)}")
+    response.raise_for_status()
+    agent_id = response.json()['id']
+    response = zoho_desk.post(f"agents/{agent_id}/deactivate")
+    response.raise_for_status()
+    return f"agent {agent_id} deactivated"
 
 
 class OffboardingAutomation:
     """Main class for off-boarding automation tasks"""
 
-    def __init__(self, config_file: str = "config.json"):
+    def __init__(self, config_file: str = "config.json",
+                 source_timeout: Optional[float] = None):
         """Initialize with configuration"""
         self.config = self._load_config(config_file)
         self.employee_data = {}
+        self.ticket_statuses = self.config['zoho_desk'].get('statuses', DEFAULT_TICKET_STATUSES)
+
+        # Output format of generated documents (see REPORT_FORMATS)
+        self.report_format = 'markdown'
+
+        # One pooled client per upstream, shared across a batch
+        http_settings = self.config.get('http', {})
+        self.zoho_desk = ZohoClient(self.config['zoho_desk'], http_settings,
+                                    headers={'orgId': self.config['zoho_desk'].get('org_id', '')})
+        self.zoho_projects = ZohoClient(self.config['zoho_projects'], http_settings)
+        self.graph = GraphClient(self.config.get('microsoft_graph', {}), http_settings)
+        self.source_timeouts = self.config.get('source_timeouts', {})
+        if source_timeout is not None:
+            self.source_timeouts = {source: source_timeout for source in SOURCE_LABELS}
+
+        # Runs resume from the job store, found relative to the config file rather
+        # than wherever the script is run from; an empty path keeps it in memory
+        # for this process only
+        job_store = self.config.get('job_store', {})
+        job_store_path = job_store.get('path', DEFAULT_JOB_STORE)
+        if job_store_path and job_store_path != ':memory:':
+            job_store_path = os.path.join(os.path.dirname(os.path.abspath(config_file)),
+                                          os.path.expanduser(job_store_path))
+        self.jobs = JobStore(job_store_path or ':memory:', job_store.get('cache_ttl', DEFAULT_CACHE_TTL))
+        # Ignore unfinished runs and cached data (--fresh)
+        self.fresh = False
 
     def _load_config(self, config_file: str) -> Dict:
         """Load configuration from file"""
@@ -53,115 +1246,207 @@ class OffboardingAutomation:
                     "api_url": "https://pinotage-api.centrastage.net",
                     "api_key": "",
                     "api_secret": ""
-                }
+                },
+                "http": {},
+                "job_store": {},
+                "source_timeouts": {}
             }
 
-    def generate_access_checklist(self, employee_id: str, employee_name: str) -> str:
-        """Generate comprehensive access revocation checklist"""
-
-        checklist = f"""
-# Access Revocation Checklist - {employee_name}
-Employee ID: {employee_id}
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## Identity & Authentication
-- [ ] Microsoft Entra ID - Disable account
-- [ ] Microsoft Entra ID - Revoke app registrations
-- [ ] Microsoft Entra ID - Remove from security groups
-- [ ] Microsoft Entra ID - Revoke MFA methods
-- [ ] Microsoft Entra ID - Remove from conditional access policies
-
-## Microsoft 365
-- [ ] Exchange Online - Set auto-reply
-- [ ] Exchange Online - Configure forwarding (if approved)
-- [ ] Exchange Online - Convert to shared mailbox
-- [ ] SharePoint/OneDrive - Transfer file ownership
-- [ ] SharePoint/OneDrive - Grant manager access
-- [ ] Microsoft Teams - Transfer team ownership
-- [ ] Microsoft Teams - Archive chat history
-
-## Security Tools
-- [ ] RocketCyber - Remove user account
-- [ ] ConnectSecure - Remove user access
-- [ ] ConnectSecure - Revoke API keys
-- [ ] Keeper Security - Transfer vault ownership
-- [ ] Keeper Security - Revoke account
-- [ ] KnowBe4 - Remove from campaigns
-
-## RMM & PSA
-- [ ] Datto RMM - Revoke account
-- [ ] Datto RMM - Transfer device ownership
-- [ ] Zoho Desk - Reassign tickets
-- [ ] Zoho Desk - Disable account
-- [ ] Zoho Projects - Reassign tasks
-- [ ] Zoho Projects - Transfer ownership
-
-## Network & Infrastructure
-- [ ] Cisco Meraki - Remove account
-- [ ] Ubiquiti UniFi - Remove credentials
-- [ ] Fortinet - Revoke VPN/admin access
-- [ ] Azure Portal - Remove from subscriptions
-- [ ] Azure Portal - Revoke RBAC roles
-- [ ] AWS Console - Remove IAM user (if applicable)
-
-## Backup & Documentation
-- [ ] Acronis - Remove account
-- [ ] OneNote - Transfer notebooks
-
-## Client Access
-- [ ] Customer VPNs - Audit and revoke
-- [ ] Customer Admin Portals - Transfer
-- [ ] Customer Cloud Tenants - Remove guest access
-
----
-Completed by: ___________________
-Date: ___________________
-Verified by: ___________________
-"""
+    def generate_access_checklist(self, employee_id: str, employee_name: str,
+                                  fmt: Optional[str] = None,
+                                  results: Optional[Dict[str, StepResult]] = None,
+                                  elapsed: Optional[float] = None) -> str:
+        """
+        Generate comprehensive access revocation checklist
 
-        # Save to file
-        filename = f"checklist_{employee_id}_{datetime.now().strftime('%Y%m%d')}.md"
-        with open(filename, 'w') as f:
-            f.write(checklist)
+        Args:
+            results: Outcomes of automated steps (see revoke_access()), ticked
+                     off and annotated with their timing
+            elapsed: Wall-clock seconds the automated steps took
+        """
+        results = results or {}
+
+        def annotated(item: str):
+            result = results.get(item)
+            if result is None:
+                return item
+            if result.status == 'done':
+                return f"{item} — {result.detail} ({result.seconds:.2f}s)", True
+            if result.status == 'failed':
+                return f"{item} — FAILED: {result.detail} ({result.seconds:.2f}s)", False
+            return f"{item} — skipped: {result.detail}", False
+
+        def blocks():
+            if results:
+                counts = {status: sum(result.status == status for result in results.values())
+                          for status in ('done', 'failed', 'skipped')}
+                yield Heading(2, 'Automated Revocation')
+                yield Fields([
+                    ('Steps completed', f"{counts['done']} of {len(results)}"),
+                    ('Failed', counts['failed']),
+                    ('Skipped', counts['skipped']),
+                    ('Time to revoke', f"{elapsed:.2f}s" if elapsed is not None else 'n/a'),
+                    ('Manual steps remaining', sum(len(items) for _, items in ACCESS_CHECKLIST) - counts['done'])
+                ])
+                if counts['failed'] or counts['skipped']:
+                    yield Note("⚠ Complete failed and skipped steps by hand.")
+
+            for section, items in ACCESS_CHECKLIST:
+                yield Static(Heading(2, section))
+                if any(item in results for item in items):
+                    yield Checklist([annotated(item) for item in items])
+                else:
+                    yield Static(Checklist(items))
+            yield Static(Rule())
+            yield Static(Text("Completed by: ___________________\n"
+                              "Date: ___________________\n"
+                              "Verified by: ___________________", spaced=False))
+
+        filename = write_document(
+            f"checklist_{employee_id}_{datetime.now().strftime('%Y%m%d')}", fmt or self.report_format,
+            f"Access Revocation Checklist - {employee_name}",
+            [('Employee ID', employee_id), ('Generated', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))],
+            blocks(), spaced_title=False)
 
         print(f"✓ Access revocation checklist generated: {filename}")
         return filename
 
-    def get_zoho_tickets(self, employee_email: str) -> List[Dict]:
-        """Query Zoho Desk for tickets assigned to employee"""
+    def revocation_plan(self) -> Tuple[Dict[str, RevocationAction], Dict[str, str]]:
+        """
+        Split the registered revocation actions by whether they can run.
 
-        if not self.config['zoho_desk']['api_token']:
-            print("⚠ Zoho Desk API not configured - using sample data")
-            return self._get_sample_tickets(employee_email)
+        Returns:
+            (actions whose upstream is configured and whose prerequisites
+            are automated too, {item: reason} for the rest)
+        """
+        runnable, unavailable = {}, {}
+        for item, action in REVOCATION_ACTIONS.items():
+            client = getattr(self, action.upstream, None)
+            manual = [name for name in action.after if name not in REVOCATION_ACTIONS]
+            if manual:
+                unavailable[item] = f"needs '{manual[0]}' done by hand first"
+            elif client is not None and client.configured:
+                runnable[item] = action
+            else:
+                unavailable[item] = f"{action.upstream} not configured"
+        return runnable, unavailable
 
-        try:
-            headers = {
-                'Authorization': f"Zoho-oauthtoken {self.config['zoho_desk']['api_token']}",
-                'orgId': self.config['zoho_desk']['org_id']
-            }
+    def revoke_access(self, employee_id: str, employee_name: str, employee_email: str,
+                      max_workers: int = DEFAULT_REVOCATION_WORKERS,
+                      dry_run: bool = False) -> Tuple[Dict[str, StepResult], Optional[str]]:
+        """
+        Run every automatable access checklist step, then write the checklist with the results.
 
-            # Query for open tickets assigned to employee
-            params = {
-                'assignee': employee_email,
-                'status': 'Open',
-                'limit': 100
-            }
+        Independent steps run concurrently; a step waits for the steps it
+        depends on (e.g. sessions are revoked only once the account is
+        disabled) and is skipped if one of them failed.
 
-            response = requests.get(
-                f"{self.config['zoho_desk']['api_url']}/tickets",
-                headers=headers,
-                params=params
-            )
+        Returns:
+            (results by checklist item, checklist file or None on a dry run)
+        """
+        actions, unavailable = self.revocation_plan()
 
-            if response.status_code == 200:
-                return response.json().get('data', [])
-            else:
-                print(f"⚠ Zoho Desk API error: {response.status_code}")
-                return self._get_sample_tickets(employee_email)
+        print(f"\n{'='*60}")
+        print(f"ACCESS REVOCATION: {employee_name} ({employee_email})")
+        print(f"{'='*60}\n")
+        for item, reason in unavailable.items():
+            print(f"⚠ Left manual, {reason}: {item}")
 
-        except Exception as e:
-            print(f"⚠ Error querying Zoho Desk: {e}")
-            return self._get_sample_tickets(employee_email)
+        if dry_run:
+            # A dry run only looks: it neither opens a run nor abandons an unfinished one
+            run_id = None if self.fresh else self.jobs.unfinished_run('revoke', employee_id)
+            resumed = run_id is not None
+        else:
+            run_id, resumed = self.jobs.start_run('revoke', employee_id, self.fresh)
+        previous = {item: StepResult(status, result, seconds or 0.0)
+                    for item, (status, result, seconds) in
+                    (self.jobs.steps(run_id).items() if run_id is not None else ())
+                    if status == 'done' and item in actions}
+        if resumed:
+            print(f"{'Would resume' if dry_run else 'Resuming'} unfinished run #{run_id}")
+        for item in previous:
+            print(f"✓ Already done in an earlier attempt: {item}")
+        # Steps are keyed by checklist item, so completed ones are never repeated
+        actions = {item: action for item, action in actions.items() if item not in previous}
+
+        if dry_run:
+            for number, wave in enumerate(revocation_waves(actions), 1):
+                print(f"\nWave {number}:")
+                for item in wave:
+                    print(f"   - {item}")
+            return {}, None
+
+        def report(item: str, result: StepResult):
+            # Recorded as each step finishes, so a killed run loses nothing already done
+            self.jobs.record_step(run_id, item, result.status, result.detail, result.seconds)
+            mark = '✓' if result.status == 'done' else '⚠'
+            print(f"{mark} {item}: {result.status}, {result.detail} ({result.seconds:.2f}s)")
+
+        context = RevocationContext(self, employee_email, employee_name, self.config.get('revocation', {}))
+        started = time.perf_counter()
+        results = dict(previous, **run_revocation(actions, context, max_workers, on_result=report))
+        elapsed = time.perf_counter() - started
+        if all(result.status == 'done' for result in results.values()):
+            self.jobs.finish_run(run_id)
+
+        failed = sum(result.status != 'done' for result in results.values())
+        print(f"\n✓ {len(results) - failed} of {len(results)} automated step(s) done in {elapsed:.2f}s"
+              + (f", {failed} need attention" if failed else ''))
+        checklist_file = self.generate_access_checklist(employee_id, employee_name, results=results,
+                                                        elapsed=elapsed)
+        return results, checklist_file
+
+    def get_zoho_tickets(self, employee_email: str,
+                         statuses: Optional[List[str]] = None) -> List[Dict]:
+        """Query Zoho Desk for every ticket assigned to employee"""
+        return list(self.iter_zoho_tickets(employee_email, statuses))
+
+    def iter_zoho_tickets(self, employee_email: Optional[str],
+                          statuses: Optional[List[str]] = None) -> Iterator[Dict]:
+        """
+        Stream tickets assigned to employee from Zoho Desk, page by page.
+
+        Pages through the whole backlog with from/limit, so nothing is
+        truncated however many tickets an engineer holds, and only one page
+        is in memory at a time. All requested statuses are fetched in the
+        same pass. Sample data is only used when Zoho Desk is not configured;
+        API errors are raised (requests.exceptions.RequestException).
+
+        Args:
+            employee_email: Assignee to list tickets for (None for every assignee)
+            statuses: Ticket statuses to include (default: config
+                      zoho_desk.statuses, otherwise Open)
+
+        Yields:
+            Ticket dictionaries
+        """
+        if not self.zoho_desk.configured:
+            print("⚠ Zoho Desk API not configured - using sample data")
+            yield from self._get_sample_tickets(employee_email)
+            return
+
+        # Query for tickets assigned to employee in any of the statuses
+        params = {
+            'status': ','.join(statuses or self.ticket_statuses),
+            'limit': ZOHO_DESK_PAGE_SIZE,
+            # Otherwise tickets carry only assigneeId, not who it is
+            'include': 'assignee'
+        }
+        if employee_email:
+            params['assignee'] = employee_email
+
+        start = 0
+        while True:
+            response = self.zoho_desk.get('tickets', params=dict(params, **{'from': start}))
+            response.raise_for_status()
+
+            # Zoho Desk answers 204 No Content once past the last ticket
+            page = response.json().get('data', []) if response.status_code != 204 else []
+            yield from page
+
+            if len(page) < ZOHO_DESK_PAGE_SIZE:
+                return
+            start += len(page)
 
     def _get_sample_tickets(self, employee_email: str) -> List[Dict]:
         """Return sample ticket data for demonstration"""
@@ -195,37 +1480,54 @@ Verified by: ___________________
             }
         ]
 
-    def get_zoho_projects(self, employee_email: str) -> List[Dict]:
-        """Query Zoho Projects for tasks assigned to employee"""
+    def get_zoho_tickets_by_assignee(self, employee_emails: Iterable[str],
+                                     statuses: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Fetch the tickets of many employees with a single paginated sweep.
 
-        if not self.config['zoho_projects']['api_token']:
-            print("⚠ Zoho Projects API not configured - using sample data")
-            return self._get_sample_projects(employee_email)
+        Lists every ticket in the requested statuses once and partitions them
+        by assignee, instead of querying Zoho Desk per employee.
 
-        try:
-            headers = {
-                'Authorization': f"Zoho-oauthtoken {self.config['zoho_projects']['api_token']}"
-            }
+        Returns:
+            Dict mapping each (lower-cased) employee email to its tickets
+        """
+        by_assignee = {email.lower(): [] for email in employee_emails}
 
-            portal_id = self.config['zoho_projects']['portal_id']
+        for ticket in self.iter_zoho_tickets(None, statuses):
+            # An object with emailId from the API (include=assignee), a plain email in sample data
+            assignee = ticket.get('assignee')
+            if isinstance(assignee, dict):
+                assignee = assignee.get('emailId')
+            tickets = by_assignee.get((assignee or '').lower())
+            if tickets is not None:
+                tickets.append(ticket)
 
-            # Query for active tasks
-            response = requests.get(
-                f"{self.config['zoho_projects']['api_url']}/portals/{portal_id}/tasks/",
-                headers=headers,
-                params={'assignee': employee_email, 'status': 'active'}
-            )
+        return by_assignee
 
-            if response.status_code == 200:
-                return response.json().get('tasks', [])
-            else:
-                print(f"⚠ Zoho Projects API error: {response.status_code}")
-                return self._get_sample_projects(employee_email)
+    def get_zoho_projects(self, employee_email: str) -> List[Dict]:
+        """
+        Query Zoho Projects for tasks assigned to employee
 
-        except Exception as e:
-            print(f"⚠ Error querying Zoho Projects: {e}")
+        Sample data is only used when Zoho Projects is not configured; API
+        errors are raised (requests.exceptions.RequestException), so a
+        report marks its project section incomplete instead of listing
+        sample tasks as the employee's.
+        """
+
+        if not self.zoho_projects.configured:
+            print("⚠ Zoho Projects API not configured - using sample data")
             return self._get_sample_projects(employee_email)
 
+        portal_id = self.config['zoho_projects']['portal_id']
+
+        # Query for active tasks
+        response = self.zoho_projects.get(
+            f"portals/{portal_id}/tasks/",
+            params={'assignee': employee_email, 'status': 'active'}
+        )
+        response.raise_for_status()
+        return response.json().get('tasks', [])
+
     def _get_sample_projects(self, employee_email: str) -> List[Dict]:
         """Return sample project data for demonstration"""
         return [
@@ -249,11 +1551,17 @@ Verified by: ___________________
             }
         ]
 
-    def analyze_tickets(self, tickets: List[Dict]) -> Dict:
-        """Analyze tickets and provide reassignment recommendations"""
+    def analyze_tickets(self, tickets: Iterable[Dict]) -> Dict:
+        """
+        Analyze tickets and provide reassignment recommendations
+
+        Tickets are tallied in a single pass, so a ticket stream (e.g.
+        iter_zoho_tickets()) is analyzed without holding the backlog in memory;
+        only critical tickets are kept.
+        """
 
         analysis = {
-            'total': len(tickets),
+            'total': 0,
             'by_priority': {'High': 0, 'Medium': 0, 'Low': 0},
             'by_customer': {},
             'critical_tickets': [],
@@ -261,6 +1569,7 @@ Verified by: ___________________
         }
 
         for ticket in tickets:
+            analysis['total'] += 1
             priority = ticket.get('priority', 'Medium')
             customer = ticket.get('customer', 'Unknown')
 
@@ -325,127 +1634,288 @@ Verified by: ___________________
             }
         ]
 
-    def suggest_reassignment(self, workload_data: Dict) -> List[Dict]:
-        """Suggest reassignment based on current team workload"""
+    def get_team_workload(self, team: List[Dict]) -> Dict[str, Dict]:
+        """
+        Count each engineer's open tickets and the customers they cover.
 
-        # This would integrate with actual team workload data
-        # For now, provide template for manual input
+        Uses one Zoho Desk sweep for the whole team. Without Zoho Desk the
+        profiles' own open_tickets/customers values are used.
 
-        print("⚠ Team workload data not available - using sample suggestions")
+        Returns:
+            Dict mapping engineer email (lower-cased) to its 'open_tickets'
+            count and 'customers' list
+        """
+        if not self.zoho_desk.configured:
+            print("⚠ Zoho Desk API not configured - using team profile workload")
+            return {member['email'].lower(): {'open_tickets': member['open_tickets'],
+                                              'customers': member['customers']}
+                    for member in team}
+
+        by_assignee = self.get_zoho_tickets_by_assignee(member['email'] for member in team)
+        return {email: {'open_tickets': len(tickets),
+                        'customers': sorted({ticket.get('customer', 'Unknown') for ticket in tickets})}
+                for email, tickets in by_assignee.items()}
+
+    def load_team(self, exclude: Iterable[str] = ()) -> List[Dict]:
+        """Load the team profiles from config team_roster (default: team/), minus the departing engineers."""
+        roster = self.config.get('team_roster', DEFAULT_TEAM_ROSTER)
+        team = load_team_profiles(roster, self.config.get('email_domain', DEFAULT_EMAIL_DOMAIN),
+                                  self.config.get('default_capacity', DEFAULT_TEAM_CAPACITY))
+        departing = {email.lower() for email in exclude}
+        return [member for member in team if member['email'].lower() not in departing]
 
-        return [
-            {
-                'engineer': 'John Smith',
-                'current_tickets': 12,
-                'current_customers': 8,
-                'specialties': ['Network', 'Security'],
-                'recommendation': 'Good fit for Acme Corp (network expertise)'
-            },
-            {
-                'engineer': 'Sarah Johnson',
-                'current_tickets': 8,
-                'current_customers': 6,
-                'specialties': ['M365', 'Cloud'],
-                'recommendation': 'Available capacity, cloud expertise'
-            },
-            {
-                'engineer': 'Mike Wilson',
-                'current_tickets': 15,
-                'current_customers': 10,
-                'specialties': ['General Support'],
-                'recommendation': 'At capacity - avoid additional assignments'
-            }
-        ]
+    def suggest_reassignment(self, workload_data: Dict) -> List[Dict]:
+        """
+        Suggest reassignment based on current team workload
+
+        Solves the departing engineer's tickets as a min-cost flow: tickets
+        are grouped by customer and required skill, and each group flows to
+        the engineers who can take it most cheaply given their skills, the
+        customers they already cover, their open-ticket load and their
+        capacity (see plan_reassignment()).
+
+        Args:
+            workload_data: 'tickets' to reassign, the 'team' profiles and
+                           optionally their current 'workload' (as returned
+                           by get_team_workload())
+
+        Returns:
+            One suggestion per engineer, including the tickets assigned to
+            them and an explanation for each assignment
+        """
+        team = workload_data.get('team', [])
+        if not team:
+            print("⚠ No team profiles found - cannot suggest reassignments")
+            return []
+
+        return plan_reassignment(workload_data.get('tickets', []), team, workload_data.get('workload'))
 
     def generate_customer_transition_doc(self, customer: Dict,
                                          departing_engineer: str,
-                                         new_engineer: str) -> str:
+                                         new_engineer: str,
+                                         fmt: Optional[str] = None) -> str:
         """Generate customer transition documentation"""
-
-        doc = f"""
-# Customer Transition Document
-
-## Transition Details
-- **Customer:** {customer.get('customer_name')}
-- **Customer ID:** {customer.get('customer_id')}
-- **Departing Engineer:** {departing_engineer}
-- **New Primary Contact:** {new_engineer}
-- **Transition Date:** {datetime.now().strftime('%Y-%m-%d')}
-- **Relationship Duration:** Since {customer.get('relationship_start')}
-
-## Customer Profile
-- **Tier:** {customer.get('tier')}
-- **Active Tickets:** {customer.get('active_tickets')}
-- **Active Projects:** {customer.get('active_projects')}
-- **Last Interaction:** {customer.get('last_interaction')}
-
-## Technical Environment
-{customer.get('technical_notes', 'No notes available')}
-
-### Critical Systems
-- [ ] Document primary systems and applications
-- [ ] Document network topology
-- [ ] Document backup/DR setup
-- [ ] Document monitoring configuration
-
-### Access Information
-- [ ] VPN credentials (stored in Keeper)
-- [ ] Admin portal URLs
-- [ ] Emergency contact list
-- [ ] Vendor relationships
-
-## Communication Preferences
-- [ ] Document preferred communication method
-- [ ] Document escalation preferences
-- [ ] Document meeting cadence
-- [ ] Document reporting preferences
-
-## Ongoing Initiatives
-- [ ] Document active projects
-- [ ] Document planned changes
-- [ ] Document known issues
-- [ ] Document upcoming renewals
-
-## Relationship Context
-### Customer Temperament
-_To be filled in by departing engineer_
-
-### Historical Issues & Resolutions
-_To be filled in by departing engineer_
-
-### Special Considerations
-_To be filled in by departing engineer_
-
-## Knowledge Transfer Checklist
-- [ ] Technical environment review completed
-- [ ] Access information verified
-- [ ] Communication preferences documented
-- [ ] Ongoing initiatives reviewed
-- [ ] First shadowed interaction scheduled
-- [ ] Customer introduction email sent
-
-## Transition Timeline
-1. **Week 1:** Knowledge transfer meeting
-2. **Week 1:** Customer introduction email
-3. **Week 2:** First shadowed interaction
-4. **Week 3:** Independent management
-5. **Week 4:** Transition review
-
----
-*Prepared by: {departing_engineer}*
-*Date: {datetime.now().strftime('%Y-%m-%d')}*
-"""
-
-        filename = f"customer_transition_{customer.get('customer_id')}_{datetime.now().strftime('%Y%m%d')}.md"
-        with open(filename, 'w') as f:
-            f.write(doc)
+        today = datetime.now().strftime('%Y-%m-%d')
+
+        def blocks():
+            yield Heading(2, 'Transition Details')
+            yield Fields([
+                ('Customer', customer.get('customer_name')),
+                ('Customer ID', customer.get('customer_id')),
+                ('Departing Engineer', departing_engineer),
+                ('New Primary Contact', new_engineer),
+                ('Transition Date', today),
+                ('Relationship Duration', f"Since {customer.get('relationship_start')}")
+            ])
+            yield Heading(2, 'Customer Profile')
+            yield Fields([
+                ('Tier', customer.get('tier')),
+                ('Active Tickets', customer.get('active_tickets')),
+                ('Active Projects', customer.get('active_projects')),
+                ('Last Interaction', customer.get('last_interaction'))
+            ])
+            yield Heading(2, 'Technical Environment')
+            yield Text(customer.get('technical_notes', 'No notes available'))
+            for block in TRANSITION_BOILERPLATE:
+                yield Static(block)
+            yield Text(f"*Prepared by: {departing_engineer}*\n*Date: {today}*", spaced=False)
+
+        filename = write_document(
+            f"customer_transition_{customer.get('customer_id')}_{datetime.now().strftime('%Y%m%d')}",
+            fmt or self.report_format, 'Customer Transition Document', [], blocks())
 
         print(f"✓ Customer transition document created: {filename}")
         return filename
 
+    @staticmethod
+    def _report_blocks(role: str, tickets: List[Dict], ticket_analysis: Dict, projects: List[Dict],
+                       customers: List[Dict], reassignment_suggestions: List[Dict],
+                       degraded: Dict[str, str], checklist_file: str) -> Iterator:
+        """Yield the full off-boarding report's blocks, section by section."""
+
+        def count(source: str, items: List) -> str:
+            return "unavailable" if source in degraded else str(len(items))
+
+        def degraded_note(source: str) -> Iterator[Note]:
+            if source in degraded:
+                yield Note(f"⚠ Incomplete: {SOURCE_LABELS[source]} unavailable ({degraded[source]}). "
+                           f"Re-run the report or check the source manually.")
+
+        summary = [
+            ('Total Open Tickets', count('tickets', tickets),
+             [(f"{priority} Priority", ticket_analysis['by_priority'][priority])
+              for priority in ('High', 'Medium', 'Low')]),
+            ('Active Project Tasks', count('projects', projects))
+        ]
+        if role == "helpdesk":
+            summary.append(('Customer Primary Contact Assignments', count('customers', customers)))
+        summary += [('Incomplete', f"{SOURCE_LABELS[source]} ({reason})") for source, reason in degraded.items()]
+
+        yield Heading(2, 'Summary', spaced=True)
+        yield Fields(summary, spaced=True)
+
+        yield Heading(2, 'IMMEDIATE ACTIONS REQUIRED', spaced=True)
+        yield Items(ticket_analysis['recommendations'] or ['None'])
+
+        yield Heading(2, 'TICKET REASSIGNMENT', spaced=True)
+        yield from degraded_note('tickets')
+        yield Heading(3, 'Tickets by Customer')
+        yield Fields((customer, f"{total} ticket(s)") for customer, total in ticket_analysis['by_customer'].items())
+
+        yield Heading(3, 'Critical Tickets Requiring Immediate Attention', spaced=True)
+        if ticket_analysis['critical_tickets']:
+            yield Items([f"#{ticket['id']}: {ticket['subject']} ({ticket['customer']})"
+                         for ticket in ticket_analysis['critical_tickets']])
+        else:
+            yield Text('_None_')
+
+        yield Heading(3, 'All Open Tickets', spaced=True)
+        yield Items((f"#{ticket['id']}: {ticket['subject']}",
+                     [('Customer', ticket['customer']), ('Priority', ticket['priority']),
+                      ('Status', ticket['status']), ('Created', ticket['created_date'])])
+                    for ticket in tickets)
+
+        yield Heading(2, 'PROJECT ASSIGNMENTS', spaced=True)
+        yield from degraded_note('projects')
+        yield Items(((project['name'],
+                      [('Project', project['project']), ('Priority', project['priority']),
+                       ('Due', project['due_date']), ('Status', project['status'])])
+                     for project in projects), strong=True)
+
+        if role == "helpdesk" and (customers or 'customers' in degraded):
+            yield Heading(2, 'CUSTOMER PRIMARY CONTACT ASSIGNMENTS', spaced=True)
+            yield from degraded_note('customers')
+            for customer in customers:
+                yield Heading(3, customer['customer_name'])
+                yield Fields([
+                    ('Customer ID', customer['customer_id']),
+                    ('Tier', customer['tier']),
+                    ('Relationship Start', customer['relationship_start']),
+                    ('Active Tickets', customer['active_tickets']),
+                    ('Active Projects', customer['active_projects']),
+                    ('Last Interaction', customer['last_interaction']),
+                    ('Notes', customer['technical_notes'])
+                ])
+
+        yield Heading(2, 'REASSIGNMENT SUGGESTIONS', spaced=True)
+        yield from degraded_note('workload')
+        for suggestion in reassignment_suggestions:
+            yield Heading(3, suggestion['engineer'])
+            yield Fields([
+                ('Current Load', f"{suggestion['current_tickets']} tickets, "
+                                 f"{suggestion['current_customers']} customers"),
+                ('Specialties', ', '.join(suggestion['specialties']) or 'None listed'),
+                ('Recommendation', suggestion['recommendation'],
+                 [(assignment['customer'], f"{', '.join('#' + ticket_id for ticket_id in assignment['ticket_ids'])}"
+                                           f" - {assignment['explanation']}")
+                  for assignment in suggestion['assignments']])
+            ])
+
+        yield Heading(2, 'NEXT STEPS', spaced=True, set_off=True)
+        yield Fields([
+            ('Immediate (within 24 hours):', Checklist([
+                'Review and approve reassignment plan',
+                f"Execute access revocation checklist (see {checklist_file})",
+                'Reassign high-priority tickets',
+                'Notify affected customers'])),
+            ('Short-term (within 1 week):', Checklist(NEXT_STEPS_SHORT_TERM)),
+            ('Medium-term (within 2-4 weeks):', Checklist(NEXT_STEPS_MEDIUM_TERM))
+        ], ordered=True)
+
+        yield Heading(2, 'FILES GENERATED', spaced=True)
+        yield Items([f"Access Revocation Checklist: {checklist_file}", "Off-boarding Report: [this file]"])
+        yield Static(Rule())
+        yield Static(Text("*Generated by MCC Off-boarding Automation v1.0*", spaced=False))
+
+    def _cache_key(self, source: str, employee_email: str) -> str:
+        key = f"{source}:{employee_email.lower()}"
+        if source in ('tickets', 'workload'):
+            key += f":{','.join(self.ticket_statuses)}"
+        return key
+
+    def cacheable(self, source: str) -> bool:
+        """Whether a source currently returns live data; sample data is never cached or reused."""
+        upstream = SOURCE_UPSTREAMS.get(source)
+        return upstream is not None and getattr(self, upstream).configured
+
+    def cached_source(self, source: str, employee_email: str) -> Optional[object]:
+        """Return the employee's data for a source if fetched within the cache TTL (unless --fresh)."""
+        if self.fresh or not self.cacheable(source):
+            return None
+        return self.jobs.cached(self._cache_key(source, employee_email))
+
+    def gather_sources(self, sources: Dict[str, Callable[[], object]]) -> Tuple[Dict, Dict]:
+        """
+        Fetch independent report data sources concurrently.
+
+        Each source gets its own timeout (config 'source_timeouts', default
+        DEFAULT_SOURCE_TIMEOUT seconds) counted from when the fetch started, so
+        the total wait is bounded by the slowest source. A source that times
+        out or fails does not hold up the others; it is reported as degraded.
+
+        Each source runs on a daemon thread. A fetch that overruns its
+        timeout cannot be interrupted, so it carries on in the background,
+        bounded by the API clients' per-request timeouts, and its result is
+        discarded; being a daemon thread, it never holds up the process
+        exiting.
+
+        Returns:
+            (results, degraded): results by source name, and for each source
+            that did not finish, the reason
+        """
+        results = {}
+        degraded = {}
+        if not sources:
+            return results, degraded
+
+        def run(fetch: Callable[[], object], future: Future):
+            try:
+                future.set_result(fetch())
+            except Exception as e:
+                future.set_exception(e)
+
+        started = time.monotonic()
+        futures = {}
+        for name, fetch in sources.items():
+            futures[name] = Future()
+            # Not a ThreadPoolExecutor: its workers are joined at exit, so a
+            # hung source would keep the process alive after the report is done
+            threading.Thread(target=run, args=(fetch, futures[name]), name=f"source-{name}", daemon=True).start()
+
+        # Wait on the shortest deadlines first so none is overrun
+        timeouts = {name: self.source_timeouts.get(name, DEFAULT_SOURCE_TIMEOUT) for name in futures}
+        for name in sorted(futures, key=timeouts.get):
+            remaining = max(0.0, started + timeouts[name] - time.monotonic())
+            try:
+                results[name] = futures[name].result(timeout=remaining)
+            except FutureTimeout:
+                degraded[name] = f"timed out after {timeouts[name]:g}s"
+            except Exception as e:
+                degraded[name] = f"failed: {e}"
+
+        for name, reason in degraded.items():
+            print(f"⚠ {SOURCE_LABELS.get(name, name)} unavailable ({reason}) - report section degraded")
+
+        return results, degraded
+
     def generate_full_report(self, employee_id: str, employee_name: str,
-                           employee_email: str, role: str = "helpdesk") -> str:
-        """Generate comprehensive off-boarding report"""
+                           employee_email: str, role: str = "helpdesk",
+                           prefetched: Optional[Dict] = None,
+                           departing: Iterable[str] = ()) -> str:
+        """
+        Generate comprehensive off-boarding report
+
+        Args:
+            prefetched: Data already fetched for this employee (e.g. by a
+                        batch run), keyed by source name; those sources are
+                        not queried again. A prefetched 'workload' is
+                        updated in place with the tickets this report
+                        assigns, so the next report of a batch plans
+                        against it.
+            departing: Other engineers leaving at the same time, who are
+                       not given any tickets
+        """
+        ledger = (prefetched or {}).get('workload')
 
         print(f"\n{'='*60}")
         print(f"GENERATING OFF-BOARDING REPORT")
@@ -453,150 +1923,95 @@ _To be filled in by departing engineer_
         print(f"Role: {role}")
         print(f"{'='*60}\n")
 
+        run_id, resumed = self.jobs.start_run('report', employee_id, self.fresh)
+        done = {key: result for key, (status, result, _) in self.jobs.steps(run_id).items() if status == 'done'}
+        if resumed:
+            print(f"Resuming unfinished run #{run_id} ({len(done)} step(s) already done)\n")
+
         # Generate access checklist
         print("1. Generating access revocation checklist...")
-        checklist_file = self.generate_access_checklist(employee_id, employee_name)
-
-        # Get tickets
-        print("\n2. Retrieving assigned tickets...")
-        tickets = self.get_zoho_tickets(employee_email)
-        ticket_analysis = self.analyze_tickets(tickets)
-
-        print(f"   Found {ticket_analysis['total']} open tickets:")
-        for priority, count in ticket_analysis['by_priority'].items():
-            if count > 0:
-                print(f"   - {priority} priority: {count}")
+        if done.get('checklist') and os.path.exists(done['checklist']):
+            checklist_file = done['checklist']
+            print(f"✓ Access revocation checklist already generated: {checklist_file}")
+        else:
+            checklist_file = self.generate_access_checklist(employee_id, employee_name)
+            self.jobs.record_step(run_id, 'checklist', 'done', checklist_file)
 
-        # Get projects
-        print("\n3. Retrieving project assignments...")
-        projects = self.get_zoho_projects(employee_email)
-        print(f"   Found {len(projects)} active project tasks")
+        team = self.load_team([employee_email, *departing])
 
-        # Get customer assignments (for helpdesk role)
-        customers = []
+        # None of the data sources depend on each other, so fetch them all at once
+        print("\n2. Retrieving tickets, projects, customers and team workload...")
+        sources = {
+            'tickets': lambda: self.get_zoho_tickets(employee_email),
+            'projects': lambda: self.get_zoho_projects(employee_email),
+            'workload': lambda: self.get_team_workload(team)
+        }
         if role == "helpdesk":
-            print("\n4. Identifying customer primary contact assignments...")
-            customers = self.get_customer_assignments(employee_email)
-            print(f"   Found {len(customers)} customer assignments")
-            for customer in customers:
-                print(f"   - {customer['customer_name']} ({customer['tier']} tier)")
-
-        # Generate recommendations
-        print("\n5. Generating reassignment recommendations...")
-        reassignment_suggestions = self.suggest_reassignment({})
-
-        # Create comprehensive report
-        report = f"""
-# OFF-BOARDING REPORT: {employee_name}
-
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Employee ID: {employee_id}
-Email: {employee_email}
-Role: {role}
-
-## Summary
-
-- **Total Open Tickets:** {ticket_analysis['total']}
-  - High Priority: {ticket_analysis['by_priority']['High']}
-  - Medium Priority: {ticket_analysis['by_priority']['Medium']}
-  - Low Priority: {ticket_analysis['by_priority']['Low']}
-
-- **Active Project Tasks:** {len(projects)}
-
-{"- **Customer Primary Contact Assignments:** " + str(len(customers)) if role == "helpdesk" else ""}
-
-## IMMEDIATE ACTIONS REQUIRED
-
-{chr(10).join(['- ' + rec for rec in ticket_analysis['recommendations']])}
-
-## TICKET REASSIGNMENT
-
-### Tickets by Customer
-"""
-
-        for customer, count in ticket_analysis['by_customer'].items():
-            report += f"- **{customer}:** {count} ticket(s)\n"
-
-        report += "\n### Critical Tickets Requiring Immediate Attention\n\n"
-
-        for ticket in ticket_analysis['critical_tickets']:
-            report += f"- #{ticket['id']}: {ticket['subject']} ({ticket['customer']})\n"
-
-        if not ticket_analysis['critical_tickets']:
-            report += "_None_\n"
-
-        report += "\n### All Open Tickets\n\n"
-        for ticket in tickets:
-            report += f"- #{ticket['id']}: {ticket['subject']}\n"
-            report += f"  - Customer: {ticket['customer']}\n"
-            report += f"  - Priority: {ticket['priority']}\n"
-            report += f"  - Status: {ticket['status']}\n"
-            report += f"  - Created: {ticket['created_date']}\n\n"
-
-        report += "## PROJECT ASSIGNMENTS\n\n"
-
-        for project in projects:
-            report += f"- **{project['name']}**\n"
-            report += f"  - Project: {project['project']}\n"
-            report += f"  - Priority: {project['priority']}\n"
-            report += f"  - Due: {project['due_date']}\n"
-            report += f"  - Status: {project['status']}\n\n"
-
-        if role == "helpdesk" and customers:
-            report += "## CUSTOMER PRIMARY CONTACT ASSIGNMENTS\n\n"
+            sources['customers'] = lambda: self.get_customer_assignments(employee_email)
+
+        # Data fetched recently (by an interrupted run, or a batch) isn't fetched again
+        prefetched = dict(prefetched or {})
+        for name in sources:
+            if name not in prefetched:
+                cached = self.cached_source(name, employee_email)
+                if cached is not None:
+                    print(f"✓ Reusing {SOURCE_LABELS[name]} fetched within the last {self.jobs.cache_ttl:g}s")
+                    prefetched[name] = cached
+
+        results, degraded = self.gather_sources(
+            {name: fetch for name, fetch in sources.items() if name not in prefetched})
+        for name, data in results.items():
+            if self.cacheable(name):
+                self.jobs.cache(self._cache_key(name, employee_email), data)
+        results.update((name, data) for name, data in prefetched.items() if name in sources)
+        for name in sources:
+            if name in degraded:
+                self.jobs.record_step(run_id, f"source:{name}", 'failed', degraded[name])
+            else:
+                self.jobs.record_step(run_id, f"source:{name}", 'done')
 
+        tickets = results.get('tickets', [])
+        ticket_analysis = self.analyze_tickets(tickets)
+        projects = results.get('projects', [])
+        customers = results.get('customers', [])
+
+        # Plan reassignments from the fetched tickets and team load
+        print("\n3. Planning ticket reassignments...")
+        reassignment_suggestions = self.suggest_reassignment(
+            {'tickets': tickets, 'team': team, 'workload': results.get('workload')})
+        if ledger is not None:
+            add_assigned_load(ledger, reassignment_suggestions)
+
+        if 'tickets' not in degraded:
+            print(f"\n4. Found {ticket_analysis['total']} open tickets:")
+            for priority, count in ticket_analysis['by_priority'].items():
+                if count > 0:
+                    print(f"   - {priority} priority: {count}")
+
+        if 'projects' not in degraded:
+            print(f"\n5. Found {len(projects)} active project tasks")
+
+        # Customer assignments (for helpdesk role)
+        if role == "helpdesk" and 'customers' not in degraded:
+            print(f"\n6. Found {len(customers)} customer primary contact assignments")
             for customer in customers:
-                report += f"### {customer['customer_name']}\n"
-                report += f"- **Customer ID:** {customer['customer_id']}\n"
-                report += f"- **Tier:** {customer['tier']}\n"
-                report += f"- **Relationship Start:** {customer['relationship_start']}\n"
-                report += f"- **Active Tickets:** {customer['active_tickets']}\n"
-                report += f"- **Active Projects:** {customer['active_projects']}\n"
-                report += f"- **Last Interaction:** {customer['last_interaction']}\n"
-                report += f"- **Notes:** {customer['technical_notes']}\n\n"
-
-        report += "## REASSIGNMENT SUGGESTIONS\n\n"
-
-        for suggestion in reassignment_suggestions:
-            report += f"### {suggestion['engineer']}\n"
-            report += f"- **Current Load:** {suggestion['current_tickets']} tickets, {suggestion['current_customers']} customers\n"
-            report += f"- **Specialties:** {', '.join(suggestion['specialties'])}\n"
-            report += f"- **Recommendation:** {suggestion['recommendation']}\n\n"
-
-        report += f"""
-## NEXT STEPS
-
-1. **Immediate (within 24 hours):**
-   - [ ] Review and approve reassignment plan
-   - [ ] Execute access revocation checklist (see {checklist_file})
-   - [ ] Reassign high-priority tickets
-   - [ ] Notify affected customers
-
-2. **Short-term (within 1 week):**
-   - [ ] Complete all ticket reassignments
-   - [ ] Complete all project task reassignments
-   - [ ] Generate customer transition documents
-   - [ ] Send customer introduction emails
-
-3. **Medium-term (within 2-4 weeks):**
-   - [ ] Complete knowledge transfer for all customers
-   - [ ] Monitor transition success
-   - [ ] Address any transition issues
-   - [ ] Close off-boarding ticket
-
-## FILES GENERATED
-
-- Access Revocation Checklist: {checklist_file}
-- Off-boarding Report: [this file]
-
----
-*Generated by MCC Off-boarding Automation v1.0*
-"""
+                print(f"   - {customer['customer_name']} ({customer['tier']} tier)")
 
-        # Save report
-        report_file = f"offboarding_report_{employee_id}_{datetime.now().strftime('%Y%m%d')}.md"
-        with open(report_file, 'w') as f:
-            f.write(report)
+        report_file = write_document(
+            f"offboarding_report_{employee_id}_{datetime.now().strftime('%Y%m%d')}", self.report_format,
+            f"OFF-BOARDING REPORT: {employee_name}",
+            [('Generated', datetime.now().strftime('%Y-%m-%d %H:%M:%S')), ('Employee ID', employee_id),
+             ('Email', employee_email), ('Role', role)],
+            self._report_blocks(role, tickets, ticket_analysis, projects, customers,
+                                reassignment_suggestions, degraded, checklist_file))
+        self.jobs.record_step(run_id, 'report', 'done', report_file)
+
+        # A degraded report leaves the run open, so the next one retries only what failed
+        if degraded:
+            retry = ', '.join(SOURCE_LABELS[name] for name in degraded)
+            print(f"\n⚠ Run #{run_id} left open: re-run to retry {retry}")
+        else:
+            self.jobs.finish_run(run_id)
 
         print(f"\n{'='*60}")
         print(f"✓ REPORT COMPLETE")
@@ -612,6 +2027,477 @@ Role: {role}
 
         return report_file
 
+    def fetch_batch_data(self, employees: List[Dict],
+                         parallel: int = DEFAULT_BATCH_PARALLELISM) -> Dict[str, Dict]:
+        """
+        Fetch Zoho data for a whole batch of departing employees up front.
+
+        Tickets for everyone come from one bulk sweep partitioned by assignee;
+        project tasks (which Zoho Projects can't query in bulk) are fetched for
+        `parallel` employees at a time over the pooled client. Failures are
+        left out, so the affected reports query (and degrade) on their own.
+
+        Returns:
+            Dict mapping employee ID to prefetched data for generate_full_report()
+        """
+        prefetched = {employee['employee_id']: {} for employee in employees}
+
+        # Reuse what an earlier, interrupted batch already fetched
+        for employee in employees:
+            for source in ('tickets', 'projects', 'workload'):
+                cached = self.cached_source(source, employee['email'])
+                if cached is not None:
+                    prefetched[employee['employee_id']][source] = cached
+
+        def missing(source: str) -> List[Dict]:
+            return [employee for employee in employees if source not in prefetched[employee['employee_id']]]
+
+        if self.zoho_desk.configured and (missing('tickets') or missing('workload')):
+            # The same sweep yields the remaining team's workload
+            team = self.load_team(employee['email'] for employee in employees)
+            print(f"Sweeping Zoho Desk tickets for {len(employees)} employee(s) and {len(team)} engineer(s)...")
+            try:
+                by_assignee = self.get_zoho_tickets_by_assignee(
+                    [employee['email'] for employee in employees] + [member['email'] for member in team])
+                workload = {member['email'].lower(): {
+                    'open_tickets': len(by_assignee[member['email'].lower()]),
+                    'customers': sorted({ticket.get('customer', 'Unknown')
+                                         for ticket in by_assignee[member['email'].lower()]})}
+                    for member in team}
+                for employee in employees:
+                    data = {'tickets': by_assignee[employee['email'].lower()], 'workload': workload}
+                    prefetched[employee['employee_id']].update(data)
+                    for source, value in data.items():
+                        self.jobs.cache(self._cache_key(source, employee['email']), value)
+            except requests.exceptions.RequestException as e:
+                print(f"⚠ Bulk ticket sweep failed, tickets will be queried per employee: {e}")
+
+        if self.zoho_projects.configured and missing('projects'):
+            print(f"Fetching Zoho Projects tasks, {parallel} employee(s) at a time...")
+            with ThreadPoolExecutor(max_workers=parallel) as executor:
+                futures = {employee['employee_id']: (employee,
+                                                     executor.submit(self.get_zoho_projects, employee['email']))
+                           for employee in missing('projects')}
+                for employee_id, (employee, future) in futures.items():
+                    try:
+                        prefetched[employee_id]['projects'] = future.result()
+                        self.jobs.cache(self._cache_key('projects', employee['email']),
+                                        prefetched[employee_id]['projects'])
+                    except Exception as e:
+                        print(f"⚠ Error fetching project tasks for {employee_id}: {e}")
+
+        return prefetched
+
+    def run_batch(self, employees: List[Dict],
+                  parallel: int = DEFAULT_BATCH_PARALLELISM) -> List[Tuple[Dict, Optional[str]]]:
+        """
+        Off-board a batch of employees in one run.
+
+        Upstream data is fetched once for the whole batch (see
+        fetch_batch_data()), then every report is written in a single pass.
+
+        Returns:
+            List of (employee, report file) pairs; the file is None if the
+            employee's report could not be generated
+        """
+        print(f"\nOff-boarding batch of {len(employees)} employee(s)\n")
+        prefetched = self.fetch_batch_data(employees, parallel)
+        departing = [employee['email'] for employee in employees]
+
+        # One workload ledger for the whole batch, so each report sees the
+        # tickets the earlier ones handed out
+        team = self.load_team(departing)
+        workload = next((data['workload'] for data in prefetched.values() if 'workload' in data), None)
+        if workload is None:
+            try:
+                workload = self.get_team_workload(team)
+            except requests.exceptions.RequestException as e:
+                print(f"⚠ Team workload unavailable, reports will plan independently: {e}")
+        if workload is not None:
+            ledger = {member['email'].lower(): dict(workload.get(member['email'].lower()) or {
+                'open_tickets': member['open_tickets'], 'customers': member['customers']}) for member in team}
+            for data in prefetched.values():
+                data['workload'] = ledger
+
+        reports = []
+        for employee in employees:
+            try:
+                report_file = self.generate_full_report(
+                    employee['employee_id'], employee['name'], employee['email'],
+                    employee.get('role') or 'helpdesk', prefetched[employee['employee_id']], departing)
+            except Exception as e:
+                print(f"⚠ Error generating report for {employee['employee_id']}: {e}")
+                report_file = None
+            reports.append((employee, report_file))
+
+        print(f"\n{'='*60}")
+        print(f"BATCH COMPLETE: {sum(1 for _, report in reports if report)}/{len(reports)} report(s)")
+        print(f"{'='*60}")
+        for employee, report_file in reports:
+            print(f"  {'✓' if report_file else '⚠'} {employee['name']} ({employee['employee_id']}): "
+                  f"{report_file or 'failed'}")
+
+        return reports
+
+
+def ticket_skills(ticket: Dict) -> FrozenSet[str]:
+    """Skills a ticket calls for, from keywords in its subject and category."""
+    text = f"{ticket.get('subject', '')} {ticket.get('category', '')}".lower()
+    return frozenset(skill for skill, keywords in SKILL_KEYWORDS.items()
+                     if any(keyword in text for keyword in keywords))
+
+
+def profile_skills(labels: Iterable[str]) -> FrozenSet[str]:
+    """Map free-form profile skills ('Networking', 'Exchange') onto SKILL_KEYWORDS skills."""
+    skills = set()
+    for label in labels:
+        label = str(label).lower()
+        skills.add(label)
+        skills.update(skill for skill, keywords in SKILL_KEYWORDS.items()
+                      if skill in label or label in keywords)
+    return frozenset(skills)
+
+
+def _assign_units(sizes: List[int], costs: List[List[int]], base: List[int], step: List[int],
+                  room: List[int]) -> List[List[int]]:
+    """
+    Place every unit of every class on a target at minimum total cost.
+
+    A unit of class k on target t costs costs[k][t], plus the target's
+    marginal cost: its n-th unit (counting from 0) costs base[t] + n * step[t],
+    and it takes at most room[t] units. One target must have room for every
+    unit (e.g. "unassigned"), so everything is placed.
+
+    Successive shortest paths, one unit at a time, class by class. A new
+    unit either lands on a target with room or displaces a unit already
+    there, which moves on to another target, and so on down a chain. Moving a
+    unit of class k from target a to b costs costs[k][b] - costs[k][a], so
+    the whole residual network reduces to one node per target, with the
+    cheapest movable class for each pair: a graph the size of the team
+    however many tickets and customers there are. Moves can cost less than
+    nothing, so chains are found with Bellman-Ford; placing each unit along a
+    cheapest chain never leaves a cheaper rearrangement behind. Ties go to
+    the chain with the fewest moves, then to the lowest-numbered target, so
+    the same inputs always give the same placement.
+
+    Returns:
+        counts[k][t]: units of class k placed on target t
+    """
+    targets = range(len(base))
+    # Costs are scaled so that every move can add one without outweighing a
+    # real cost difference: a chain visits each target at most once
+    scale = len(base) + 1
+    counts = [[0] * len(base) for _ in sizes]
+    placed = [0] * len(base)
+
+    # moves[a][b]: heap of (cost of moving one unit from a to b, class), for
+    # classes that had units on a when pushed; classes that have since left a
+    # are dropped lazily. move_cost/move_class hold each heap's valid top
+    moves = [[[] for _ in targets] for _ in targets]
+    move_cost = [[math.inf] * len(base) for _ in targets]
+    move_class = [[None] * len(base) for _ in targets]
+
+    def arrive(k: int, t: int):
+        counts[k][t] += 1
+        if counts[k][t] == 1:
+            for b in targets:
+                if b != t:
+                    heapq.heappush(moves[t][b], ((costs[k][b] - costs[k][t]) * scale + 1, k))
+
+    def refresh(a: int):
+        for b in targets:
+            heap = moves[a][b]
+            while heap and not counts[heap[0][1]][a]:
+                heapq.heappop(heap)
+            move_cost[a][b], move_class[a][b] = heap[0] if heap else (math.inf, None)
+
+    for k, size in enumerate(sizes):
+        for _ in range(size):
+            # Cheapest way to absorb one more unit arriving at each target:
+            # take it, or pass one of its units on (next_hop)
+            dist = [(base[t] + placed[t] * step[t]) * scale if placed[t] < room[t] else math.inf
+                    for t in targets]
+            next_hop = [None] * len(base)
+            for _ in targets:
+                changed = False
+                for a in targets:
+                    best, b = min(zip(map(operator.add, move_cost[a], dist), targets))
+                    if best < dist[a]:
+                        dist[a], next_hop[a] = best, b
+                        changed = True
+                if not changed:
+                    break
+
+            _, t = min(zip((cost * scale + extra for cost, extra in zip(costs[k], dist)), targets))
+            arrive(k, t)
+            touched = [t]
+            while next_hop[t] is not None:
+                b = next_hop[t]
+                moved = move_class[t][b]
+                counts[moved][t] -= 1
+                arrive(moved, b)
+                t = b
+                touched.append(t)
+            placed[t] += 1
+            for a in touched:
+                refresh(a)
+
+    return counts
+
+
+def plan_reassignment(tickets: List[Dict], team: List[Dict],
+                      workload: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+    """
+    Assign tickets to engineers at minimum total cost, within their capacity.
+
+    Tickets are grouped by customer and required skills. Taking a ticket
+    costs an engineer SKILL_MISMATCH_COST (scaled by the share of required
+    skills they lack), NEW_CUSTOMER_COST if they don't already cover the
+    customer, plus their load: the n-th extra ticket for an engineer with L
+    open tickets costs L + n, which spreads work evenly. Engineers never go
+    past capacity; tickets nobody can absorb are left unassigned, lowest
+    priority first. Ties go to the engineer first by name and tickets are
+    handed out by customer, then by ID, so the same inputs always give the
+    same plan.
+
+    Args:
+        tickets: Tickets to reassign
+        team: Team profiles (see load_team_profiles())
+        workload: Current load per engineer email (see get_team_workload()),
+                  otherwise taken from the profiles
+
+    Returns:
+        One suggestion per engineer (plus an 'Unassigned' entry when the team
+        is over capacity), each with its 'assignments' and their explanations
+    """
+    team = sorted(team, key=lambda member: (member['name'], member['email']))
+    workload = workload or {}
+    loads, covered = [], []
+    for member in team:
+        current = workload.get(member['email'].lower(), {})
+        loads.append(current.get('open_tickets', member['open_tickets']))
+        covered.append({customer.lower() for customer in current.get('customers', member['customers'])})
+
+    priority_rank = {'High': 0, 'Medium': 1, 'Low': 2}
+
+    groups = {}
+    for ticket in tickets:
+        key = (ticket.get('customer', 'Unknown'), ticket_skills(ticket),
+               priority_rank.get(ticket.get('priority'), 1))
+        groups.setdefault(key, []).append(ticket)
+    group_keys = sorted(groups, key=lambda key: (key[0], sorted(key[1]), key[2]))
+
+    def unit_cost(key: Tuple[str, FrozenSet[str], int], position: int) -> int:
+        customer, needed, _ = key
+        cost = SKILL_MISMATCH_COST * len(needed - team[position]['skills']) // len(needed) if needed else 0
+        if customer.lower() not in covered[position]:
+            cost += NEW_CUSTOMER_COST
+        return cost
+
+    # Groups of one priority that every engineer prices the same are solved as
+    # one class, so the solver's move heaps stay short however many customers
+    # are involved
+    classes = {}
+    for key in group_keys:
+        costs = tuple(unit_cost(key, position) for position in range(len(team)))
+        classes.setdefault((key[2], costs), []).append(key)
+
+    # Targets: the engineers, then over-capacity. Each extra ticket costs an
+    # engineer one more than the last, up to capacity; leaving a ticket
+    # unassigned costs more the higher its priority
+    overflow = len(team)
+    counts = _assign_units(
+        [sum(len(groups[key]) for key in keys) for keys in classes.values()],
+        [list(costs) + [OVER_CAPACITY_COST * (len(priority_rank) - rank)] for rank, costs in classes],
+        loads + [0], [1] * len(team) + [0],
+        [max(0, member['capacity'] - load) for member, load in zip(team, loads)] + [len(tickets)])
+
+    # Within a class, tickets are handed out customer by customer, then by
+    # ID, so each customer stays with as few engineers as possible; any that
+    # fit nowhere are the last ones
+    def ticket_order(ticket: Dict) -> Tuple[int, str]:
+        ticket_id = str(ticket.get('id'))
+        return len(ticket_id), ticket_id
+
+    queues, leftover = [], []
+    for index, keys in enumerate(classes.values()):
+        queue = [(key, ticket) for key in keys for ticket in sorted(groups[key], key=ticket_order)]
+        overflowing = counts[index][overflow]
+        if overflowing:
+            queue, dropped = queue[:-overflowing], queue[-overflowing:]
+            leftover += dropped
+        queues.append(queue)
+
+    assigned = [[] for _ in team]
+    for index, placed in enumerate(counts):
+        for position, count in enumerate(placed[:overflow]):
+            if count:
+                taken, queues[index] = queues[index][:count], queues[index][count:]
+                assigned[position] += taken
+
+    def by_group(entries: List[Tuple]) -> List[Tuple]:
+        """Regroup (group key, ticket) pairs by customer and skills, highest priority first."""
+        grouped = {}
+        for key, ticket in sorted(entries, key=lambda entry: (entry[0][0], sorted(entry[0][1]), entry[0][2])):
+            grouped.setdefault(key[:2], []).append(ticket)
+        return list(grouped.items())
+
+    suggestions = []
+    for position, member in enumerate(team):
+        load = loads[position]
+        new_load = load + len(assigned[position])
+        assignments = []
+        for (customer, needed), taken in by_group(assigned[position]):
+            reasons = []
+            if needed:
+                matched = sorted(needed & member['skills'])
+                missing = sorted(needed - member['skills'])
+                if matched:
+                    reasons.append(f"has {', '.join(matched)} skills")
+                if missing:
+                    reasons.append(f"lacks {', '.join(missing)} (best available)")
+            reasons.append(f"already covers {customer}" if customer.lower() in covered[position]
+                           else f"new customer for {member['name']}")
+            reasons.append(f"load {load} -> {new_load} of {member['capacity']}")
+            assignments.append({
+                'customer': customer,
+                'ticket_ids': [str(ticket.get('id')) for ticket in taken],
+                'explanation': f"{len(taken)} ticket(s): " + '; '.join(reasons)
+            })
+
+        if assignments:
+            recommendation = f"Take {new_load - load} ticket(s) across {len(assignments)} customer group(s)"
+        elif load >= member['capacity']:
+            recommendation = 'At capacity - avoid additional assignments'
+        else:
+            recommendation = f"Available capacity ({member['capacity'] - load} ticket(s))"
+
+        suggestions.append({
+            'engineer': member['name'],
+            'email': member['email'],
+            'current_tickets': load,
+            'current_customers': len(covered[position]),
+            'specialties': member['specialties'],
+            'recommendation': recommendation,
+            'assignments': assignments
+        })
+
+    if leftover:
+        suggestions.append({
+            'engineer': 'Unassigned',
+            'email': None,
+            'current_tickets': 0,
+            'current_customers': 0,
+            'specialties': [],
+            'recommendation': 'Team is at capacity - escalate to the IT manager',
+            'assignments': [{'customer': customer,
+                             'ticket_ids': [str(ticket.get('id')) for ticket in queue],
+                             'explanation': f"{len(queue)} ticket(s): no engineer has capacity left"}
+                            for (customer, _), queue in by_group(leftover)]
+        })
+
+    return suggestions
+
+
+def add_assigned_load(workload: Dict[str, Dict], suggestions: List[Dict]):
+    """
+    Add the tickets in a reassignment plan to the engineers' workload.
+
+    Args:
+        workload: Load per engineer email, as from get_team_workload(); updated in place
+        suggestions: Plan returned by plan_reassignment()
+    """
+    for suggestion in suggestions:
+        if not suggestion['email'] or not suggestion['assignments']:
+            continue
+        current = workload.setdefault(suggestion['email'].lower(),
+                                      {'open_tickets': suggestion['current_tickets'], 'customers': []})
+        current['open_tickets'] += sum(len(assignment['ticket_ids']) for assignment in suggestion['assignments'])
+        current['customers'] = sorted(set(current['customers'])
+                                      | {assignment['customer'] for assignment in suggestion['assignments']})
+
+
+def load_team_profiles(path: str, email_domain: str = DEFAULT_EMAIL_DOMAIN,
+                       default_capacity: int = DEFAULT_TEAM_CAPACITY) -> List[Dict]:
+    """
+    Load engineer profiles from a roster directory of YAML files (e.g. team/).
+
+    Profiles need only a name. Optional keys: email (default
+    first.last@email_domain), skills and specialties (both matched against
+    SKILL_KEYWORDS), customers they cover, open_tickets and max_tickets.
+    """
+    if not os.path.isdir(path):
+        return []
+
+    team = []
+    for profile in sorted(glob.glob(os.path.join(path, '*.yaml'))):
+        with open(profile) as f:
+            entry = _load_yaml(f) or {}
+        if not entry.get('name'):
+            continue
+        specialties = list(entry.get('specialties') or []) + list(entry.get('skills') or [])
+        team.append({
+            'name': entry['name'],
+            'email': entry.get('email') or _default_email(entry['name'], email_domain),
+            'specialties': specialties,
+            'skills': profile_skills(specialties),
+            'customers': list(entry.get('customers') or []),
+            'open_tickets': int(entry.get('open_tickets') or 0),
+            'capacity': int(entry.get('max_tickets') or default_capacity)
+        })
+    return team
+
+
+def _default_email(name: str, email_domain: str) -> str:
+    return f"{'.'.join(name.lower().split())}@{email_domain}"
+
+
+def load_employee_list(path: str, email_domain: str = DEFAULT_EMAIL_DOMAIN) -> List[Dict]:
+    """
+    Load departing employees for batch mode.
+
+    Accepts a CSV file with employee_id, name, email and role columns; a
+    YAML file holding a list of such entries (or an 'employees' list); or a
+    roster directory of per-person YAML files such as team/*.yaml. Missing
+    values are derived: the ID from the file or row, the email as
+    first.last@email_domain, and the role defaults to helpdesk.
+    """
+    if os.path.isdir(path):
+        entries = []
+        for profile in sorted(glob.glob(os.path.join(path, '*.yaml'))):
+            with open(profile) as f:
+                entry = _load_yaml(f) or {}
+            entry.setdefault('employee_id', os.path.splitext(os.path.basename(profile))[0])
+            entries.append(entry)
+    elif path.endswith(('.yaml', '.yml')):
+        with open(path) as f:
+            entries = _load_yaml(f) or []
+        if isinstance(entries, dict):
+            entries = entries.get('employees', [])
+    else:
+        with open(path, newline='') as f:
+            entries = list(csv.DictReader(f))
+
+    employees = []
+    for index, entry in enumerate(entries, 1):
+        name = (entry.get('name') or '').strip()
+        if not name:
+            raise ValueError(f"{path}: entry {index} has no name")
+        employees.append({
+            'employee_id': str(entry.get('employee_id') or entry.get('id') or f"BATCH{index:03d}"),
+            'name': name,
+            'email': entry.get('email') or _default_email(name, email_domain),
+            'role': entry.get('role') or 'helpdesk'
+        })
+
+    return employees
+
+
+def _load_yaml(f):
+    if yaml is None:
+        raise RuntimeError("YAML batch lists require pyyaml (pip install pyyaml)")
+    return yaml.safe_load(f)
+
 
 def main():
     """Main entry point for CLI"""
@@ -629,6 +2515,20 @@ Examples:
 
   # Generate customer transition document
   python offboarding_automation.py --customer-transition "Acme Corp" "John Doe" "Jane Smith"
+
+  # Off-board everyone listed in a CSV/YAML file, or a whole roster directory
+  python offboarding_automation.py --batch departures.csv
+  python offboarding_automation.py --batch ../team --parallel 8
+
+  # Immediate termination: run every automated revocation step now
+  python offboarding_automation.py --revoke E12345 --name "John Doe" --email john.doe@midcloudcomputing.com
+  python offboarding_automation.py --revoke E12345 --name "John Doe" --email john.doe@midcloudcomputing.com --dry-run
+
+  # Start over instead of resuming an interrupted run or reusing recently fetched data
+  python offboarding_automation.py --employee E12345 --name "John Doe" --email john.doe@midcloudcomputing.com --fresh
+
+  # Write reports as HTML (or json) instead of markdown
+  python offboarding_automation.py --employee E12345 --name "John Doe" --email john.doe@midcloudcomputing.com --format html
         """
     )
 
@@ -642,9 +2542,20 @@ Examples:
     parser.add_argument('--generate-checklist', metavar='EMPLOYEE_ID',
                        help='Generate access revocation checklist only')
 
+    parser.add_argument('--revoke', metavar='EMPLOYEE_ID',
+                       help='Run the automated access revocation steps (needs --name and --email) '
+                            'and write the checklist with their results')
+
+    parser.add_argument('--dry-run', action='store_true',
+                       help='With --revoke, list the steps that would run without running them')
+
     parser.add_argument('--tickets', metavar='EMAIL',
                        help='Get ticket report for employee email')
 
+    parser.add_argument('--status', nargs='+', metavar='STATUS',
+                       help='Zoho Desk ticket statuses to include (default: config zoho_desk.statuses, '
+                            'otherwise Open)')
+
     parser.add_argument('--projects', metavar='EMAIL',
                        help='Get project report for employee email')
 
@@ -655,26 +2566,64 @@ Examples:
                        metavar=('CUSTOMER', 'DEPARTING', 'NEW'),
                        help='Generate customer transition document')
 
+    parser.add_argument('--batch', metavar='FILE_OR_DIR',
+                       help='Generate full reports for every employee in a CSV/YAML list or roster directory')
+
+    parser.add_argument('--parallel', type=int,
+                       help=f'Employees fetched at once in --batch mode (default: {DEFAULT_BATCH_PARALLELISM}), '
+                            f'or steps run at once with --revoke (default: {DEFAULT_REVOCATION_WORKERS})')
+
+    parser.add_argument('--format', default='markdown', choices=list(REPORT_FORMATS),
+                       help='Format of generated reports and checklists (default: markdown)')
+
+    parser.add_argument('--fresh', action='store_true',
+                       help='Start a new run instead of resuming an unfinished one, and refetch all data '
+                            '(runs are kept in config job_store.path, default: ' + DEFAULT_JOB_STORE +
+                            ' beside the config file)')
+
     parser.add_argument('--config', default='config.json',
                        help='Configuration file (default: config.json)')
 
+    parser.add_argument('--source-timeout', type=float, metavar='SECONDS',
+                       help='Seconds to wait for each report data source before marking its '
+                            f'section incomplete (default: {DEFAULT_SOURCE_TIMEOUT}, or config source_timeouts)')
+
     args = parser.parse_args()
 
     # Initialize automation
-    automation = OffboardingAutomation(args.config)
+    automation = OffboardingAutomation(args.config, args.source_timeout)
+    if args.status:
+        automation.ticket_statuses = args.status
+    automation.report_format = args.format
+    automation.fresh = args.fresh
 
     # Handle different command types
     if args.generate_checklist:
         name = args.name or input("Employee name: ")
         automation.generate_access_checklist(args.generate_checklist, name)
 
+    elif args.revoke:
+        if not (args.name and args.email):
+            parser.error('--revoke needs --name and --email')
+        results, _ = automation.revoke_access(args.revoke, args.name, args.email,
+                                              args.parallel or DEFAULT_REVOCATION_WORKERS, args.dry_run)
+        if any(result.status != 'done' for result in results.values()):
+            sys.exit(1)
+
     elif args.tickets:
-        tickets = automation.get_zoho_tickets(args.tickets)
-        analysis = automation.analyze_tickets(tickets)
+        try:
+            analysis = automation.analyze_tickets(automation.iter_zoho_tickets(args.tickets))
+        except requests.exceptions.RequestException as e:
+            print(f"⚠ Error querying Zoho Desk: {e}")
+            sys.exit(1)
         print(json.dumps(analysis, indent=2))
 
     elif args.projects:
-        projects = automation.get_zoho_projects(args.projects)
+        try:
+            projects = automation.get_zoho_projects(args.projects)
+        except requests.exceptions.RequestException as e:
+            print(f"⚠ Error querying Zoho Projects: {e}")
+            sys.exit(1)
         print(json.dumps(projects, indent=2))
 
     elif args.customers:
@@ -686,6 +2635,15 @@ Examples:
         customer_data = {'customer_name': customer_name, 'customer_id': 'MANUAL'}
         automation.generate_customer_transition_doc(customer_data, departing, new)
 
+    elif args.batch:
+        try:
+            employees = load_employee_list(args.batch, automation.config.get('email_domain', DEFAULT_EMAIL_DOMAIN))
+        except (OSError, ValueError, RuntimeError) as e:
+            parser.error(str(e))
+        reports = automation.run_batch(employees, args.parallel or DEFAULT_BATCH_PARALLELISM)
+        if not all(report for _, report in reports):
+            sys.exit(1)
+
     elif args.employee and args.name and args.email:
         # Generate full report
         automation.generate_full_report(args.employee, args.name, args.email, args.role)
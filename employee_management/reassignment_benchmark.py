@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Ticket Reassignment Benchmark
+Times plan_reassignment() on synthetic teams whose customer coverage overlaps
+unevenly, the case that gives the assignment network the most distinct ticket
+classes. No Zoho Desk access or team roster is needed. Each default scenario
+should plan in under half a second (TARGET_SECONDS, checked by --max-seconds).
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from offboarding_automation import SKILL_KEYWORDS, plan_reassignment, profile_skills
+
+# (tickets, customers, engineers)
+DEFAULT_SCENARIOS = [(100, 15, 6), (500, 60, 12), (800, 81, 15)]
+
+# Slowest acceptable time for any default scenario
+TARGET_SECONDS = 0.5
+
+PRIORITIES = ['High', 'Medium', 'Low']
+
+
+def synthetic_workload(tickets: int, customers: int, engineers: int,
+                       seed: int = 0) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Build a reproducible set of tickets and a team to reassign them to.
+
+    Each engineer covers a different random slice of the customers and has
+    one to three skills, so most customers are priced differently by every
+    engineer. A fifth of the tickets match no skill keyword.
+
+    Returns:
+        (tickets, team) in the shapes plan_reassignment() takes
+    """
+    rng = random.Random(seed)
+    names = [f"Customer {index:03d}" for index in range(customers)]
+    skills = sorted(SKILL_KEYWORDS)
+
+    team = []
+    for index in range(engineers):
+        specialties = rng.sample(skills, rng.randint(1, 3))
+        team.append({
+            'name': f"Engineer {index:02d}",
+            'email': f"engineer{index:02d}@example.com",
+            'specialties': specialties,
+            'skills': profile_skills(specialties),
+            'customers': rng.sample(names, rng.randint(0, max(1, customers // 3))),
+            'open_tickets': rng.randint(0, 15),
+            'capacity': rng.randint(30, 90)
+        })
+
+    workload = []
+    for index in range(tickets):
+        skill = rng.choice(skills)
+        subject = f"{rng.choice(SKILL_KEYWORDS[skill])} issue" if rng.random() < 0.8 else 'General request'
+        workload.append({
+            'id': str(100000 + index),
+            'customer': rng.choice(names),
+            'subject': subject,
+            'priority': rng.choice(PRIORITIES)
+        })
+
+    return workload, team
+
+
+def benchmark_scenario(tickets: int, customers: int, engineers: int, repeat: int, seed: int) -> Dict:
+    """Time plan_reassignment() on one scenario, keeping the best of `repeat` runs."""
+    workload, team = synthetic_workload(tickets, customers, engineers, seed)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        suggestions = plan_reassignment(workload, team)
+        timings.append(time.perf_counter() - started)
+
+    assigned = sum(len(assignment['ticket_ids'])
+                   for suggestion in suggestions if suggestion.get('email')
+                   for assignment in suggestion['assignments'])
+    return {
+        'tickets': tickets,
+        'customers': customers,
+        'engineers': engineers,
+        'assigned': assigned,
+        'seconds': round(min(timings), 4)
+    }
+
+
+def print_report(results: List[Dict]):
+    """Print results as an aligned table."""
+    columns = ['tickets', 'customers', 'engineers', 'assigned', 'seconds']
+    rows = [[str(result[column]) for column in columns] for result in results]
+    widths = [max(len(column), *(len(row[idx]) for row in rows)) for idx, column in enumerate(columns)]
+
+    lines = ['  '.join(column.upper().rjust(width) for column, width in zip(columns, widths))]
+    lines.extend('  '.join(value.rjust(width) for value, width in zip(row, widths)) for row in rows)
+    sys.stdout.write('\n'.join(lines) + '\n')
+
+
+def parse_scenario(value: str) -> Tuple[int, int, int]:
+    """Parse a TICKETS:CUSTOMERS:ENGINEERS scenario."""
+    try:
+        tickets, customers, engineers = (int(part) for part in value.split(':'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected TICKETS:CUSTOMERS:ENGINEERS, got '{value}'")
+    return tickets, customers, engineers
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark ticket reassignment planning on synthetic teams with mixed customer coverage',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Default scenarios (100/15/6, 500/60/12 and 800/81/15 tickets/customers/engineers)
+  %(prog)s
+
+  # A larger team, best of 5 runs
+  %(prog)s --scenarios 2000:150:25 --repeat 5
+
+  # Fail (exit 1) if any scenario misses the half-second target
+  %(prog)s --max-seconds 0.5
+        """
+    )
+
+    parser.add_argument('--scenarios', type=parse_scenario, nargs='+', default=DEFAULT_SCENARIOS,
+                        metavar='TICKETS:CUSTOMERS:ENGINEERS',
+                        help='Scenarios to benchmark (default: 100:15:6 500:60:12 800:81:15)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per scenario; the fastest is reported (default: 3)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed for the synthetic workload (default: 0)')
+    parser.add_argument('--json', action='store_true',
+                        help='Print results as JSON instead of a table')
+    parser.add_argument('--max-seconds', type=float,
+                        help=f'Exit 1 if any scenario takes longer than this (target: {TARGET_SECONDS})')
+
+    args = parser.parse_args()
+
+    results = []
+    for tickets, customers, engineers in args.scenarios:
+        print(f"Benchmarking {tickets} tickets, {customers} customers, {engineers} engineers...",
+              file=sys.stderr)
+        results.append(benchmark_scenario(tickets, customers, engineers, args.repeat, args.seed))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+    if args.max_seconds is not None:
+        slow = [result for result in results if result['seconds'] > args.max_seconds]
+        if slow:
+            print("\n⚠ Regressions detected:", file=sys.stderr)
+            for result in slow:
+                print(f"  - {result['tickets']}/{result['customers']}/{result['engineers']}: "
+                      f"{result['seconds']}s (threshold {args.max_seconds}s)", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
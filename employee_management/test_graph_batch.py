@@ -0,0 +1,186 @@
+"""
+Tests for GraphClient.batch() against a local Microsoft Graph stand-in.
+
+The stand-in answers POST /$batch the way Graph does: requests run in
+order, one whose dependsOn failed gets 424, and operations can be scripted
+to be throttled or to fail. Run with: python -m pytest employee_management
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from offboarding_automation import GRAPH_BATCH_LIMIT, GraphClient, GraphRequest
+
+
+class GraphStandIn:
+    """Local $batch endpoint with scripted throttling and failures."""
+
+    def __init__(self):
+        self.batches = []       # Request lists as received, one per $batch call
+        self.throttle = {}      # Operation id -> times left to answer 429
+        self.fail = set()       # Operation ids answered 404
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                body = json.dumps({'responses': stand_in.answer(payload['requests'])}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+
+    def answer(self, requests):
+        self.batches.append(requests)
+        statuses, responses = {}, []
+        for request in requests:
+            failed = [dep for dep in request.get('dependsOn', []) if not 200 <= statuses[dep] < 300]
+            if failed:
+                status, headers = 424, {}
+            elif self.throttle.get(request['id']):
+                self.throttle[request['id']] -= 1
+                status, headers = 429, {'Retry-After': '0'}
+            elif request['id'] in self.fail:
+                status, headers = 404, {}
+            else:
+                status, headers = 204, {}
+            statuses[request['id']] = status
+            responses.append({'id': request['id'], 'status': status, 'headers': headers, 'body': None})
+        return responses
+
+    def sent(self, operation_id):
+        """Every request sent for an operation, across all batches."""
+        return [request for batch in self.batches for request in batch if request['id'] == operation_id]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StandInGraphClient(GraphClient):
+    def _fetch_token(self):
+        return 'token', float('inf')
+
+
+@pytest.fixture
+def graph():
+    stand_in = GraphStandIn()
+    client = StandInGraphClient({'api_url': stand_in.url}, {'retries': 2, 'backoff': 0})
+    client.stand_in = stand_in
+    yield client
+    client.close()
+    stand_in.close()
+
+
+def deletions(count, prefix='op'):
+    return [GraphRequest(f"{prefix}{index}", 'DELETE', f"groups/g{index}/members/u/$ref") for index in range(count)]
+
+
+def test_operations_are_sent_in_batches_of_the_graph_limit(graph):
+    results = graph.batch(deletions(45))
+
+    assert [len(batch) for batch in graph.stand_in.batches] == [GRAPH_BATCH_LIMIT, GRAPH_BATCH_LIMIT, 5]
+    assert len(results) == 45 and all(result.ok for result in results.values())
+
+
+def test_dependencies_in_the_same_batch_are_sent_as_depends_on(graph):
+    operations = [GraphRequest('child', 'DELETE', 'users/u', depends_on=('parent',)),
+                  GraphRequest('parent', 'PATCH', 'users/u', body={'accountEnabled': False})]
+    results = graph.batch(operations)
+
+    # The dependency goes first however the operations were given
+    [batch] = graph.stand_in.batches
+    assert [request['id'] for request in batch] == ['parent', 'child']
+    assert batch[1]['dependsOn'] == ['parent']
+    assert batch[0]['body'] == {'accountEnabled': False}
+    assert results['child'].ok
+
+
+def test_failed_dependency_in_the_same_batch_is_answered_424_by_graph(graph):
+    graph.stand_in.fail.add('parent')
+    results = graph.batch([GraphRequest('parent', 'GET', 'users/u'),
+                           GraphRequest('child', 'DELETE', 'users/u', depends_on=('parent',))])
+
+    assert results['parent'].status == 404
+    assert results['child'].status == 424
+    assert len(graph.stand_in.sent('child')) == 1
+
+
+def test_failed_dependency_in_an_earlier_batch_is_not_sent(graph):
+    graph.stand_in.fail.add('parent')
+    operations = deletions(GRAPH_BATCH_LIMIT - 1) + [
+        GraphRequest('parent', 'GET', 'users/u'),
+        GraphRequest('child', 'DELETE', 'users/u', depends_on=('parent',))]
+    results = graph.batch(operations)
+
+    assert results['child'].status == 424
+    assert results['child'].body['error']['code'] == 'failedDependency'
+    assert graph.stand_in.sent('child') == []
+
+
+def test_dependency_from_an_earlier_batch_is_not_sent_as_depends_on(graph):
+    operations = deletions(GRAPH_BATCH_LIMIT - 1) + [
+        GraphRequest('parent', 'GET', 'users/u'),
+        GraphRequest('child', 'DELETE', 'users/u', depends_on=('parent',))]
+    results = graph.batch(operations)
+
+    [request] = graph.stand_in.sent('child')
+    assert 'dependsOn' not in request
+    assert results['child'].ok
+
+
+def test_throttled_operations_and_their_424d_dependents_are_resent(graph):
+    graph.stand_in.throttle['parent'] = 2
+    results = graph.batch([GraphRequest('parent', 'GET', 'users/u'),
+                           GraphRequest('child', 'DELETE', 'users/u', depends_on=('parent',)),
+                           GraphRequest('other', 'DELETE', 'users/v')])
+
+    assert all(result.ok for result in results.values())
+    assert len(graph.stand_in.sent('parent')) == 3
+    assert len(graph.stand_in.sent('child')) == 3
+    # Operations that went through are not repeated
+    assert len(graph.stand_in.sent('other')) == 1
+
+
+def test_throttling_gives_up_after_the_configured_retries(graph):
+    graph.stand_in.throttle['op0'] = 5
+    results = graph.batch(deletions(2))
+
+    assert results['op0'].status == 429
+    assert results['op1'].ok
+    assert len(graph.stand_in.sent('op0')) == 3
+
+
+def test_retries_are_counted_per_operation(graph):
+    # The first operation uses up its retries before the last one, in a
+    # later batch, is ever throttled; that one still gets all of its own
+    operations = deletions(GRAPH_BATCH_LIMIT + 5)
+    graph.stand_in.throttle['op0'] = 2
+    graph.stand_in.throttle[f"op{GRAPH_BATCH_LIMIT + 4}"] = 2
+    results = graph.batch(operations)
+
+    assert all(result.ok for result in results.values())
+    assert len(graph.stand_in.sent(f"op{GRAPH_BATCH_LIMIT + 4}")) == 3
+
+
+@pytest.mark.parametrize('operations', [
+    [GraphRequest('a', 'GET', 'users/u'), GraphRequest('a', 'GET', 'users/v')],
+    [GraphRequest('a', 'GET', 'users/u', depends_on=('missing',))],
+    [GraphRequest('a', 'GET', 'users/u', depends_on=('b',)), GraphRequest('b', 'GET', 'users/v', depends_on=('a',))],
+], ids=['duplicate', 'unknown', 'cycle'])
+def test_invalid_operations_are_rejected_before_sending(graph, operations):
+    with pytest.raises(ValueError):
+        graph.batch(operations)
+    assert graph.stand_in.batches == []
@@ -0,0 +1,146 @@
+"""
+Tests for the ticket reassignment planner in offboarding_automation.py.
+
+Plans on small cases are checked against an exhaustive search over every
+possible assignment, and against the tie-breaking plan_reassignment()
+documents. Run with: python -m pytest employee_management
+"""
+
+import itertools
+import random
+
+import pytest
+
+from offboarding_automation import (NEW_CUSTOMER_COST, OVER_CAPACITY_COST, SKILL_MISMATCH_COST,
+                                    plan_reassignment, ticket_skills)
+
+PRIORITY_RANK = {'High': 0, 'Medium': 1, 'Low': 2}
+SUBJECTS = ['VPN down', 'phishing mail', 'Outlook issue', 'printer jam', 'password reset']
+
+
+def engineer(name, skills=(), customers=(), open_tickets=0, capacity=25):
+    return {'name': name, 'email': f"{name.lower().replace(' ', '.')}@example.com",
+            'skills': frozenset(skills), 'specialties': sorted(skills),
+            'customers': list(customers), 'open_tickets': open_tickets, 'capacity': capacity}
+
+
+def ticket(ticket_id, customer, subject='password reset', priority='Medium'):
+    return {'id': ticket_id, 'customer': customer, 'subject': subject, 'priority': priority}
+
+
+def unit_cost(item, member):
+    """What one ticket costs an engineer, before load."""
+    needed = ticket_skills(item)
+    cost = SKILL_MISMATCH_COST * len(needed - member['skills']) // len(needed) if needed else 0
+    if item['customer'].lower() not in {customer.lower() for customer in member['customers']}:
+        cost += NEW_CUSTOMER_COST
+    return cost
+
+
+def unassigned_cost(item):
+    return OVER_CAPACITY_COST * (len(PRIORITY_RANK) - PRIORITY_RANK[item['priority']])
+
+
+def cost_of(placement, tickets, team):
+    """Total cost of placing tickets[i] on team[placement[i]] (None: unassigned), or None if over capacity."""
+    total = 0
+    for position, member in enumerate(team):
+        taken = [item for item, where in zip(tickets, placement) if where == position]
+        if member['open_tickets'] + len(taken) > max(member['capacity'], member['open_tickets']):
+            return None
+        # The n-th extra ticket costs the engineer's load plus n
+        total += sum(unit_cost(item, member) for item in taken)
+        total += sum(member['open_tickets'] + n for n in range(len(taken)))
+    total += sum(unassigned_cost(item) for item, where in zip(tickets, placement) if where is None)
+    return total
+
+
+def plan_placement(plan, tickets, team):
+    """Where each ticket ended up in a plan, as positions in team (None: unassigned)."""
+    positions = {member['name']: position for position, member in enumerate(team)}
+    where = {}
+    for suggestion in plan:
+        for assignment in suggestion['assignments']:
+            for ticket_id in assignment['ticket_ids']:
+                assert ticket_id not in where
+                where[ticket_id] = positions.get(suggestion['engineer'])
+    return [where[str(item['id'])] for item in tickets]
+
+
+def assigned_customers(plan):
+    return {suggestion['engineer']: [assignment['customer'] for assignment in suggestion['assignments']]
+            for suggestion in plan if suggestion['assignments']}
+
+
+def random_case(seed):
+    rnd = random.Random(seed)
+    customers = [f'Customer {index}' for index in range(rnd.randint(1, 4))]
+    team = []
+    for index in range(rnd.randint(1, 3)):
+        open_tickets = rnd.randint(0, 4)
+        team.append(engineer(f'Engineer {index}',
+                             skills=rnd.sample(['network', 'security', 'm365', 'hardware'], rnd.randint(0, 2)),
+                             customers=rnd.sample(customers, rnd.randint(0, len(customers))),
+                             open_tickets=open_tickets, capacity=open_tickets + rnd.randint(0, 4)))
+    tickets = [ticket(str(100 + index), rnd.choice(customers), rnd.choice(SUBJECTS),
+                      rnd.choice(list(PRIORITY_RANK)))
+               for index in range(rnd.randint(1, 6))]
+    return tickets, team
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_plan_matches_exhaustive_search(seed):
+    tickets, team = random_case(seed)
+    options = list(range(len(team))) + [None]
+    best = min(cost for cost in (cost_of(placement, tickets, team)
+                                 for placement in itertools.product(options, repeat=len(tickets)))
+               if cost is not None)
+
+    placement = plan_placement(plan_reassignment(tickets, team), tickets, team)
+    assert cost_of(placement, tickets, team) == best
+
+
+def test_ties_go_to_engineer_first_by_name():
+    team = [engineer('Mike Hurlburt'), engineer('Dave Lange'), engineer('Mike Hale')]
+    tickets = [ticket('3', 'Smith Industries', 'Outlook issue', 'Medium'),
+               ticket('1', 'Acme Corp', 'VPN down', 'High'),
+               ticket('2', 'Johnson LLC', 'printer jam', 'Low')]
+
+    plan = plan_reassignment(tickets, team)
+    assert assigned_customers(plan) == {'Dave Lange': ['Acme Corp'],
+                                        'Mike Hale': ['Johnson LLC'],
+                                        'Mike Hurlburt': ['Smith Industries']}
+
+
+def test_same_inputs_give_same_plan():
+    tickets, team = random_case(7)
+    tickets += [ticket(str(200 + index), 'Customer 0') for index in range(10)]
+    for member in team:
+        member['capacity'] = member['open_tickets'] + 8
+
+    expected = plan_reassignment(tickets, team)
+    rnd = random.Random(0)
+    for _ in range(5):
+        rnd.shuffle(tickets)
+        rnd.shuffle(team)
+        assert plan_reassignment(tickets, team) == expected
+
+
+def test_customer_stays_with_one_engineer_when_free():
+    team = [engineer('Ann Able'), engineer('Bob Baker')]
+    tickets = [ticket(str(index), 'Acme Corp') for index in range(4)]
+
+    plan = plan_reassignment(tickets, team)
+    # Loads spread evenly, but each engineer's tickets come in ID order
+    assert [assignment['ticket_ids'] for suggestion in plan for assignment in suggestion['assignments']] \
+        == [['0', '1'], ['2', '3']]
+
+
+def test_overflow_leaves_lowest_priority_unassigned():
+    team = [engineer('Ann Able', open_tickets=3, capacity=4)]
+    tickets = [ticket('1', 'Acme Corp', priority='Low'), ticket('2', 'Acme Corp', priority='High')]
+
+    plan = plan_reassignment(tickets, team)
+    assert plan[0]['assignments'][0]['ticket_ids'] == ['2']
+    assert plan[-1]['engineer'] == 'Unassigned'
+    assert plan[-1]['assignments'][0]['ticket_ids'] == ['1']
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Meraki Wireless Scanner Benchmark
+Measures how the scanner's stages (fetch, identify, print, export) scale by replaying
+synthetic or recorded Dashboard responses from a local stand-in API server. No network
+access or API key is needed.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from meraki_wpa1_scanner import MerakiWirelessScanner, RateLimiter
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+# Latency percentiles are measured per batch of this many clients
+BATCH_SIZE = 1000
+
+SYNTHETIC_SECURITY = ['WPA2-PSK', 'WPA-PSK', 'WPA3-SAE', 'WPA2 Enterprise', 'WPA-TKIP', 'Open', None]
+
+
+def synthetic_client(index: int) -> Dict:
+    """Build a realistic Dashboard client record for a given index."""
+    return {
+        'id': f"k{index:08x}",
+        'mac': ':'.join(f"{(index >> shift) & 0xff:02x}" for shift in (40, 32, 24, 16, 8, 0)),
+        'description': f"device-{index}",
+        'ip': f"10.{(index >> 16) & 0xff}.{(index >> 8) & 0xff}.{index & 0xff}",
+        'ssid': None if index % 10 == 0 else ('Corp' if index % 3 else 'Guest'),
+        'security': SYNTHETIC_SECURITY[index % len(SYNTHETIC_SECURITY)],
+        'manufacturer': 'Apple' if index % 2 else 'Samsung',
+        'os': 'iOS' if index % 2 else 'Android',
+        'lastSeen': 1700000000 + index,
+        'status': 'Online',
+        'recentDeviceSerial': f"Q2XX-{index % 50:04d}",
+        'recentDeviceName': f"AP-{index % 50}"
+    }
+
+
+class ClientSource:
+    """Clients served by the stand-in API: synthetic, or a recorded fixture cycled to size."""
+
+    def __init__(self, size: int, fixture: Optional[List[Dict]] = None):
+        self.size = size
+        self.fixture = fixture
+
+    def client(self, index: int) -> Dict:
+        if not self.fixture:
+            return synthetic_client(index)
+
+        # Cycle the recording, giving each copy a unique id and MAC
+        client = dict(self.fixture[index % len(self.fixture)])
+        client['id'] = f"k{index:08x}"
+        client['mac'] = synthetic_client(index)['mac']
+        return client
+
+
+class StandInDashboard:
+    """
+    Minimal local Dashboard API serving /networks/{id}/clients.
+
+    Pages honour perPage and startingAfter and carry a Link: rel=next header,
+    exactly like the real API, so the scanner's pagination code is exercised.
+    """
+
+    def __init__(self, source: ClientSource):
+        self.source = source
+        dashboard = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                dashboard.handle(self)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/api/v1"
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        url = urlparse(request.path)
+        if not url.path.endswith('/clients'):
+            request.send_response(404)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            return
+
+        query = parse_qs(url.query)
+        per_page = int(query.get('perPage', ['10'])[0])
+        start = int(query['startingAfter'][0][1:], 16) + 1 if 'startingAfter' in query else 0
+        end = min(self.source.size, start + per_page)
+
+        body = json.dumps([self.source.client(index) for index in range(start, end)]).encode()
+
+        request.send_response(200)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(body)))
+        if end < self.source.size:
+            next_url = (f"http://{request.headers['Host']}{url.path}?perPage={per_page}"
+                        f"&timespan={query.get('timespan', ['0'])[0]}&startingAfter=k{end - 1:08x}")
+            request.send_header('Link', f"<{next_url}>; rel=next")
+        request.end_headers()
+        request.wfile.write(body)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def timed_batches(items: Iterable, latencies: List[float], batch_size: int = BATCH_SIZE) -> Iterator:
+    """
+    Pass items through, recording the wall time of each batch of them.
+
+    Each latency covers producing the batch upstream and the consumer's
+    processing of it, i.e. the stage's cost per `batch_size` clients.
+    """
+    count = 0
+    last = time.perf_counter()
+
+    for item in items:
+        yield item
+        count += 1
+        if count % batch_size == 0:
+            now = time.perf_counter()
+            latencies.append(now - last)
+            last = now
+
+    if count % batch_size:
+        latencies.append(time.perf_counter() - last)
+
+
+class StageTimer:
+    """
+    Collects throughput, batch latency percentiles and, optionally, peak memory for one stage.
+
+    Memory is the peak of Python allocations made during the stage, on top of
+    what was already allocated when it started, as traced by tracemalloc.
+    Tracing slows every allocation down several times over, so it is only
+    done when asked for and the timings of a traced run are not comparable.
+    """
+
+    def __init__(self, size: int, stage: str, trace_memory: bool = False):
+        self.size = size
+        self.stage = stage
+        self.trace_memory = trace_memory
+        self.latencies = []
+        self.count = 0
+        self.peak_mb = None
+
+    def __enter__(self):
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self.baseline = tracemalloc.get_traced_memory()[0]
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self.started
+        if self.trace_memory:
+            self.peak_mb = (tracemalloc.get_traced_memory()[1] - self.baseline) / (1024 * 1024)
+
+    def result(self) -> Dict:
+        return {
+            'size': self.size,
+            'stage': self.stage,
+            'clients': self.count,
+            'seconds': round(self.seconds, 4),
+            'throughput': round(self.count / self.seconds) if self.seconds else 0,
+            'p50_ms': round(percentile(self.latencies, 50) * 1000, 3),
+            'p95_ms': round(percentile(self.latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(self.latencies, 99) * 1000, 3),
+            'peak_mb': round(self.peak_mb, 1) if self.peak_mb is not None else None
+        }
+
+
+def benchmark_size(size: int, filter_type: str, per_page: int, engine: str,
+                   fixture: Optional[List[Dict]] = None, trace_memory: bool = False) -> List[Dict]:
+    """Run every stage against `size` clients and return one result per stage."""
+    source = ClientSource(size, fixture)
+    results = []
+
+    with StandInDashboard(source) as dashboard, open(os.devnull, 'w') as devnull:
+        scanner = MerakiWirelessScanner('benchmark', 'N_benchmark', rate_limiter=RateLimiter(0),
+                                        engine=engine)
+        scanner.base_url = dashboard.base_url
+
+        # Scanner status messages would distort the timings
+        with contextlib.redirect_stdout(devnull):
+            # fetch: pagination, HTTP and JSON decoding; clients are consumed, not kept
+            with StageTimer(size, 'fetch', trace_memory) as timer:
+                for _ in timed_batches(scanner.iter_clients(per_page=per_page), timer.latencies):
+                    timer.count += 1
+            results.append(timer.result())
+
+            # identify: classification alone, fed from memory rather than HTTP. A
+            # pre-built sample is cycled so generating clients costs (almost) nothing
+            sample = [source.client(index) for index in range(min(size, 10000))]
+            clients = (sample[index % len(sample)] for index in range(size))
+            with StageTimer(size, 'identify', trace_memory) as timer:
+                filtered = list(scanner.iter_identified_clients(
+                    timed_batches(clients, timer.latencies), filter_type))
+                timer.count = size
+            results.append(timer.result())
+            del sample
+
+            # print: render the filtered listing in batches to an in-memory stream
+            with StageTimer(size, 'print', trace_memory) as timer:
+                for start in range(0, len(filtered), BATCH_SIZE):
+                    batch_started = time.perf_counter()
+                    scanner.print_results(filtered[start:start + BATCH_SIZE], filter_type, io.StringIO())
+                    timer.latencies.append(time.perf_counter() - batch_started)
+                timer.count = len(filtered)
+            results.append(timer.result())
+
+            # export: stream the filtered clients to a CSV file
+            with tempfile.TemporaryDirectory() as tmpdir:
+                with StageTimer(size, 'export', trace_memory) as timer:
+                    scanner.export_to_csv(timed_batches(filtered, timer.latencies),
+                                          os.path.join(tmpdir, 'benchmark.csv'), filter_type)
+                    timer.count = len(filtered)
+                results.append(timer.result())
+
+        if scanner.async_client is not None:
+            scanner.async_client.close()
+
+    return results
+
+
+def check_thresholds(results: List[Dict], thresholds: Dict) -> List[str]:
+    """
+    Compare results against regression thresholds.
+
+    Thresholds map a stage name (or '*' for every stage) to limits, optionally
+    per size: {"identify": {"min_throughput": 200000}, "*": {"max_peak_mb": 512},
+    "fetch@1000000": {"max_p95_ms": 50}}.
+    """
+    failures = []
+
+    for result in results:
+        for key in ('*', result['stage'], f"{result['stage']}@{result['size']}"):
+            for limit, value in thresholds.get(key, {}).items():
+                bound, metric = limit.split('_', 1)
+                actual = result[metric]
+                if actual is None:
+                    # Memory is only measured with --memory
+                    continue
+                if (bound == 'min' and actual < value) or (bound == 'max' and actual > value):
+                    failures.append(f"{result['stage']} @ {result['size']}: {metric} = {actual} "
+                                    f"(threshold {limit} {value})")
+
+    return failures
+
+
+def compare_baseline(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """Flag stages whose throughput dropped more than `tolerance` below a saved baseline."""
+    previous = {(result['size'], result['stage']): result for result in baseline}
+    failures = []
+
+    for result in results:
+        before = previous.get((result['size'], result['stage']))
+        if before and before['throughput'] and result['throughput'] < before['throughput'] * (1 - tolerance):
+            failures.append(f"{result['stage']} @ {result['size']}: throughput {result['throughput']}/s "
+                            f"vs baseline {before['throughput']}/s")
+
+    return failures
+
+
+def print_report(results: List[Dict]):
+    """Print results as an aligned table."""
+    columns = ['size', 'stage', 'clients', 'seconds', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms']
+    if any(result['peak_mb'] is not None for result in results):
+        columns.append('peak_mb')
+    rows = [[str(result[column]) for column in columns] for result in results]
+    widths = [max(len(column), *(len(row[idx]) for row in rows)) for idx, column in enumerate(columns)]
+
+    lines = ['  '.join(column.upper().rjust(width) for column, width in zip(columns, widths))]
+    lines.extend('  '.join(value.rjust(width) for value, width in zip(row, widths)) for row in rows)
+    sys.stdout.write('\n'.join(lines) + '\n')
+
+
+def load_fixture(path: str) -> List[Dict]:
+    """Load recorded clients from a JSON array or JSON Lines file."""
+    with open(path) as f:
+        content = f.read()
+    if content.lstrip().startswith('['):
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the Meraki wireless scanner against a local stand-in Dashboard API',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Default run at 1k, 100k and 1M synthetic clients
+  %(prog)s
+
+  # Quick run, saving results as the baseline for later comparisons
+  %(prog)s --sizes 1000 100000 --save bench_baseline.json
+
+  # Peak memory of each stage (traced separately: timings are much slower)
+  %(prog)s --sizes 1000 100000 --memory
+
+  # Fail (exit 1) if any stage is >25%% slower than the baseline or breaks a threshold
+  %(prog)s --sizes 1000 100000 --baseline bench_baseline.json --thresholds bench_thresholds.json
+
+  # Record a real network's clients once, then replay them at scale
+  %(prog)s --record-fixture clients.jsonl --api-key YOUR_KEY --network-id L_123456
+  %(prog)s --fixture clients.jsonl --sizes 100000
+        """
+    )
+
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Client counts to benchmark (default: 1000 100000 1000000)')
+    parser.add_argument('--filter', default='wpa1',
+                        help='Filter used by the identify/print/export stages (default: wpa1)')
+    parser.add_argument('--per-page', type=int, default=1000,
+                        help='Clients per API page (default: 1000)')
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                        help='Scanner engine to benchmark (default: threads)')
+    parser.add_argument('--fixture', metavar='FILE',
+                        help='Replay recorded clients (JSON array or JSON Lines) instead of synthetic ones')
+    parser.add_argument('--record-fixture', metavar='FILE',
+                        help='Record a real network\'s clients to FILE as JSON Lines and exit')
+    parser.add_argument('--api-key', help='Meraki Dashboard API key (for --record-fixture)')
+    parser.add_argument('--network-id', help='Meraki Network ID (for --record-fixture)')
+    parser.add_argument('--memory', action='store_true',
+                        help='Trace each stage\'s peak memory with tracemalloc (slows the run down; '
+                             'its timings are not comparable with untraced ones)')
+    parser.add_argument('--json', action='store_true',
+                        help='Print results as JSON instead of a table')
+    parser.add_argument('--save', metavar='FILE',
+                        help='Save results as JSON (e.g. to use as a --baseline)')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='Compare throughput with results saved by --save')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed throughput drop versus --baseline (default: 0.25)')
+    parser.add_argument('--thresholds', metavar='FILE',
+                        help='JSON file of absolute regression thresholds')
+
+    args = parser.parse_args()
+
+    if args.record_fixture:
+        if not args.api_key or not args.network_id:
+            parser.error('--record-fixture requires --api-key and --network-id')
+        scanner = MerakiWirelessScanner(args.api_key, args.network_id)
+        # Written beside the fixture and moved into place once complete, so a
+        # failed listing never leaves a partial fixture (or clobbers a good one)
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(os.path.abspath(args.record_fixture)),
+                                         suffix='.tmp', delete=False) as f:
+            for client in scanner.iter_clients():
+                f.write(json.dumps(client) + '\n')
+        if scanner.fetch_error is not None:
+            os.remove(f.name)
+            print(f"\n⚠ Fixture not recorded: fetching clients failed after {scanner.client_count} "
+                  f"client(s) ({scanner.fetch_error})", file=sys.stderr)
+            sys.exit(1)
+        os.replace(f.name, args.record_fixture)
+        print(f"✓ Recorded {scanner.client_count} client(s) to {args.record_fixture}")
+        return
+
+    if args.memory and args.baseline:
+        parser.error('--memory slows every stage down; compare with --baseline in an untraced run')
+
+    fixture = load_fixture(args.fixture) if args.fixture else None
+
+    results = []
+    for size in args.sizes:
+        print(f"Benchmarking {size} clients...", file=sys.stderr)
+        results.extend(benchmark_size(size, args.filter, args.per_page, args.engine, fixture, args.memory))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    failures = []
+    if args.thresholds:
+        with open(args.thresholds) as f:
+            failures.extend(check_thresholds(results, json.load(f)))
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures.extend(compare_baseline(results, json.load(f), args.tolerance))
+
+    if failures:
+        print("\n⚠ Regressions detected:", file=sys.stderr)
+        for failure in failures:
+            print(f"  - {failure}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
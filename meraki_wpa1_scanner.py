@@ -1,186 +1,1980 @@
 #!/usr/bin/env python3
 """
 Meraki Wireless Security Scanner
-Scans a Meraki network to identify clients by wireless security protocol (WPA1, WPA2, WPA3, or all).
+Scans a Meraki network (or every wireless network in an organization) to identify
+clients by wireless security protocol (WPA1, WPA2, WPA3, or all).
 """
 
 import requests
 import json
 import csv
+import gzip
+import os
 import argparse
+import asyncio
+import contextlib
+import cProfile
+import pstats
+import random
+import sqlite3
+import sys
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict
+from enum import Enum
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import httpx
+except ImportError:  # The async engine is optional
+    httpx = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+CSV_FIELDNAMES = ['description', 'mac', 'ip', 'ssid', 'security',
+                  'manufacturer', 'os', 'lastSeen', 'status']
+
+# Dashboard API budget: 10 calls per second per organization
+MERAKI_RATE_LIMIT = 10.0
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DEFAULT_POOL_SIZE = 10
+
+# (connect, read) seconds before an API call is given up and retried
+DEFAULT_TIMEOUT = (10.0, 60.0)
+
+FILTER_TYPES = ['wpa1', 'wpa2', 'wpa3', 'open', 'enterprise', 'all']
+
+EXPORT_FORMATS = ['csv', 'csv.gz', 'jsonl', 'jsonl.gz', 'parquet']
+
+FILTER_DISPLAY = {
+    'wpa1': 'WPA1',
+    'wpa2': 'WPA2',
+    'wpa3': 'WPA3',
+    'open': 'open',
+    'enterprise': 'enterprise',
+    'all': 'wireless'
+}
+
+ENRICHMENT_FIELDNAMES = ['site', 'apName', 'apModel', 'apSerial']
+
+TABLE_COLUMNS = [('description', 'Description'), ('mac', 'MAC Address'), ('ip', 'IP Address'),
+                 ('ssid', 'SSID'), ('security', 'Security'), ('manufacturer', 'Manufacturer'),
+                 ('os', 'OS'), ('lastSeen', 'Last Seen'), ('status', 'Status')]
+
+
+class SecurityProtocol(Enum):
+    """Wireless security categories a client can be classified into."""
+    WPA1 = 'wpa1'
+    WPA2 = 'wpa2'
+    WPA3 = 'wpa3'
+    OPEN = 'open'
+    ENTERPRISE = 'enterprise'
+    UNKNOWN = 'unknown'
+
+
+@lru_cache(maxsize=None)
+def classify_security(security: Optional[str]) -> FrozenSet[SecurityProtocol]:
+    """
+    Classify a security string into the categories it belongs to.
+
+    A client has exactly one of WPA1/WPA2/WPA3/OPEN/UNKNOWN, plus ENTERPRISE
+    when it authenticates with 802.1X. Results are memoized - a network only
+    reports a handful of distinct security strings, so each is parsed once.
+    """
+    if not security:
+        return frozenset({SecurityProtocol.UNKNOWN})
+
+    security_upper = security.upper()
+
+    if 'WPA3' in security_upper:
+        protocol = SecurityProtocol.WPA3
+    elif 'WPA2' in security_upper:
+        protocol = SecurityProtocol.WPA2
+    elif 'WPA' in security_upper or 'TKIP' in security_upper:
+        # WPA1 patterns: "WPA-PSK", "WPA-TKIP", or just "WPA"
+        protocol = SecurityProtocol.WPA1
+    elif 'OPEN' in security_upper or 'NONE' in security_upper:
+        protocol = SecurityProtocol.OPEN
+    else:
+        protocol = SecurityProtocol.UNKNOWN
+
+    categories = {protocol}
+    if any(marker in security_upper for marker in ('ENTERPRISE', '802.1X', 'EAP', 'RADIUS')):
+        categories.add(SecurityProtocol.ENTERPRISE)
+
+    return frozenset(categories)
+
+
+def primary_protocol(security: Optional[str]) -> SecurityProtocol:
+    """Return the single WPA1/WPA2/WPA3/OPEN/UNKNOWN protocol of a security string."""
+    return next(protocol for protocol in classify_security(security)
+                if protocol is not SecurityProtocol.ENTERPRISE)
+
+
+def _intern(value):
+    """Intern a string so repeated values share one object; pass anything else through."""
+    return sys.intern(value) if type(value) is str else value
+
+
+class ClientRecord:
+    """
+    Compact, slotted record of one wireless client.
+
+    Records behave like read-mostly dicts (record['mac'], record.get('ssid'),
+    'network' in record) but skip a per-client dict; the SSID, security,
+    manufacturer, OS and status strings repeat across thousands of clients
+    and are interned. Optional fields (network name and ID, enrichment) only
+    exist once set. Use to_dict() where a real dict is needed, e.g. for JSON.
+    """
+    FIELDS = tuple(CSV_FIELDNAMES + ['network', 'networkId'] + ENRICHMENT_FIELDNAMES)
+    __slots__ = FIELDS
+
+    def __init__(self, description, mac, ip, ssid, security, manufacturer, os, lastSeen, status):
+        self.description = description
+        self.mac = mac
+        self.ip = ip
+        self.ssid = _intern(ssid)
+        self.security = _intern(security)
+        self.manufacturer = _intern(manufacturer)
+        self.os = _intern(os)
+        self.lastSeen = lastSeen
+        self.status = _intern(status)
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, _intern(value))
+
+    def __contains__(self, key) -> bool:
+        return key in self.FIELDS and hasattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return (field for field in self.FIELDS if hasattr(self, field))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ClientRecord, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ClientRecord({self.to_dict()!r})"
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in self.FIELDS else default
+
+    def keys(self) -> List[str]:
+        return list(self)
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in self]
+
+    def to_dict(self) -> Dict:
+        """Return the record as a plain dict."""
+        return {field: getattr(self, field) for field in self}
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every Dashboard call a scan makes.
+
+    Tokens refill at `rate` per second up to `burst`. When the API answers 429
+    the whole bucket is paused for the Retry-After period, so every worker
+    backs off together instead of each one burning its retries.
+    """
+
+    def __init__(self, rate: float = MERAKI_RATE_LIMIT, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token if one is available, otherwise return how long to wait for one."""
+        if self.rate <= 0:
+            return 0.0
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if now >= self.paused_until and self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+
+            return max(self.paused_until - now, (1 - self.tokens) / self.rate)
+
+    def acquire(self):
+        """Block until a call may be made."""
+        while True:
+            wait = self._reserve()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait, without blocking the event loop, until a call may be made."""
+        while True:
+            wait = self._reserve()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds` (e.g. after a 429)."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class ScanStats:
+    """
+    Stage timers and API counters for one scan, shared by every worker.
+
+    Stages nest: time spent in an inner stage (e.g. 'api' while 'classify'
+    pulls the next page) is counted only there, so stage times add up to the
+    work actually done. Stage times are summed over worker threads and can
+    exceed the wall time of a concurrent scan. With the async engine,
+    rate-limit and retry waits happen on the event loop and count as 'api'.
+    """
+    STAGES = ['wait', 'api', 'decode', 'classify', 'export', 'output']
+    COUNTERS = ['api_calls', 'retries', 'rate_limited', 'pages', 'clients', 'bytes']
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = dict.fromkeys(self.STAGES, 0.0)
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.lock = threading.Lock()
+        self._local = threading.local()
+
+    def count(self, counter: str, amount: int = 1):
+        with self.lock:
+            self.counters[counter] += amount
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Time a block as `name`, excluding any stages nested inside it."""
+        stack = self._local.__dict__.setdefault('stack', [])
+        nested = [0.0]
+        stack.append(nested)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            with self.lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed - nested[0]
+
+    def to_dict(self, **settings) -> Dict:
+        """Return the stats (plus any scan settings passed in) as a JSON-ready dict."""
+        wall = time.perf_counter() - self.started
+        with self.lock:
+            return {
+                'wall_seconds': round(wall, 4),
+                'stages': {name: round(seconds, 4) for name, seconds in self.stages.items()},
+                'counters': dict(self.counters),
+                'settings': settings
+            }
+
+    def report(self, fmt: str = 'table', out=None, **settings):
+        """Write the stats as an aligned table or as a single JSON line."""
+        out = out or sys.stderr
+        stats = self.to_dict(**settings)
+
+        if fmt == 'json':
+            out.write(json.dumps(stats) + '\n')
+            out.flush()
+            return
+
+        counters = stats['counters']
+        busy = sum(stats['stages'].values()) or 1.0
+        api_calls = counters['api_calls']
+        lines = [f"\nScan statistics ({stats['wall_seconds']:.2f}s wall, stage times summed over workers):",
+                 f"  {'Stage':<12} {'Seconds':>10} {'Share':>7}"]
+        for name, seconds in stats['stages'].items():
+            lines.append(f"  {name:<12} {seconds:>10.3f} {seconds / busy:>7.1%}")
+        lines += [
+            f"  {'API calls':<12} {api_calls:>10}"
+            + (f"  ({stats['stages']['api'] / api_calls * 1000:.0f} ms avg)" if api_calls else ''),
+            f"  {'Retries':<12} {counters['retries']:>10}  ({counters['rate_limited']} rate limited)",
+            f"  {'Pages':<12} {counters['pages']:>10}",
+            f"  {'Clients':<12} {counters['clients']:>10}"
+            + (f"  ({counters['clients'] / stats['wall_seconds']:.0f}/s)" if stats['wall_seconds'] else ''),
+            f"  {'Downloaded':<12} {counters['bytes'] / 1e6:>10.2f} MB"
+        ]
+        out.write('\n'.join(lines) + '\n')
+        out.flush()
+
+
+# Stand-in for ScanStats.stage() when a scan isn't instrumented
+_NO_STAGE = contextlib.nullcontext()
+
+
+def _response_bytes(response) -> int:
+    """Bytes received for a requests or httpx response, before decompression where known."""
+    if hasattr(response, 'num_bytes_downloaded'):
+        return response.num_bytes_downloaded
+    try:
+        return response.raw.tell()
+    except (AttributeError, OSError, ValueError):
+        return len(response.content)
+
+
+def _parse_last_seen(value) -> Optional[float]:
+    """Convert a client's lastSeen (epoch seconds or ISO 8601) to epoch seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class CachePlan(NamedTuple):
+    """How SnapshotCache.iter_clients() serves one network, decided up front."""
+    window: Optional[int]       # Seconds to fetch from the API; None serves the snapshot as-is
+    age: Optional[float]        # Age of the usable snapshot, None if there is none
+    planned_at: float           # Recorded as the new snapshot's fetch time
+
+
+class SnapshotCache:
+    """
+    On-disk cache of client listings, one gzip-compressed JSON Lines snapshot
+    per network and timespan.
+
+    Snapshots younger than `ttl` are served as-is. Older snapshots that still
+    fall inside the timespan are refreshed incrementally: only the window since
+    the snapshot was taken is fetched, merged by MAC, and clients that have
+    aged out of the timespan are dropped.
+    """
+
+    # Extra seconds fetched on incremental refresh so no client falls between snapshots
+    REFRESH_OVERLAP = 300
+
+    def __init__(self, cache_dir: str = None, ttl: int = 900, refresh: bool = False):
+        self.cache_dir = cache_dir or os.path.join(os.path.expanduser('~'), '.cache', 'meraki_wpa1_scanner')
+        self.ttl = ttl
+        self.refresh = refresh
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _paths(self, network_id: str, timespan: int):
+        base = os.path.join(self.cache_dir, f"{network_id}_{timespan}")
+        return f"{base}.jsonl.gz", f"{base}.meta.json"
+
+    def _load_meta(self, meta_path: str) -> Optional[Dict]:
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _read(self, snapshot_path: str) -> Iterator[Dict]:
+        with gzip.open(snapshot_path, 'rt') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def _commit(self, tmp_path: str, snapshot_path: str, meta_path: str, meta: Dict):
+        os.replace(tmp_path, snapshot_path)
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+
+    def plan(self, network_id: str, timespan: int) -> CachePlan:
+        """
+        Decide what iter_clients() will ask the API for.
+
+        Returns:
+            A CachePlan whose window is None if a fresh snapshot is served
+            without an API call, the refresh window if the snapshot can be
+            refreshed incrementally, otherwise the full timespan
+        """
+        now = time.time()
+        snapshot_path, meta_path = self._paths(network_id, timespan)
+        meta = None if self.refresh else self._load_meta(meta_path)
+        if not meta or not os.path.exists(snapshot_path):
+            return CachePlan(timespan, None, now)
+
+        age = now - meta['fetched_at']
+        if age <= self.ttl:
+            return CachePlan(None, age, now)
+        if age < timespan:
+            return CachePlan(int(age) + self.REFRESH_OVERLAP, age, now)
+        return CachePlan(timespan, None, now)
+
+    def iter_clients(self, network_id: str, timespan: int, fetch_pages,
+                     plan: Optional[CachePlan] = None) -> Iterator[Dict]:
+        """
+        Stream a network's clients, from the cache where possible.
+
+        Args:
+            network_id: Meraki network ID
+            timespan: Time in seconds to look back
+            fetch_pages: Callable taking a timespan and returning an iterator
+                         of client pages from the API
+            plan: Decision from plan(), when the caller already fetched the
+                  pages it asks for; otherwise it is made here. Either way
+                  fetch_pages is called at most once, with plan.window
+
+        Yields:
+            Client dictionaries
+        """
+        snapshot_path, meta_path = self._paths(network_id, timespan)
+        plan = plan or self.plan(network_id, timespan)
+
+        if plan.window is None:
+            print(f"Using cached snapshot for {network_id} ({int(plan.age)}s old)")
+            yield from self._read(snapshot_path)
+            return
+
+        if plan.age is not None:
+            print(f"Refreshing cached snapshot for {network_id} (last {plan.window}s)")
+            self._merge(snapshot_path, meta_path, fetch_pages(plan.window), plan.planned_at, timespan)
+            yield from self._read(snapshot_path)
+            return
+
+        # No usable snapshot - fetch everything, writing it through as it streams
+        tmp_path = f"{snapshot_path}.{threading.get_ident()}.tmp"
+        count = 0
+        try:
+            with gzip.open(tmp_path, 'wt') as f:
+                for page in fetch_pages(plan.window):
+                    for client in page:
+                        f.write(json.dumps(client) + '\n')
+                        count += 1
+                        yield client
+            self._commit(tmp_path, snapshot_path, meta_path,
+                         {'fetched_at': plan.planned_at, 'timespan': timespan, 'count': count})
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _merge(self, snapshot_path: str, meta_path: str, pages: Iterator[List[Dict]],
+               fetched_at: float, timespan: int):
+        """Merge freshly fetched pages into a snapshot, keyed by MAC."""
+        fresh = {}
+        for page in pages:
+            for client in page:
+                fresh[client.get('mac') or client.get('id')] = client
+
+        oldest = fetched_at - timespan
+        tmp_path = f"{snapshot_path}.{threading.get_ident()}.tmp"
+        count = 0
+        try:
+            with gzip.open(tmp_path, 'wt') as f:
+                for client in self._read(snapshot_path):
+                    if (client.get('mac') or client.get('id')) in fresh:
+                        continue
+                    last_seen = _parse_last_seen(client.get('lastSeen'))
+                    if last_seen is not None and last_seen < oldest:
+                        continue
+                    f.write(json.dumps(client) + '\n')
+                    count += 1
+                for client in fresh.values():
+                    f.write(json.dumps(client) + '\n')
+                    count += 1
+            self._commit(tmp_path, snapshot_path, meta_path,
+                         {'fetched_at': fetched_at, 'timespan': timespan, 'count': count})
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class ScanHistory:
+    """
+    SQLite store of past scan results for trend tracking and diffing.
+
+    Every recorded scan keeps one row per wireless client, indexed by
+    (network, mac, scan), so comparing two audits is a pair of indexed joins.
+    Rows are keyed on the network ID, which survives renames; the name is kept
+    alongside for display.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS scans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scope TEXT NOT NULL,
+            scanned_at TEXT NOT NULL,
+            timespan INTEGER,
+            client_count INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_scans_scope ON scans (scope, scanned_at);
+
+        CREATE TABLE IF NOT EXISTS scan_clients (
+            scan_id INTEGER NOT NULL REFERENCES scans (id),
+            network TEXT NOT NULL,
+            mac TEXT NOT NULL,
+            description TEXT,
+            ssid TEXT,
+            security TEXT,
+            protocol TEXT,
+            last_seen TEXT,
+            network_name TEXT,
+            PRIMARY KEY (scan_id, network, mac)
+        );
+        CREATE INDEX IF NOT EXISTS idx_scan_clients_network_mac ON scan_clients (network, mac, scan_id);
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(self.SCHEMA)
+
+        # Databases created before network names were stored separately
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(scan_clients)")}
+        if 'network_name' not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE scan_clients ADD COLUMN network_name TEXT")
+
+    def record_scan(self, scope: str, clients: Iterable[Dict], timespan: int = None) -> int:
+        """
+        Store a scan's wireless clients.
+
+        Args:
+            scope: Network or organization ID the scan covered
+            clients: Client records as produced by the scanner
+            timespan: Timespan the scan looked back over
+
+        Returns:
+            ID of the recorded scan
+        """
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO scans (scope, scanned_at, timespan, client_count) VALUES (?, ?, ?, 0)",
+                (scope, datetime.now().isoformat(timespec='seconds'), timespan))
+            scan_id = cursor.lastrowid
+
+            rows = (
+                (scan_id, client.get('networkId', scope), client.get('network'), client['mac'],
+                 client['description'], client['ssid'], client['security'],
+                 primary_protocol(client['security']).value, str(client['lastSeen']))
+                for client in clients
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO scan_clients "
+                "(scan_id, network, network_name, mac, description, ssid, security, protocol, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+            self.conn.execute(
+                "UPDATE scans SET client_count = (SELECT COUNT(*) FROM scan_clients WHERE scan_id = ?) "
+                "WHERE id = ?", (scan_id, scan_id))
+
+        return scan_id
+
+    def list_scans(self, scope: Optional[str] = None) -> List[Dict]:
+        """List recorded scans, newest first, optionally limited to one scope."""
+        query = "SELECT * FROM scans"
+        params = ()
+        if scope:
+            query += " WHERE scope = ?"
+            params = (scope,)
+        query += " ORDER BY id DESC"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def diff(self, old_scan_id: int, new_scan_id: int) -> Dict[str, List[Dict]]:
+        """
+        Compare two scans of the same network or organization.
+
+        Returns:
+            Dict with the clients that 'appeared' in the new scan, 'disappeared'
+            from it, and 'changed' protocol between the two
+
+        Raises:
+            ValueError: If either scan is missing or they cover different scopes
+        """
+        scopes = {row['id']: row['scope'] for row in self.conn.execute(
+            "SELECT id, scope FROM scans WHERE id IN (?, ?)", (old_scan_id, new_scan_id))}
+        for scan_id in (old_scan_id, new_scan_id):
+            if scan_id not in scopes:
+                raise ValueError(f"No scan #{scan_id} in {self.db_path}")
+        if scopes[old_scan_id] != scopes[new_scan_id]:
+            raise ValueError(f"Scan #{old_scan_id} covers {scopes[old_scan_id]} but scan #{new_scan_id} "
+                             f"covers {scopes[new_scan_id]}; only scans of the same scope can be compared")
+
+        only_in = """
+            SELECT b.* FROM scan_clients b
+            LEFT JOIN scan_clients a
+                ON a.scan_id = ? AND a.network = b.network AND a.mac = b.mac
+            WHERE b.scan_id = ? AND a.mac IS NULL
+            ORDER BY b.network, b.mac
+        """
+        changed = """
+            SELECT b.network, b.network_name, b.mac, b.description, b.ssid,
+                   a.protocol AS old_protocol, b.protocol AS new_protocol,
+                   a.security AS old_security, b.security AS new_security
+            FROM scan_clients b
+            JOIN scan_clients a
+                ON a.scan_id = ? AND a.network = b.network AND a.mac = b.mac
+            WHERE b.scan_id = ? AND a.protocol != b.protocol
+            ORDER BY b.network, b.mac
+        """
+        return {
+            'appeared': [dict(row) for row in self.conn.execute(only_in, (old_scan_id, new_scan_id))],
+            'disappeared': [dict(row) for row in self.conn.execute(only_in, (new_scan_id, old_scan_id))],
+            'changed': [dict(row) for row in self.conn.execute(changed, (old_scan_id, new_scan_id))]
+        }
+
+    def print_diff(self, diff: Dict[str, List[Dict]], old_scan_id: int, new_scan_id: int):
+        """Print a scan diff in a readable format."""
+        print(f"\nChanges between scan #{old_scan_id} and scan #{new_scan_id}:")
+
+        for section, title in (('appeared', 'Appeared'), ('disappeared', 'Disappeared')):
+            print(f"\n{title} ({len(diff[section])}):")
+            for client in diff[section]:
+                print(f"  {client['network_name'] or client['network']}  {client['mac']}  "
+                      f"{client['description']}  [{client['ssid']}, {client['protocol'].upper()}]")
+
+        print(f"\nChanged protocol ({len(diff['changed'])}):")
+        for client in diff['changed']:
+            print(f"  {client['network_name'] or client['network']}  {client['mac']}  "
+                  f"{client['description']}  {client['old_protocol'].upper()} -> {client['new_protocol'].upper()}")
+
+    def close(self):
+        self.conn.close()
+
+
+class ResultWriter:
+    """
+    Streaming writer for scan results.
+
+    Rows are written as soon as each network's client listing is complete
+    (see BufferedResultWriter), so exports take memory for one network's
+    matching clients at most. The output is only created when the first row
+    arrives; a path of '-' writes to stdout. Writes are
+    serialized, so one writer can be fed from several scan threads.
+    """
+
+    def __init__(self, path: str, fieldnames: List[str]):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.count = 0
+        self.lock = threading.Lock()
+        self.stats = None  # Optional ScanStats; writes are timed as 'export'
+        self._stdout = sys.stdout
+        self._file = None
+
+    def _open_text(self, compress: bool):
+        if self.path == '-':
+            return gzip.open(self._stdout.buffer, 'wt', newline='') if compress else self._stdout
+        if compress:
+            return gzip.open(self.path, 'wt', newline='')
+        return open(self.path, 'w', newline='')
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _write(self, record: Dict):
+        raise NotImplementedError
+
+    def write(self, record: Dict):
+        with self.stats.stage('export') if self.stats else _NO_STAGE, self.lock:
+            if self._file is None:
+                self._file = self._open()
+            self._write(record)
+            self.count += 1
+
+    def write_many(self, records: List[Dict]):
+        """Write several records in one go, without other threads' rows in between."""
+        if not records:
+            return
+        with self.stats.stage('export') if self.stats else _NO_STAGE, self.lock:
+            if self._file is None:
+                self._file = self._open()
+            for record in records:
+                self._write(record)
+            self.count += len(records)
+
+    def close(self):
+        if self._file is not None and self._file is not self._stdout:
+            self._file.close()
+        elif self._file is self._stdout:
+            self._stdout.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class BufferedResultWriter:
+    """
+    Holds rows for a ResultWriter until commit().
+
+    Every scanned network gets its own buffer, so a network whose client
+    listing fails part-way never gets its partial rows into an export.
+    """
+
+    def __init__(self, target: ResultWriter):
+        self.target = target
+        self.rows = []
+
+    def write(self, record: Dict):
+        self.rows.append(record)
+
+    def commit(self):
+        """Pass the buffered rows on to the target writer."""
+        self.target.write_many(self.rows)
+        self.rows = []
+
+
+class CsvResultWriter(ResultWriter):
+    """CSV output, optionally gzip-compressed."""
+
+    def __init__(self, path: str, fieldnames: List[str], compress: bool = False):
+        super().__init__(path, fieldnames)
+        self.compress = compress
+
+    def _open(self):
+        f = self._open_text(self.compress)
+        self._writer = csv.DictWriter(f, fieldnames=self.fieldnames, extrasaction='ignore')
+        self._writer.writeheader()
+        return f
+
+    def _write(self, record: Dict):
+        self._writer.writerow(record)
+
+
+class JsonlResultWriter(ResultWriter):
+    """JSON Lines output (one client object per line), optionally gzip-compressed."""
+
+    def __init__(self, path: str, fieldnames: List[str], compress: bool = False):
+        super().__init__(path, fieldnames)
+        self.compress = compress
+
+    def _open(self):
+        return self._open_text(self.compress)
+
+    def _write(self, record: Dict):
+        self._file.write(json.dumps({field: record.get(field) for field in self.fieldnames}) + '\n')
+
+
+class ParquetResultWriter(ResultWriter):
+    """Parquet output, written in row groups of `batch_size` clients (requires pyarrow)."""
+
+    def __init__(self, path: str, fieldnames: List[str], batch_size: int = 50000):
+        if pq is None:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        super().__init__(path, fieldnames)
+        self.batch_size = batch_size
+        self.schema = pa.schema([(field, pa.string()) for field in fieldnames])
+        self._batch = {field: [] for field in fieldnames}
+
+    def _open(self):
+        sink = self._stdout.buffer if self.path == '-' else self.path
+        return pq.ParquetWriter(sink, self.schema, compression='snappy')
+
+    def _write(self, record: Dict):
+        for field in self.fieldnames:
+            value = record.get(field)
+            self._batch[field].append(None if value is None else str(value))
+        if len(self._batch[self.fieldnames[0]]) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._batch[self.fieldnames[0]]:
+            self._file.write_table(pa.table(self._batch, schema=self.schema))
+            self._batch = {field: [] for field in self.fieldnames}
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._flush()
+                self._file.close()
+
+
+def export_format_for(path: str) -> str:
+    """Infer the export format from a filename's extension (default csv)."""
+    for fmt in sorted(EXPORT_FORMATS, key=len, reverse=True):
+        if path.endswith('.' + fmt):
+            return fmt
+    if path.endswith(('.ndjson', '.ndjson.gz')):
+        return 'jsonl.gz' if path.endswith('.gz') else 'jsonl'
+    return 'csv'
+
+
+def open_result_writer(path: str, fmt: Optional[str] = None,
+                       fieldnames: Optional[List[str]] = None) -> ResultWriter:
+    """
+    Create a streaming writer for scan results.
+
+    Args:
+        path: Output file, or '-' for stdout
+        fmt: One of EXPORT_FORMATS (default: inferred from the path)
+        fieldnames: Columns to write (default: CSV_FIELDNAMES)
+
+    Returns:
+        A ResultWriter; close it (or use it as a context manager) when done
+    """
+    fmt = fmt or export_format_for(path)
+    fieldnames = fieldnames or CSV_FIELDNAMES
+
+    if fmt in ('csv', 'csv.gz'):
+        return CsvResultWriter(path, fieldnames, compress=fmt.endswith('.gz'))
+    if fmt in ('jsonl', 'jsonl.gz'):
+        return JsonlResultWriter(path, fieldnames, compress=fmt.endswith('.gz'))
+    if fmt == 'parquet':
+        return ParquetResultWriter(path, fieldnames)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+class DeviceIndex:
+    """
+    Lookup index of network devices (APs) used to enrich client records.
+
+    Built once from a device inventory listing and keyed by serial and MAC,
+    so each client is joined to the AP it last connected through in O(1).
+    An organization-wide index is shared by every network in an org scan.
+    """
+
+    def __init__(self, devices: Iterable[Dict], network_names: Optional[Dict[str, str]] = None):
+        self.network_names = network_names or {}
+        self.by_serial = {}
+        self.by_mac = {}
+
+        for device in devices:
+            if device.get('serial'):
+                self.by_serial[device['serial']] = device
+            if device.get('mac'):
+                self.by_mac[device['mac'].lower()] = device
+
+    def __len__(self):
+        return len(self.by_serial)
+
+    def lookup(self, client: Dict) -> Optional[Dict]:
+        """Return the device a client was last seen on, if it is in the index."""
+        device = self.by_serial.get(client.get('recentDeviceSerial'))
+        if device is None and client.get('recentDeviceMac'):
+            device = self.by_mac.get(client['recentDeviceMac'].lower())
+        return device
+
+    def enrich(self, record: Dict, client: Dict):
+        """Add the client's AP and site to a client record."""
+        device = self.lookup(client)
+
+        if device is None:
+            record['apName'] = client.get('recentDeviceName') or 'Unknown'
+            record['apModel'] = 'Unknown'
+            record['apSerial'] = client.get('recentDeviceSerial') or 'Unknown'
+            record['site'] = 'Unknown'
+            return
+
+        record['apName'] = device.get('name') or device.get('serial')
+        record['apModel'] = device.get('model', 'Unknown')
+        record['apSerial'] = device.get('serial', 'Unknown')
+        network_id = device.get('networkId')
+        record['site'] = self.network_names.get(network_id, network_id or 'Unknown')
+
+
+class AsyncMerakiClient:
+    """
+    asyncio Dashboard API client built on httpx.
+
+    Used by MerakiWirelessScanner when engine='async': every request runs on a
+    single event loop in the calling thread, so many networks can be fetched
+    at once without a thread per request. Requests share the scanner's rate
+    limiter, are capped per host, and follow the same 429/Retry-After and
+    backoff rules as the threaded engine. Failures are raised as
+    requests.exceptions.RequestException so callers handle both engines alike.
+    """
+
+    def __init__(self, headers: Dict, rate_limiter: RateLimiter, max_retries: int = 5,
+                 pool_size: int = DEFAULT_POOL_SIZE, per_host_limit: Optional[int] = None,
+                 stats: Optional[ScanStats] = None, timeout: Tuple[float, float] = DEFAULT_TIMEOUT):
+        if httpx is None:
+            raise RuntimeError("The async engine requires httpx (pip install httpx)")
+
+        self.headers = headers
+        self.rate_limiter = rate_limiter
+        self.stats = stats
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit or pool_size
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self._client = None
+        self._host_limits = {}
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    def run(self, coro):
+        """Run a coroutine to completion on this client's loop, cancelling it if interrupted."""
+        task = self.loop.create_task(coro)
+        try:
+            # Time on the loop is API time, less any stages nested inside it
+            with self.stats.stage('api') if self.stats else _NO_STAGE:
+                return self.loop.run_until_complete(task)
+        except BaseException:
+            task.cancel()
+            self.loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+            raise
+
+    async def request(self, method: str, url: str, params: Optional[Dict] = None) -> 'httpx.Response':
+        """Make a rate-limited Dashboard API call with the same retry rules as the threaded engine."""
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.pool_size,
+                                  max_keepalive_connections=self.pool_size)
+            connect, read = self.timeout
+            self._client = httpx.AsyncClient(headers=self.headers, limits=limits,
+                                             timeout=httpx.Timeout(read, connect=connect))
+
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire_async()
+            backoff = min(2 ** attempt, 30) * random.uniform(0.5, 1.5)
+
+            if self.stats:
+                self.stats.count('api_calls')
+                if attempt:
+                    self.stats.count('retries')
+
+            try:
+                async with self._host_limit(url):
+                    response = await self._client.request(method, url, params=params)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise requests.exceptions.ConnectionError(str(e)) from e
+                await asyncio.sleep(backoff)
+                continue
+
+            if self.stats:
+                self.stats.count('bytes', _response_bytes(response))
+
+            if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                if response.is_error:
+                    raise requests.exceptions.HTTPError(
+                        f"{response.status_code} Error for url: {response.url}")
+                return response
+
+            if response.status_code == 429:
+                if self.stats:
+                    self.stats.count('rate_limited')
+                try:
+                    delay = float(response.headers.get('Retry-After', backoff))
+                except ValueError:
+                    delay = backoff
+                self.rate_limiter.pause(delay)
+                await asyncio.sleep(delay + random.uniform(0, 0.5))
+            else:
+                await asyncio.sleep(backoff)
+
+    async def iter_pages(self, url: str, params: Optional[Dict]):
+        """Async generator over the pages of a paginated listing (follows Link: rel=next)."""
+        while url:
+            response = await self.request('GET', url, params=params)
+            if self.stats:
+                self.stats.count('pages')
+                with self.stats.stage('decode'):
+                    page = response.json()
+            else:
+                page = response.json()
+            yield page
+
+            next_link = response.links.get('next')
+            url = next_link['url'] if next_link else None
+            params = None
+
+    async def fetch_pages(self, url: str, params: Optional[Dict]) -> List[List[Dict]]:
+        """Fetch every page of a paginated listing."""
+        return [page async for page in self.iter_pages(url, params)]
+
+    def iter_pages_blocking(self, url: str, params: Optional[Dict]) -> Iterator[List[Dict]]:
+        """
+        Synchronous view of iter_pages() for the scanner's blocking API.
+
+        Raises:
+            RuntimeError: If called from code already running on the loop,
+                          which must await iter_pages() instead
+        """
+        if self.loop.is_running():
+            raise RuntimeError("iter_pages_blocking() called from inside the event loop; await iter_pages()")
+        pages = self.iter_pages(url, params)
+        try:
+            while True:
+                try:
+                    yield self.run(pages.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.run(pages.aclose())
+
+    def close(self):
+        if self._client is not None:
+            self.run(self._client.aclose())
+        self.loop.close()
+
 
 class MerakiWirelessScanner:
-    def __init__(self, api_key: str, network_id: str):
+    def __init__(self, api_key: str, network_id: Optional[str] = None,
+                 session: Optional[requests.Session] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 max_retries: int = 5, pool_size: int = DEFAULT_POOL_SIZE,
+                 cache: Optional[SnapshotCache] = None, engine: str = 'threads',
+                 async_client: Optional[AsyncMerakiClient] = None, enrich: bool = False,
+                 device_index: Optional[DeviceIndex] = None, stats: Optional[ScanStats] = None,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT):
         self.api_key = api_key
         self.network_id = network_id
         self.base_url = "https://api.meraki.com/api/v1"
+        self.client_count = 0
+        self.fetch_error = None
         self.headers = {
             'X-Cisco-Meraki-API-Key': api_key,
-            'Content-Type': 'application/json'
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
         }
 
-    def get_clients(self, timespan: int = 2592000) -> List[Dict]:
+        # A session can be shared between scanners (e.g. one per network in an
+        # organization scan) so they all reuse the same connections
+        self.session = session or self._create_session(pool_size)
+
+        # Likewise the rate limiter, so parallel scans share the org's budget
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+
+        # (connect, read) timeout for every API call, so a stalled connection
+        # is retried instead of hanging the scan
+        self.timeout = timeout
+
+        # Optional instrumentation (--stats), shared like the rate limiter
+        self.stats = stats
+
+        # Optional local snapshot cache of client listings
+        self.cache = cache
+
+        # 'threads' uses the requests session; 'async' runs every call on an
+        # asyncio event loop through AsyncMerakiClient
+        self.engine = engine
+        self.async_client = async_client
+        if engine == 'async' and async_client is None:
+            self.async_client = AsyncMerakiClient(self.headers, self.rate_limiter,
+                                                  max_retries, pool_size, stats=stats, timeout=timeout)
+        # Set by an async organization scan: the listing it already fetched,
+        # and the snapshot cache plan the fetch followed
+        self._prefetched_pages = None
+        self._cache_plan = None
+        # Networks the last organization scan could not fetch
+        self.failed_networks = []
+
+        # Device inventory join; org scans build one index and share it
+        self.enrich = enrich
+        self.device_index = device_index
+
+    def _create_session(self, pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
         """
-        Retrieve all clients from the network.
+        Create a keep-alive session with a connection pool of `pool_size`.
+
+        Size the pool to at least the number of concurrent workers, otherwise
+        connections are discarded and re-established under load. Retries are
+        handled by _request, so the adapter itself never retries.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(self.headers)
+        session.headers['Connection'] = 'keep-alive'
+        return session
+
+    def _child_scanner(self, network_id: str) -> 'MerakiWirelessScanner':
+        """Create a scanner for another network sharing this one's session, rate limiter and cache."""
+        scanner = MerakiWirelessScanner(self.api_key, network_id, session=self.session,
+                                        rate_limiter=self.rate_limiter,
+                                        max_retries=self.max_retries, cache=self.cache,
+                                        engine=self.engine, async_client=self.async_client,
+                                        enrich=self.enrich, device_index=self.device_index,
+                                        stats=self.stats, timeout=self.timeout)
+        scanner.base_url = self.base_url
+        return scanner
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Make a Dashboard API call through the shared rate limiter.
+
+        429 responses are retried after their Retry-After delay, transient
+        server and connection errors with jittered exponential backoff. The
+        last error is raised once max_retries is exhausted. Calls time out
+        after self.timeout unless a timeout is passed in.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        with self._stage('api'):
+            for attempt in range(self.max_retries + 1):
+                with self._stage('wait'):
+                    self.rate_limiter.acquire()
+                backoff = min(2 ** attempt, 30) * random.uniform(0.5, 1.5)
+
+                if self.stats:
+                    self.stats.count('api_calls')
+                    if attempt:
+                        self.stats.count('retries')
+
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    if attempt == self.max_retries:
+                        raise
+                    with self._stage('wait'):
+                        time.sleep(backoff)
+                    continue
+
+                if self.stats:
+                    self.stats.count('bytes', _response_bytes(response))
+
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return response
+
+                if response.status_code == 429:
+                    if self.stats:
+                        self.stats.count('rate_limited')
+                    try:
+                        delay = float(response.headers.get('Retry-After', backoff))
+                    except ValueError:
+                        delay = backoff
+                    self.rate_limiter.pause(delay)
+                    # Jitter so paused workers don't all wake on the same tick
+                    with self._stage('wait'):
+                        time.sleep(delay + random.uniform(0, 0.5))
+                else:
+                    with self._stage('wait'):
+                        time.sleep(backoff)
+
+    def _stage(self, name: str):
+        """Time a block as stage `name` when the scan is instrumented."""
+        return self.stats.stage(name) if self.stats else _NO_STAGE
+
+    def _decode(self, response) -> object:
+        """Decode a JSON response body, timed as the 'decode' stage."""
+        with self._stage('decode'):
+            return response.json()
+
+    def _get_json(self, path: str, params: Optional[Dict] = None):
+        """GET a single (unpaginated) Dashboard API resource with either engine."""
+        url = f"{self.base_url}{path}"
+        if self.engine == 'async':
+            return self._decode(self.async_client.run(self.async_client.request('GET', url, params=params)))
+        return self._decode(self._request('GET', url, params=params))
+
+    def _iter_pages(self, path: str, params: Dict) -> Iterator[List[Dict]]:
+        """
+        Yield the pages of a paginated Dashboard API listing.
+
+        Follows the `Link: rel=next` header (which carries the `startingAfter`
+        cursor) until the last page has been returned.
+        """
+        url = f"{self.base_url}{path}"
+
+        if self.engine == 'async':
+            yield from self.async_client.iter_pages_blocking(url, params)
+            return
+
+        while url:
+            response = self._request('GET', url, params=params)
+            if self.stats:
+                self.stats.count('pages')
+            yield self._decode(response)
+
+            # The next link already encodes the original query and the cursor
+            url = response.links.get('next', {}).get('url')
+            params = None
+
+    def get_networks(self, org_id: str, product_type: Optional[str] = 'wireless') -> List[Dict]:
+        """
+        List the networks in an organization.
 
         Args:
-            timespan: Time in seconds to look back (default 30 days = 2592000)
+            org_id: Meraki organization ID
+            product_type: Only return networks containing this product type
+                          (default 'wireless'; None returns every network)
 
         Returns:
-            List of client dictionaries
+            List of network dictionaries
+        """
+        networks = []
+        for page in self._iter_pages(f"/organizations/{org_id}/networks", {'perPage': 1000}):
+            networks.extend(
+                network for network in page
+                if product_type is None or product_type in network.get('productTypes', [])
+            )
+        return networks
+
+    def get_device_index(self, org_id: Optional[str] = None,
+                         networks: Optional[List[Dict]] = None) -> DeviceIndex:
         """
-        url = f"{self.base_url}/networks/{self.network_id}/clients"
-        params = {'timespan': timespan}
+        Fetch the device inventory once and index it for client enrichment.
+
+        Args:
+            org_id: Index every device in this organization (one paginated
+                    listing for all networks); otherwise this scanner's network
+            networks: Known networks, used to name each device's site
+
+        Returns:
+            DeviceIndex, also stored on the scanner for reuse
+        """
+        if org_id:
+            devices = (device for page in self._iter_pages(f"/organizations/{org_id}/devices",
+                                                           {'perPage': 1000})
+                       for device in page)
+            names = {network['id']: network.get('name', network['id']) for network in networks or []}
+        else:
+            devices = (device for page in self._iter_pages(f"/networks/{self.network_id}/devices", {})
+                       for device in page)
+            network = self._get_json(f"/networks/{self.network_id}")
+            names = {self.network_id: network.get('name', self.network_id)}
+
+        self.device_index = DeviceIndex(devices, names)
+        print(f"Indexed {len(self.device_index)} device(s) for enrichment")
+        return self.device_index
+
+    def iter_client_pages(self, timespan: int = 2592000, per_page: int = 1000) -> Iterator[List[Dict]]:
+        """
+        Yield clients from the network one page at a time.
+
+        Args:
+            timespan: Time in seconds to look back (default 30 days = 2592000)
+            per_page: Number of clients requested per page (Dashboard max 5000)
+
+        Yields:
+            Lists of client dictionaries, one list per API page
+        """
+        if self._prefetched_pages is not None:
+            # Pages already fetched concurrently by an async organization scan
+            pages, self._prefetched_pages = self._prefetched_pages, None
+            return iter(pages)
+
+        params = {'timespan': timespan, 'perPage': per_page}
+        return self._iter_pages(f"/networks/{self.network_id}/clients", params)
+
+    def iter_clients(self, timespan: int = 2592000, per_page: int = 1000) -> Iterator[Dict]:
+        """
+        Stream all clients from the network without holding them in memory.
+
+        When a snapshot cache is configured, clients are served from (and
+        written through to) the cache.
+
+        Args:
+            timespan: Time in seconds to look back (default 30 days = 2592000)
+            per_page: Number of clients requested per page (Dashboard max 5000)
+
+        Yields:
+            Client dictionaries
+        """
+        self.client_count = 0
+        self.fetch_error = None
 
         try:
             print(f"Fetching clients from network {self.network_id}...")
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            clients = response.json()
-            print(f"Retrieved {len(clients)} total clients")
-            return clients
+            if self.cache is not None:
+                plan, self._cache_plan = self._cache_plan, None
+                clients = self.cache.iter_clients(
+                    self.network_id, timespan,
+                    lambda window: self.iter_client_pages(window, per_page), plan)
+            else:
+                clients = (client for page in self.iter_client_pages(timespan, per_page) for client in page)
+
+            for client in clients:
+                self.client_count += 1
+                yield client
+            print(f"Retrieved {self.client_count} total clients")
         except requests.exceptions.RequestException as e:
+            self.fetch_error = e
             print(f"Error fetching clients: {e}")
             if hasattr(e, 'response') and e.response is not None:
                 print(f"Response: {e.response.text}")
-            return []
+        finally:
+            if self.stats:
+                self.stats.count('clients', self.client_count)
 
-    def identify_clients(self, clients: List[Dict], filter_type: str = 'wpa1') -> List[Dict]:
+    def get_clients(self, timespan: int = 2592000, per_page: int = 1000) -> List[Dict]:
+        """
+        Retrieve all clients from the network.
+
+        Args:
+            timespan: Time in seconds to look back (default 30 days = 2592000)
+            per_page: Number of clients requested per page (Dashboard max 5000)
+
+        Returns:
+            List of client dictionaries
+        """
+        return list(self.iter_clients(timespan, per_page))
+
+    def identify_clients(self, clients: Iterable[Dict], filter_type: str = 'wpa1') -> List[ClientRecord]:
         """
         Filter clients based on wireless security protocol.
 
         Args:
-            clients: List of all clients
-            filter_type: Type of filter ('wpa1', 'wpa2', 'wpa3', or 'all')
+            clients: List (or any iterable, e.g. iter_clients()) of all clients
+            filter_type: Type of filter ('wpa1', 'wpa2', 'wpa3', 'open', 'enterprise', or 'all')
 
         Returns:
             List of filtered wireless clients
         """
-        filtered_clients = []
+        return list(self.iter_identified_clients(clients, filter_type))
+
+    def iter_identified_clients(self, clients: Iterable[Dict],
+                                filter_type: str = 'wpa1') -> Iterator[ClientRecord]:
+        """
+        Lazily filter clients based on wireless security protocol.
+
+        Args:
+            clients: Iterable of all clients
+            filter_type: Type of filter ('wpa1', 'wpa2', 'wpa3', 'open', 'enterprise', or 'all')
+
+        Yields:
+            Filtered wireless client records
+        """
+        # Resolve the filter once instead of re-checking it for every client
+        wanted = None if filter_type == 'all' else SecurityProtocol(filter_type)
 
         for client in clients:
             # Check if this is a wireless client
             if client.get('ssid') is None:
                 continue
 
-            # Check various fields that might contain security protocol info
-            security = None
+            security = self._client_security(client)
 
-            # Primary location for security info
-            if 'recentDeviceConnection' in client:
-                recent_conn = client['recentDeviceConnection']
-                # Check if it's a dictionary before calling .get()
-                if isinstance(recent_conn, dict):
-                    security = recent_conn.get('security', '')
-                elif isinstance(recent_conn, str):
-                    security = recent_conn
+            if wanted is None or wanted in classify_security(security):
+                yield self._build_record(client, security)
 
-            # Alternative location
-            if not security and 'security' in client:
-                security = client.get('security', '')
+    def bucket_clients(self, clients: Iterable[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Sort wireless clients into every security category in a single pass.
 
-            # Determine if client matches filter
-            should_include = False
+        Args:
+            clients: Iterable of all clients
 
-            if filter_type == 'all':
-                # Include all wireless clients
-                should_include = True
-            elif security:
-                security_upper = security.upper()
-
-                if filter_type == 'wpa1':
-                    # WPA1 patterns: "WPA-PSK", "WPA-TKIP", or just "WPA"
-                    # But NOT "WPA2" or "WPA3"
-                    should_include = (
-                        ('WPA' in security_upper or 'TKIP' in security_upper) and
-                        'WPA2' not in security_upper and
-                        'WPA3' not in security_upper
-                    )
-                elif filter_type == 'wpa2':
-                    # WPA2 patterns: "WPA2" but NOT "WPA3"
-                    should_include = (
-                        'WPA2' in security_upper and
-                        'WPA3' not in security_upper
-                    )
-                elif filter_type == 'wpa3':
-                    # WPA3 patterns
-                    should_include = 'WPA3' in security_upper
-
-            if should_include:
-                filtered_clients.append({
-                    'description': client.get('description', 'Unknown'),
-                    'mac': client.get('mac', 'Unknown'),
-                    'ip': client.get('ip', 'N/A'),
-                    'ssid': client.get('ssid', 'N/A'),
-                    'security': security if security else 'Unknown',
-                    'manufacturer': client.get('manufacturer', 'Unknown'),
-                    'os': client.get('os', 'Unknown'),
-                    'lastSeen': client.get('lastSeen', 'Unknown'),
-                    'status': client.get('status', 'Unknown')
-                })
-
-        return filtered_clients
-
-    def print_results(self, clients: List[Dict], filter_type: str = 'wpa1'):
-        """Print filtered clients in a readable format."""
-        filter_display = {
-            'wpa1': 'WPA1',
-            'wpa2': 'WPA2',
-            'wpa3': 'WPA3',
-            'all': 'wireless'
+        Returns:
+            Dict mapping 'all' and each SecurityProtocol value to its clients
+        """
+        categories = ['all'] + [protocol.value for protocol in SecurityProtocol]
+        return self.breakdown_clients(clients, categories)['clients']
+
+    def breakdown_clients(self, clients: Iterable[Dict], filter_types: List[str],
+                          writers: Optional[Dict[str, ResultWriter]] = None,
+                          keep_clients: bool = True, network: Optional[str] = None,
+                          network_id: Optional[str] = None) -> Dict:
+        """
+        Classify clients once, producing protocol tallies and filtered client sets.
+
+        Args:
+            clients: Iterable of all clients
+            filter_types: Filters whose matching clients should be kept
+            writers: Optional streaming writer per filter type; matching clients
+                     are written as they are classified
+            keep_clients: Keep matching clients in memory (disable for exports
+                          that only need the writers, to bound memory)
+            network: Network name to tag each client record with
+            network_id: Network ID to tag each client record with
+
+        Returns:
+            Dict with the wireless client 'total', tallies 'by_protocol' and
+            'by_ssid' (covering every protocol), and the matching 'clients'
+            for each requested filter
+        """
+        breakdown = {
+            'total': 0,
+            'by_protocol': {protocol.value: 0 for protocol in SecurityProtocol},
+            'by_ssid': {},
+            'clients': {filter_type: [] for filter_type in filter_types}
         }
+        writers = writers or {}
+        wanted = set(filter_types)
+        keep_all = 'all' in wanted
+
+        # Fetching is timed separately, as nested api/decode stages
+        with self._stage('classify'):
+            for client in clients:
+                if client.get('ssid') is None:
+                    continue
+
+                security = self._client_security(client)
+                categories = classify_security(security)
+
+                breakdown['total'] += 1
+                ssid_tally = breakdown['by_ssid'].setdefault(client['ssid'], {'total': 0})
+                ssid_tally['total'] += 1
+
+                matched = ['all'] if keep_all else []
+                for protocol in categories:
+                    breakdown['by_protocol'][protocol.value] += 1
+                    ssid_tally[protocol.value] = ssid_tally.get(protocol.value, 0) + 1
+                    if protocol.value in wanted:
+                        matched.append(protocol.value)
+
+                if not matched:
+                    continue
+
+                record = self._build_record(client, security)
+                if network is not None:
+                    record['network'] = network
+                if network_id is not None:
+                    record['networkId'] = network_id
+
+                for filter_type in matched:
+                    if keep_clients:
+                        breakdown['clients'][filter_type].append(record)
+                    if filter_type in writers:
+                        writers[filter_type].write(record)
+
+        return breakdown
+
+    @staticmethod
+    def merge_breakdowns(breakdowns: Iterable[Dict]) -> Dict:
+        """Combine per-network breakdowns into a single organization breakdown."""
+        merged = None
+
+        for breakdown in breakdowns:
+            if merged is None:
+                merged = breakdown
+                continue
+
+            merged['total'] += breakdown['total']
+            for protocol, count in breakdown['by_protocol'].items():
+                merged['by_protocol'][protocol] += count
+            for ssid, tally in breakdown['by_ssid'].items():
+                merged_tally = merged['by_ssid'].setdefault(ssid, {})
+                for key, count in tally.items():
+                    merged_tally[key] = merged_tally.get(key, 0) + count
+            for filter_type, clients in breakdown['clients'].items():
+                merged['clients'][filter_type].extend(clients)
+
+        return merged
+
+    @staticmethod
+    def _client_security(client: Dict) -> Optional[str]:
+        """Return the security string reported for a client, if any."""
+        # Check various fields that might contain security protocol info
+        security = None
+
+        # Primary location for security info
+        if 'recentDeviceConnection' in client:
+            recent_conn = client['recentDeviceConnection']
+            # Check if it's a dictionary before calling .get()
+            if isinstance(recent_conn, dict):
+                security = recent_conn.get('security', '')
+            elif isinstance(recent_conn, str):
+                security = recent_conn
+
+        # Alternative location
+        if not security and 'security' in client:
+            security = client.get('security', '')
+
+        return security
 
-        filter_name = filter_display.get(filter_type, filter_type.upper())
+    def _build_record(self, client: Dict, security: Optional[str]) -> ClientRecord:
+        """Build a client's record, joined with its AP and site when enrichment is on."""
+        record = self._client_record(client, security)
+        if self.enrich:
+            if self.device_index is None:
+                self._load_device_index()
+            if self.device_index is not None:
+                self.device_index.enrich(record, client)
+        return record
+
+    def _load_device_index(self, org_id: Optional[str] = None, networks: Optional[List[Dict]] = None):
+        """Build the device index, turning enrichment off if the inventory can't be fetched."""
+        try:
+            self.get_device_index(org_id, networks)
+        except requests.exceptions.RequestException as e:
+            print(f"⚠ Error fetching device inventory, clients will not be enriched: {e}")
+            self.enrich = False
+
+    @staticmethod
+    def _client_record(client: Dict, security: Optional[str]) -> ClientRecord:
+        """Build the reported record for a wireless client."""
+        return ClientRecord(
+            client.get('description', 'Unknown'),
+            client.get('mac', 'Unknown'),
+            client.get('ip', 'N/A'),
+            client.get('ssid', 'N/A'),
+            security if security else 'Unknown',
+            client.get('manufacturer', 'Unknown'),
+            client.get('os', 'Unknown'),
+            client.get('lastSeen', 'Unknown'),
+            client.get('status', 'Unknown')
+        )
+
+    def scan_organization(self, org_id: str, filter_type: str = 'wpa1',
+                          timespan: int = 2592000, per_page: int = 1000,
+                          max_workers: int = 8) -> List[Dict]:
+        """
+        Scan every wireless network in an organization concurrently.
+
+        Args:
+            org_id: Meraki organization ID
+            filter_type: Type of filter ('wpa1', 'wpa2', 'wpa3', 'open', 'enterprise', or 'all')
+            timespan: Time in seconds to look back (default 30 days = 2592000)
+            per_page: Number of clients requested per page (Dashboard max 5000)
+            max_workers: Maximum number of networks scanned at once
+
+        Returns:
+            Merged list of filtered clients, each tagged with its 'network'
+        """
+        def scan_network(scanner: 'MerakiWirelessScanner', network: Dict) -> List[Dict]:
+            return scanner.identify_clients(scanner.iter_clients(timespan, per_page), filter_type)
+
+        results = []
+        for network, clients in self._scan_networks(org_id, scan_network, max_workers,
+                                                     timespan, per_page):
+            for client in clients:
+                client['network'] = network.get('name', network['id'])
+                client['networkId'] = network['id']
+            results.extend(clients)
+
+        # Keep the merged report stable regardless of completion order
+        results.sort(key=lambda client: client['network'])
+        return results
+
+    def breakdown_organization(self, org_id: str, filter_types: List[str],
+                               timespan: int = 2592000, per_page: int = 1000,
+                               max_workers: int = 8,
+                               writers: Optional[Dict[str, ResultWriter]] = None,
+                               keep_clients: bool = True) -> Optional[Dict]:
+        """
+        Produce a merged protocol breakdown for every wireless network in an organization.
+
+        Args:
+            org_id: Meraki organization ID
+            filter_types: Filters whose matching clients should be kept
+            timespan: Time in seconds to look back (default 30 days = 2592000)
+            per_page: Number of clients requested per page (Dashboard max 5000)
+            max_workers: Maximum number of networks scanned at once
+            writers: Optional streaming writer per filter type, shared by all networks.
+                     A network's rows are only written once all its clients
+                     have been fetched, so a failed network exports nothing
+            keep_clients: Keep matching clients in memory
+
+        Returns:
+            Breakdown as returned by breakdown_clients(), with each client tagged
+            with its 'network', or None if no network could be scanned
+        """
+        def scan_network(scanner: 'MerakiWirelessScanner', network: Dict) -> Dict:
+            buffers = {filter_type: BufferedResultWriter(writer)
+                       for filter_type, writer in (writers or {}).items()}
+            breakdown = scanner.breakdown_clients(scanner.iter_clients(timespan, per_page), filter_types,
+                                                  buffers, keep_clients, network.get('name', network['id']),
+                                                  network['id'])
+            if scanner.fetch_error is None:
+                for buffer in buffers.values():
+                    buffer.commit()
+            return breakdown
+
+        breakdowns = [breakdown for _, breakdown in self._scan_networks(org_id, scan_network, max_workers,
+                                                                        timespan, per_page)]
+
+        merged = self.merge_breakdowns(breakdowns)
+        if merged is not None:
+            # Keep the merged report stable regardless of completion order
+            for clients in merged['clients'].values():
+                clients.sort(key=lambda client: client['network'])
+        return merged
+
+    def _scan_networks(self, org_id: str, scan_network, max_workers: int,
+                       timespan: int = 2592000, per_page: int = 1000):
+        """
+        Run scan_network(scanner, network) for every wireless network in an organization.
+
+        With the threaded engine networks are scanned on a bounded thread pool;
+        each worker gets its own scanner but they all share this scanner's
+        session and rate limiter. With the async engine the client listings
+        (timespan/per_page) are fetched concurrently on one event loop and each
+        network is processed as soon as its listing completes; with a snapshot
+        cache only the window the cache needs is fetched, if any.
+        Networks that still fail after retries are reported, not dropped silently.
+
+        Returns:
+            List of (network, result) pairs for the networks that were scanned
+        """
+        try:
+            print(f"Fetching networks from organization {org_id}...")
+            networks = self.get_networks(org_id)
+            print(f"Found {len(networks)} wireless network(s)")
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching networks: {e}")
+            self.failed_networks = [{'id': org_id, 'name': f"organization {org_id} network list"}]
+            return []
+
+        # One organization-wide inventory serves every network's enrichment
+        if self.enrich and self.device_index is None:
+            self._load_device_index(org_id, networks)
+
+        def run(network: Dict, pages: Optional[List[List[Dict]]] = None, plan: Optional[CachePlan] = None):
+            scanner = self._child_scanner(network['id'])
+            scanner._prefetched_pages = pages
+            scanner._cache_plan = plan
+            result = scan_network(scanner, network)
+            if scanner.fetch_error is not None:
+                raise scanner.fetch_error
+            return result
+
+        results = []
+        failed = []
+
+        if self.engine == 'async':
+            async def scan_all():
+                limit = asyncio.Semaphore(max_workers)
+                params = {'timespan': timespan, 'perPage': per_page}
+
+                async def fetch(network: Dict):
+                    """(network, prefetched pages or None, cache plan or None, whether the fetch succeeded)"""
+                    async with limit:
+                        # Only fetch what the snapshot cache will actually use. The
+                        # plan is decided once and handed to run(), so the cache
+                        # never fetches again (through the blocking facade) itself
+                        plan = None
+                        window = timespan
+                        if self.cache is not None:
+                            plan = self.cache.plan(network['id'], timespan)
+                            window = plan.window
+                            if window is None:
+                                return network, None, plan, True
+                        url = f"{self.base_url}/networks/{network['id']}/clients"
+                        try:
+                            pages = await self.async_client.fetch_pages(url, dict(params, timespan=window))
+                            return network, pages, plan, True
+                        except requests.exceptions.RequestException as e:
+                            print(f"Error fetching clients from network {network['id']}: {e}")
+                            return network, None, plan, False
+
+                tasks = [asyncio.ensure_future(fetch(network)) for network in networks]
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        network, pages, plan, fetched = await next_done
+                        if not fetched:
+                            failed.append(network)
+                            continue
+                        try:
+                            results.append((network, run(network, pages, plan)))
+                        except requests.exceptions.RequestException:
+                            failed.append(network)
+                finally:
+                    # Cancel whatever is still in flight if we are interrupted
+                    for task in tasks:
+                        task.cancel()
+
+            self.async_client.run(scan_all())
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(run, network): network for network in networks}
+                for future in as_completed(futures):
+                    try:
+                        results.append((futures[future], future.result()))
+                    except requests.exceptions.RequestException:
+                        failed.append(futures[future])
+
+        self.failed_networks = failed
+        if failed:
+            print(f"\n⚠ {len(failed)} network(s) could not be scanned:")
+            for network in failed:
+                print(f"  - {network.get('name', network['id'])} ({network['id']})")
+
+        return results
+
+    def print_results(self, clients: List[Dict], filter_type: str = 'wpa1', out=None):
+        """Print filtered clients as an aligned table in a single buffered write."""
+        out = out or sys.stdout
+        filter_name = FILTER_DISPLAY.get(filter_type, filter_type.upper())
 
         if not clients:
             if filter_type == 'all':
-                print(f"\n✓ No wireless clients found!")
+                out.write("\n✓ No wireless clients found!\n")
             else:
-                print(f"\n✓ No {filter_name} clients found!")
+                out.write(f"\n✓ No {filter_name} clients found!\n")
             return
 
-        print(f"\nFound {len(clients)} {filter_name} client(s):\n")
-        print("-" * 100)
-
-        for idx, client in enumerate(clients, 1):
-            print(f"\nClient #{idx}:")
-            print(f"  Description:  {client['description']}")
-            print(f"  MAC Address:  {client['mac']}")
-            print(f"  IP Address:   {client['ip']}")
-            print(f"  SSID:         {client['ssid']}")
-            print(f"  Security:     {client['security']}")
-            print(f"  Manufacturer: {client['manufacturer']}")
-            print(f"  OS:           {client['os']}")
-            print(f"  Last Seen:    {client['lastSeen']}")
-            print(f"  Status:       {client['status']}")
-
-        print("\n" + "-" * 100)
-
-    def export_to_csv(self, clients: List[Dict], filename: str = None, filter_type: str = 'wpa1'):
-        """Export filtered clients to CSV file."""
-        if not clients:
-            print(f"No clients to export.")
+        lines = [f"\nFound {len(clients)} {filter_name} client(s):\n", "-" * 100]
+        lines.extend(self.render_table(clients))
+        lines.append("-" * 100)
+        out.write('\n'.join(lines) + '\n')
+
+    @staticmethod
+    def render_table(clients: List[Dict]) -> List[str]:
+        """Render client records as aligned table rows, header first."""
+        columns = TABLE_COLUMNS
+        if clients and 'network' in clients[0]:
+            columns = [('network', 'Network')] + columns
+        if clients and 'apName' in clients[0]:
+            columns = columns + [('site', 'Site'), ('apName', 'AP'), ('apModel', 'AP Model')]
+
+        rows = [[str(idx)] + [str(client.get(key, '')) for key, _ in columns]
+                for idx, client in enumerate(clients, 1)]
+        header = ['#'] + [title for _, title in columns]
+
+        widths = [len(title) for title in header]
+        for row in rows:
+            widths = [max(width, len(value)) for width, value in zip(widths, row)]
+
+        row_format = '  '.join(f"{{:<{width}}}" for width in widths)
+        return [row_format.format(*header).rstrip()] + [row_format.format(*row).rstrip() for row in rows]
+
+    def print_summary(self, breakdown: Dict, filter_types: List[str], out=None):
+        """Print only the client counts for each requested filter."""
+        out = out or sys.stdout
+        lines = [f"\nScanned {breakdown['total']} wireless client(s):"]
+        for filter_type in filter_types:
+            count = breakdown['total'] if filter_type == 'all' else breakdown['by_protocol'][filter_type]
+            lines.append(f"  {FILTER_DISPLAY.get(filter_type, filter_type.upper()):<12} {count:>8}")
+        out.write('\n'.join(lines) + '\n')
+
+    def write_json(self, breakdown: Dict, filter_types: List[str], fmt: str = 'json', out=None):
+        """
+        Write results as machine-readable output.
+
+        'json' writes one document with the tallies and the clients of each
+        filter; 'ndjson' writes one client per line tagged with its filter.
+        """
+        out = out or sys.stdout
+
+        if fmt == 'ndjson':
+            out.writelines(
+                json.dumps(dict(client.items(), filter=filter_type)) + '\n'
+                for filter_type in filter_types
+                for client in breakdown['clients'][filter_type]
+            )
+        else:
+            document = {
+                'total': breakdown['total'],
+                'by_protocol': breakdown['by_protocol'],
+                'by_ssid': breakdown['by_ssid'],
+                'clients': {filter_type: [client.to_dict() for client in breakdown['clients'][filter_type]]
+                            for filter_type in filter_types}
+            }
+            json.dump(document, out)
+            out.write('\n')
+        out.flush()
+
+    def print_breakdown(self, breakdown: Dict):
+        """Print per-protocol and per-SSID client tallies."""
+        protocols = [protocol.value for protocol in SecurityProtocol]
+
+        print(f"\nProtocol breakdown ({breakdown['total']} wireless client(s)):\n")
+        for protocol in protocols:
+            print(f"  {protocol.upper():<12} {breakdown['by_protocol'][protocol]:>8}")
+
+        if not breakdown['by_ssid']:
+            return
+
+        ssid_width = max(len('SSID'), *(len(str(ssid)) for ssid in breakdown['by_ssid']))
+        columns = protocols + ['total']
+
+        print("\nPer-SSID breakdown:\n")
+        print(f"  {'SSID':<{ssid_width}} " + " ".join(f"{column.upper():>10}" for column in columns))
+        for ssid in sorted(breakdown['by_ssid'], key=str):
+            tally = breakdown['by_ssid'][ssid]
+            print(f"  {str(ssid):<{ssid_width}} " + " ".join(f"{tally.get(column, 0):>10}" for column in columns))
+
+    def export_to_csv(self, clients: Iterable[Dict], filename: str = None, filter_type: str = 'wpa1'):
+        """Export filtered clients to CSV file, writing rows as they arrive."""
+        self.export_results(clients, filename, filter_type, 'csv')
+
+    def export_results(self, clients: Iterable[Dict], filename: str = None,
+                       filter_type: str = 'wpa1', fmt: Optional[str] = None):
+        """
+        Export filtered clients, writing rows as they arrive.
+
+        Args:
+            clients: Iterable of filtered client records
+            filename: Output file, or '-' for stdout (default: timestamped file)
+            filter_type: Filter the clients were selected with (used for the default name)
+            fmt: One of EXPORT_FORMATS (default: inferred from the filename)
+        """
+        clients = iter(clients)
+        first_client = next(clients, None)
+
+        if first_client is None:
+            print("No clients to export.")
             return
 
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{filter_type}_clients_{timestamp}.csv"
+            filename = f"{filter_type}_clients_{timestamp}.{fmt or 'csv'}"
 
-        try:
-            with open(filename, 'w', newline='') as csvfile:
-                fieldnames = ['description', 'mac', 'ip', 'ssid', 'security',
-                            'manufacturer', 'os', 'lastSeen', 'status']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        fieldnames = CSV_FIELDNAMES
+        if 'network' in first_client:
+            fieldnames = ['network'] + fieldnames
+        if 'apName' in first_client:
+            fieldnames = fieldnames + ENRICHMENT_FIELDNAMES
 
-                writer.writeheader()
+        try:
+            with open_result_writer(filename, fmt, fieldnames) as writer:
+                writer.write(first_client)
                 for client in clients:
-                    writer.writerow(client)
+                    writer.write(client)
 
-            print(f"\n✓ Results exported to: {filename}")
+            if filename != '-':
+                print(f"\n✓ Results exported to: {filename}")
         except Exception as e:
-            print(f"Error exporting to CSV: {e}")
+            print(f"Error exporting results: {e}")
+
+
+class ClientWatcher:
+    """
+    Long-running delta poller that reports clients as they join or change security.
+
+    Each poll fetches only a short window (the poll interval plus some
+    overlap) and compares it against an in-memory index of every client seen
+    so far, keyed by network ID and MAC. Only new clients and clients whose
+    protocol changed are emitted, and only when they involve a watched filter.
+    Polls must see live data, so the scanner may not use a snapshot cache.
+    """
+
+    # Seconds added to each poll window so no client falls between two polls
+    WINDOW_OVERLAP = 60
+
+    def __init__(self, scanner: MerakiWirelessScanner, filter_types: List[str],
+                 org_id: Optional[str] = None, interval: int = 300, per_page: int = 1000,
+                 max_workers: int = 8, webhook: Optional[str] = None):
+        if scanner.cache is not None:
+            # A cached snapshot would hide clients that joined within its TTL
+            raise ValueError("ClientWatcher needs a scanner without a snapshot cache")
+        self.scanner = scanner
+        self.filter_types = set(filter_types)
+        self.org_id = org_id
+        self.interval = interval
+        self.per_page = per_page
+        self.max_workers = max_workers
+        self.webhook = webhook
+        self.seen = {}
+        self._stdout = sys.stdout
+
+    def _watched(self, protocol: Optional[SecurityProtocol], security: Optional[str]) -> bool:
+        if protocol is None:
+            return False
+        if 'all' in self.filter_types:
+            return True
+        return any(category.value in self.filter_types for category in classify_security(security))
+
+    def _fetch(self, timespan: int) -> List[tuple]:
+        """Return (network ID, network name, client) for every wireless client in the window."""
+        def wireless(clients: Iterable[Dict]) -> List[Dict]:
+            return [client for client in clients if client.get('ssid') is not None]
+
+        if self.org_id is None:
+            return [(self.scanner.network_id, self.scanner.network_id, client)
+                    for client in wireless(self.scanner.iter_clients(timespan, self.per_page))]
+
+        def scan_network(scanner: MerakiWirelessScanner, network: Dict) -> List[Dict]:
+            return wireless(scanner.iter_clients(timespan, self.per_page))
+
+        # Names are only for display: two networks may share one, and a
+        # rename must not make every client look new
+        return [(network['id'], network.get('name', network['id']), client)
+                for network, clients in self.scanner._scan_networks(self.org_id, scan_network,
+                                                                      self.max_workers, timespan,
+                                                                      self.per_page)
+                for client in clients]
+
+    def poll(self, timespan: int, emit: bool = True) -> List[Dict]:
+        """
+        Fetch one window and update the index.
+
+        Args:
+            timespan: Window in seconds to fetch
+            emit: Return events (False only seeds the index)
+
+        Returns:
+            List of 'new' and 'changed' client events
+        """
+        events = []
+        now = datetime.now().isoformat(timespec='seconds')
+
+        for network_id, network, client in self._fetch(timespan):
+            security = MerakiWirelessScanner._client_security(client)
+            protocol = primary_protocol(security)
+            key = (network_id, client.get('mac'))
+            previous = self.seen.get(key)
+            self.seen[key] = (protocol, security)
+
+            if not emit or (previous is not None and previous[0] is protocol):
+                continue
+
+            previous_protocol, previous_security = previous or (None, None)
+            if not (self._watched(protocol, security) or self._watched(previous_protocol, previous_security)):
+                continue
+
+            event = self.scanner._build_record(client, security).to_dict()
+            event.update({
+                'event': 'new' if previous is None else 'changed',
+                'timestamp': now,
+                'network': network,
+                'networkId': network_id,
+                'protocol': protocol.value,
+                'previousProtocol': previous_protocol.value if previous_protocol else None
+            })
+            events.append(event)
+
+        return events
+
+    def emit(self, events: List[Dict]):
+        """Send events to the webhook, or to stdout as JSON lines."""
+        if not events:
+            return
+
+        if self.webhook:
+            try:
+                # Plain requests, not the scanner session: the webhook must
+                # never receive the Dashboard API key
+                requests.post(self.webhook, json={'events': events}, timeout=10).raise_for_status()
+            except requests.exceptions.RequestException as e:
+                print(f"⚠ Error posting {len(events)} event(s) to webhook: {e}")
+            return
+
+        self._stdout.writelines(json.dumps(event) + '\n' for event in events)
+        self._stdout.flush()
+
+    def run(self, initial_timespan: int = 2592000, max_polls: Optional[int] = None):
+        """
+        Seed the index from `initial_timespan`, then poll every interval until interrupted.
+
+        Clients already present when watching starts are not reported.
+        """
+        self.poll(initial_timespan, emit=False)
+        print(f"Watching {len(self.seen)} known client(s); polling every {self.interval}s")
+
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                time.sleep(self.interval)
+                self.emit(self.poll(self.interval + self.WINDOW_OVERLAP))
+                polls += 1
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+
+
+def export_filename(path: str, filter_type: str) -> str:
+    """Insert a filter name before a path's extension (report.csv.gz -> report_wpa1.csv.gz)."""
+    fmt = export_format_for(path)
+    if path.endswith('.' + fmt):
+        return f"{path[:-len(fmt) - 1]}_{filter_type}.{fmt}"
+    root, ext = os.path.splitext(path)
+    return f"{root}_{filter_type}{ext}"
 
 
 def main():
@@ -198,43 +1992,341 @@ Examples:
   # List all wireless devices
   %(prog)s --api-key YOUR_KEY --network-id L_123456 --filter all
 
+  # WPA1 and WPA2 clients plus a protocol breakdown, from a single fetch
+  %(prog)s --api-key YOUR_KEY --network-id L_123456 --filter wpa1 wpa2 --breakdown
+
   # Export WPA1 clients from last 7 days
   %(prog)s --api-key YOUR_KEY --network-id L_123456 --filter wpa1 --timespan 604800 --export wpa1_report.csv
+
+  # Re-run a scan from a local snapshot, fetching only what changed since
+  %(prog)s --api-key YOUR_KEY --network-id L_123456 --filter wpa1 --cache
+
+  # Record a scan in a history database, then compare it with the previous one
+  %(prog)s --api-key YOUR_KEY --network-id L_123456 --history-db scans.db
+  %(prog)s --network-id L_123456 --history-db scans.db --diff
+
+  # Stream an org-wide export as gzip-compressed JSON Lines, or pipe CSV to another tool
+  %(prog)s --api-key YOUR_KEY --org-id 123456 --filter all --export all_clients.jsonl.gz
+  %(prog)s --api-key YOUR_KEY --network-id L_123456 --export - | sort
+
+  # Per-protocol counts only, or results as JSON for other tools
+  %(prog)s --api-key YOUR_KEY --network-id L_123456 --filter wpa1 wpa2 wpa3 --summary
+  %(prog)s --api-key YOUR_KEY --network-id L_123456 --filter wpa1 --format ndjson | jq .mac
+
+  # Watch for WPA1 clients joining, checking every minute
+  %(prog)s --api-key YOUR_KEY --network-id L_123456 --filter wpa1 --watch --interval 60
+
+  # Show which AP and site each WPA1 client is on
+  %(prog)s --api-key YOUR_KEY --org-id 123456 --filter wpa1 --enrich --export wpa1_by_ap.csv
+
+  # Audit every wireless network in an organization, 16 networks at a time
+  %(prog)s --api-key YOUR_KEY --org-id 123456 --filter wpa1 --concurrency 16 --export org_wpa1.csv
+
+  # See where a slow org scan spends its time, or feed the numbers to monitoring
+  %(prog)s --api-key YOUR_KEY --org-id 123456 --summary --stats
+  %(prog)s --api-key YOUR_KEY --org-id 123456 --summary --stats json 2>> scan_stats.jsonl
         """
     )
 
-    parser.add_argument('--api-key', required=True,
-                       help='Meraki Dashboard API key')
-    parser.add_argument('--network-id', required=True,
+    parser.add_argument('--api-key',
+                       help='Meraki Dashboard API key (required unless only reading --history-db)')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--network-id',
                        help='Meraki Network ID (e.g., L_123456789)')
-    parser.add_argument('--filter', choices=['wpa1', 'wpa2', 'wpa3', 'all'], default='wpa1',
-                       help='Filter by security protocol (default: wpa1)')
+    target.add_argument('--org-id',
+                       help='Meraki Organization ID - scan every wireless network in the organization')
+    parser.add_argument('--filter', choices=FILTER_TYPES, nargs='+', default=['wpa1'],
+                       help='Filter by security protocol; several filters share a single fetch (default: wpa1)')
+    parser.add_argument('--breakdown', action='store_true',
+                       help='Also print per-protocol and per-SSID client tallies')
+    parser.add_argument('--summary', '--quiet', action='store_true',
+                       help='Print only client counts, not the client listings')
+    parser.add_argument('--format', choices=['text', 'json', 'ndjson'], default='text',
+                       help='Output format for results on stdout (default: text)')
+    parser.add_argument('--enrich', action='store_true',
+                       help='Add each client\'s AP and site from the device inventory (fetched once)')
     parser.add_argument('--timespan', type=int, default=2592000,
                        help='Timespan in seconds to look back (default: 2592000 = 30 days)')
+    parser.add_argument('--per-page', type=int, default=1000,
+                       help='Clients requested per API page (default: 1000, max: 5000)')
+    parser.add_argument('--concurrency', type=int, default=8,
+                       help='Networks scanned in parallel with --org-id (default: 8)')
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                       help='Concurrency engine: thread pool, or asyncio/httpx on a single thread (default: threads)')
+    parser.add_argument('--pool-size', type=int,
+                       help='HTTP connection pool size (default: --concurrency)')
+    parser.add_argument('--rate-limit', type=float, default=MERAKI_RATE_LIMIT,
+                       help='Maximum API calls per second across all workers (default: 10, 0 = unlimited)')
+    parser.add_argument('--max-retries', type=int, default=5,
+                       help='Retries for throttled (429) or failed API calls (default: 5)')
+    parser.add_argument('--connect-timeout', type=float, default=DEFAULT_TIMEOUT[0],
+                       help=f'Seconds to wait for an API connection (default: {DEFAULT_TIMEOUT[0]:g})')
+    parser.add_argument('--read-timeout', type=float, default=DEFAULT_TIMEOUT[1],
+                       help=f'Seconds to wait for an API response (default: {DEFAULT_TIMEOUT[1]:g})')
+    parser.add_argument('--cache', action='store_true',
+                       help='Cache client listings locally and refresh them incrementally (not with --watch)')
+    parser.add_argument('--cache-dir', metavar='DIR',
+                       help='Snapshot cache directory (default: ~/.cache/meraki_wpa1_scanner)')
+    parser.add_argument('--cache-ttl', type=int, default=900,
+                       help='Seconds a cached snapshot is used without refreshing (default: 900)')
+    parser.add_argument('--refresh', action='store_true',
+                       help='Ignore cached snapshots and fetch everything again')
     parser.add_argument('--export', metavar='FILENAME',
-                       help='Export results to CSV file')
+                       help="Export results to FILENAME as they are fetched ('-' for stdout)")
+    parser.add_argument('--export-format', choices=EXPORT_FORMATS,
+                       help='Export format (default: inferred from FILENAME, otherwise csv)')
+    parser.add_argument('--watch', action='store_true',
+                       help='Keep polling and emit new or changed clients as JSON lines events')
+    parser.add_argument('--interval', type=int, default=300,
+                       help='Seconds between polls in --watch mode (default: 300)')
+    parser.add_argument('--webhook', metavar='URL',
+                       help='POST --watch events to this URL instead of printing them')
+    parser.add_argument('--history-db', metavar='PATH',
+                       help='Record every wireless client of this scan in a SQLite history database')
+    parser.add_argument('--list-scans', action='store_true',
+                       help='List scans recorded in --history-db and exit')
+    parser.add_argument('--diff', nargs='*', type=int, metavar='SCAN_ID',
+                       help='Compare two recorded scans of the same network/org (default: the latest two '
+                            'for the network/org, or for the most recently scanned one) and exit')
+    parser.add_argument('--stats', nargs='?', const='table', choices=['table', 'json'],
+                       help='Report stage timings and API call, retry, page and byte counts on stderr '
+                            '(default: table)')
+    parser.add_argument('--profile', metavar='FILE',
+                       help='Write a cProfile dump of the scan, worker threads included, to FILE '
+                            '(inspect with python -m pstats FILE)')
 
     args = parser.parse_args()
+    scope = args.org_id or args.network_id
 
-    # Create scanner instance
-    scanner = MerakiWirelessScanner(args.api_key, args.network_id)
+    if (args.list_scans or args.diff is not None) and not args.history_db:
+        parser.error('--list-scans and --diff require --history-db')
 
-    # Get all clients
-    clients = scanner.get_clients(args.timespan)
+    if args.list_scans or args.diff is not None:
+        history = ScanHistory(args.history_db)
+        try:
+            if args.list_scans:
+                for scan in history.list_scans(scope):
+                    print(f"#{scan['id']:<6} {scan['scanned_at']}  {scan['scope']:<20} "
+                          f"{scan['client_count']} client(s)")
+                return
 
-    if not clients:
-        print("No clients found or error occurred.")
+            if len(args.diff) == 2:
+                old_scan_id, new_scan_id = args.diff
+            elif not args.diff:
+                scans = history.list_scans(scope)
+                if scans and not scope:
+                    # Without a scope, compare the latest scan with the one before it of the same scope
+                    scans = history.list_scans(scans[0]['scope'])
+                if len(scans) < 2:
+                    print("Need at least two recorded scans to diff.")
+                    return
+                new_scan_id, old_scan_id = scans[0]['id'], scans[1]['id']
+            else:
+                parser.error('--diff takes either no scan IDs or exactly two')
+
+            try:
+                diff = history.diff(old_scan_id, new_scan_id)
+            except ValueError as e:
+                parser.error(str(e))
+            history.print_diff(diff, old_scan_id, new_scan_id)
+        finally:
+            history.close()
         return
 
-    # Filter clients based on security protocol
-    filtered_clients = scanner.identify_clients(clients, args.filter)
+    if not args.api_key or not scope:
+        parser.error('--api-key and one of --network-id/--org-id are required to scan')
+
+    if args.watch and args.cache:
+        parser.error('--watch polls live data and cannot be combined with --cache')
+
+    cache = None
+    if args.cache:
+        cache = SnapshotCache(args.cache_dir, args.cache_ttl, args.refresh)
+
+    if args.engine == 'async' and httpx is None:
+        parser.error('--engine async requires httpx (pip install httpx)')
+
+    # Create scanner instance; the pool must hold one connection per worker
+    stats = ScanStats() if args.stats else None
+    scanner = MerakiWirelessScanner(args.api_key, args.network_id,
+                                    rate_limiter=RateLimiter(args.rate_limit),
+                                    max_retries=args.max_retries,
+                                    pool_size=args.pool_size or args.concurrency,
+                                    cache=cache, engine=args.engine, enrich=args.enrich,
+                                    stats=stats, timeout=(args.connect_timeout, args.read_timeout))
+
+    try:
+        filter_types = list(dict.fromkeys(args.filter))
+
+        if args.watch:
+            watcher = ClientWatcher(scanner, filter_types, args.org_id, args.interval,
+                                    args.per_page, args.concurrency, args.webhook)
+            # Events own stdout unless they go to a webhook
+            status = contextlib.nullcontext() if args.webhook else contextlib.redirect_stdout(sys.stderr)
+            with status, instrumentation(args, stats):
+                watcher.run(args.timespan)
+            return
+
+        to_stdout = args.export == '-' or args.format != 'text'
+
+        if args.export == '-' and len(filter_types) > 1:
+            parser.error('--export - supports a single --filter')
+        if args.export == '-' and args.format != 'text':
+            parser.error('--export - cannot be combined with --format json/ndjson')
+
+        # Open one streaming writer per filter so rows are written network by network
+        writers = {}
+        if args.export:
+            fieldnames = (['network'] if args.org_id else []) + CSV_FIELDNAMES
+            if args.enrich:
+                fieldnames += ENRICHMENT_FIELDNAMES
+            try:
+                for filter_type in filter_types:
+                    filename = export_filename(args.export, filter_type) if len(filter_types) > 1 else args.export
+                    writers[filter_type] = open_result_writer(filename, args.export_format, fieldnames)
+                    writers[filter_type].stats = stats
+            except RuntimeError as e:
+                parser.error(str(e))
+
+        # When results are piped to stdout, status messages go to stderr instead
+        out = sys.stdout
+        status = contextlib.redirect_stdout(sys.stderr) if to_stdout else contextlib.nullcontext()
+        try:
+            with status, instrumentation(args, stats):
+                complete = run_scan(args, scanner, scope, filter_types, writers, out)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        for writer in writers.values():
+            if writer.path != '-':
+                if not complete and writer.count:
+                    print(f"\n⚠ {writer.path} is incomplete: {writer.count} result(s) exported "
+                          f"from the networks that could be scanned.")
+                elif not complete:
+                    print(f"\nNothing exported to {writer.path}: the scan failed.")
+                elif writer.count:
+                    print(f"\n✓ {writer.count} result(s) exported to: {writer.path}")
+                else:
+                    print(f"\nNo clients to export to {writer.path}.")
+
+        if not complete:
+            sys.exit(1)
+    finally:
+        # Shut the async engine's connections and event loop down cleanly
+        if scanner.async_client is not None:
+            scanner.async_client.close()
+
+
+def _thread_profiler(profiles: List[cProfile.Profile]):
+    """threading.setprofile() hook that gives each new thread its own profiler, collected in `profiles`."""
+    def start(frame, event, arg):
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        profiles.append(profile)
+        profile.enable()
+    return start
+
+
+@contextlib.contextmanager
+def instrumentation(args, stats: Optional[ScanStats]):
+    """
+    Profile the enclosed run with --profile, then report --stats, even if it fails.
+
+    Before Python 3.12 cProfile only sees the thread that enabled it, so the
+    organization scan's worker threads are given profilers of their own and
+    merged into the dump. From 3.12 one profiler sees every thread.
+    """
+    profiler = cProfile.Profile() if args.profile else None
+    thread_profiles = []
+    if profiler is not None:
+        if sys.version_info < (3, 12):
+            threading.setprofile(_thread_profiler(thread_profiles))
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            threading.setprofile(None)
+            profile = pstats.Stats(profiler)
+            for thread_profile in thread_profiles:
+                profile.add(thread_profile)
+            profile.dump_stats(args.profile)
+            print(f"✓ Profile written to {args.profile}", file=sys.stderr)
+        if stats is not None:
+            stats.report(args.stats, engine=args.engine, concurrency=args.concurrency,
+                         per_page=args.per_page, pool_size=args.pool_size or args.concurrency,
+                         rate_limit=args.rate_limit)
+
+
+def run_scan(args, scanner: MerakiWirelessScanner, scope: str, filter_types: List[str],
+             writers: Dict[str, ResultWriter], out) -> bool:
+    """
+    Fetch, classify, print and record a scan as requested on the command line.
+
+    Returns:
+        False if the scan is incomplete because fetching failed part-way or
+        some of the organization's networks could not be scanned
+    """
+    # The history keeps every wireless client so protocol changes can be diffed
+    kept_types = list(dict.fromkeys(filter_types + ['all'])) if args.history_db else filter_types
+
+    # Only keep clients in memory when something is going to list them
+    lists_clients = not args.summary and (args.format != 'text' or args.export != '-')
+    keep_clients = lists_clients or bool(args.history_db)
+
+    # Fetch and classify once however many filters were requested. Clients are
+    # streamed page by page, so only the matching subsets are held in memory
+    if args.org_id:
+        breakdown = scanner.breakdown_organization(
+            args.org_id, kept_types, args.timespan, args.per_page, args.concurrency,
+            writers, keep_clients)
+        complete = not scanner.failed_networks
+    else:
+        clients = scanner.iter_clients(args.timespan, args.per_page)
+        buffers = {filter_type: BufferedResultWriter(writer) for filter_type, writer in writers.items()}
+        breakdown = scanner.breakdown_clients(clients, kept_types, buffers, keep_clients)
+        if scanner.fetch_error is not None:
+            # Reporting the clients fetched so far would pass them off as the whole network
+            print(f"\n⚠ Scan incomplete: fetching clients failed after {scanner.client_count} client(s) "
+                  f"({scanner.fetch_error}). No results reported.", file=sys.stderr)
+            return False
+        for buffer in buffers.values():
+            buffer.commit()
+        complete = True
+        if not scanner.client_count:
+            breakdown = None
+
+    if breakdown is None:
+        print("No clients found or error occurred.")
+        return complete
+
+    with scanner._stage('output'):
+        if args.format != 'text':
+            if args.summary:
+                breakdown = dict(breakdown, clients={filter_type: [] for filter_type in filter_types})
+            scanner.write_json(breakdown, filter_types, args.format, out)
+        else:
+            if args.breakdown:
+                scanner.print_breakdown(breakdown)
+            if args.summary:
+                scanner.print_summary(breakdown, filter_types)
+            elif lists_clients:
+                for filter_type in filter_types:
+                    scanner.print_results(breakdown['clients'][filter_type], filter_type)
 
-    # Print results
-    scanner.print_results(filtered_clients, args.filter)
+    if args.history_db and not complete:
+        # A later --diff would report the missing networks' clients as gone
+        print(f"\n⚠ Scan not recorded in {args.history_db}: "
+              f"{len(scanner.failed_networks)} network(s) could not be scanned")
+    elif args.history_db:
+        history = ScanHistory(args.history_db)
+        scan_id = history.record_scan(scope, breakdown['clients']['all'], args.timespan)
+        history.close()
+        print(f"\n✓ Scan recorded as #{scan_id} in {args.history_db}")
 
-    # Export if requested
-    if args.export:
-        scanner.export_to_csv(filtered_clients, args.export, args.filter)
+    return complete
 
 
 if __name__ == "__main__":